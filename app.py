@@ -1,44 +1,79 @@
 import os
 import json
 import logging
-import requests
 import atexit
+import gzip
+import hashlib
+import queue
+import time
+import threading
 from datetime import datetime, timedelta
-from functools import lru_cache
-import pandas as pd
+from functools import wraps
 import numpy as np
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, has_app_context, jsonify, render_template, request
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from apscheduler.schedulers.background import BackgroundScheduler
-from scipy.stats import poisson
-from rapidfuzz import process, fuzz
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows: tek süreçli geliştirme sunucusu, kilit gerekmez
+    fcntl = None
+
+from engine import SCORE_GRID, RatingEngine, load_config, load_snapshot, outcome_probs, save_snapshot, score_matrices
+from team_index import TeamAliasIndex
+from bulletin import ODDS_KEYS, BulletinFetcher, parse_bulletin_file, parse_results_file, results_feed
+from feeds import FeedRunner
+from schema import apply_pragmas, migrate
+from history import (INCREMENT_SQL, PICK_SQL, SELECTIONS, STAT_COLUMNS, decode_cursor, encode_cursor, match_outcomes,
+                     match_picks, parse_day, range_params, range_sql, stat_deltas, summarize)
+from markets import (ODDS_SELECTIONS, asian_handicap, blob_to_matrix, check_line, correct_scores, double_chance,
+                     line_summary, matrix_to_blob, total_goals, value_rows)
+import metrics
+from profiler import PROFILE_HEADER, SamplingProfiler, save_report, should_profile
+
 # --- YAPILANDIRMA ---
 load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CSV_PATH = os.path.join(BASE_DIR, 'data', 'final_unified_dataset.csv')
+# CSV veya Parquet/Arrow (pyarrow gerekir)
+CSV_PATH = os.getenv("PREDICTA_DATASET", os.path.join(BASE_DIR, 'data', 'final_unified_dataset.csv'))
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
 STATIC_DIR = os.path.join(BASE_DIR, 'static')
 
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("PredictaAI")
+logging.getLogger("httpx").setLevel(logging.WARNING)  # istek başına satır yazmasın
 
 app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
 CORS(app)
 
 # Veritabanı Yolu
-INSTANCE_DIR = os.path.join(BASE_DIR, 'instance')
+# DB, snapshot, scheduler kilidi ve profil raporları (benchmark.py geçici klasör verir)
+INSTANCE_DIR = os.getenv("PREDICTA_INSTANCE_DIR", os.path.join(BASE_DIR, 'instance'))
 os.makedirs(INSTANCE_DIR, exist_ok=True)
 DB_PATH = os.path.join(INSTANCE_DIR, 'predictapro.db')
+SNAPSHOT_DIR = os.getenv("PREDICTA_SNAPSHOT_DIR", os.path.join(INSTANCE_DIR, 'model_snapshot'))
+LOCK_PATH = os.path.join(INSTANCE_DIR, 'scheduler.lock')
+PROFILE_DIR = os.path.join(INSTANCE_DIR, 'profiles')
+SQLITE_MAX_PARAMS = 30000  # SQLite >= 3.32 sınırı 32766
 
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 
+# WAL + pragmalar her yeni bağlantıda
+with app.app_context():
+    event.listen(db.engine, "connect", apply_pragmas)
+
+def commit_session(operation):
+    """db.session.commit + süre metriği (predicta_db_commit_seconds)"""
+    with metrics.DB_COMMIT.labels(operation).time():
+        db.session.commit()
+
 # --- VERİTABANI MODELİ ---
 class Match(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -47,18 +82,36 @@ class Match(db.Model):
     home_team = db.Column(db.String(50))
     away_team = db.Column(db.String(50))
     date = db.Column(db.DateTime)
-    odds = db.Column(db.Text) 
+    # Oranlar (bültende yoksa NULL)
+    ms1 = db.Column(db.Float, nullable=True)
+    msx = db.Column(db.Float, nullable=True)
+    ms2 = db.Column(db.Float, nullable=True)
+    alt = db.Column(db.Float, nullable=True)
+    ust = db.Column(db.Float, nullable=True)
+    kgvar = db.Column(db.Float, nullable=True)
+    kgyok = db.Column(db.Float, nullable=True)
     prob_home = db.Column(db.Float, default=0.0)
     prob_draw = db.Column(db.Float, default=0.0)
     prob_away = db.Column(db.Float, default=0.0)
     prob_over_25 = db.Column(db.Float, default=0.0)
     prob_btts = db.Column(db.Float, default=0.0)
+    # Tahmindeki (K, K) skor matrisi, float32; tüm marketler buradan türetilir (bkz. markets.py)
+    score_matrix = db.Column(db.LargeBinary, nullable=True)
     status = db.Column(db.String(20), default="Pending")
     score_home = db.Column(db.Integer, nullable=True)
     score_away = db.Column(db.Integer, nullable=True)
     result_str = db.Column(db.String(10), nullable=True)
     is_successful = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        db.Index('ix_match_status_date', 'status', 'date'),  # geçmiş + sonuçlandırma
+        db.Index('ix_match_date', 'date'),                   # /api/matches penceresi
+        db.Index('ix_match_league_status_date', 'league', 'status', 'date'),  # lig filtreli geçmiş
+    )
+
+    def odds_dict(self):
+        return {k: getattr(self, k) if getattr(self, k) is not None else "-" for k in ODDS_KEYS}
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -67,7 +120,7 @@ class Match(db.Model):
             "home": self.home_team,
             "away": self.away_team,
             "date": self.date.strftime("%Y-%m-%d %H:%M"),
-            "odds": json.loads(self.odds) if self.odds else {},
+            "odds": self.odds_dict(),
             "probs": {
                 "1": round(self.prob_home * 100, 1),
                 "X": round(self.prob_draw * 100, 1),
@@ -81,13 +134,195 @@ class Match(db.Model):
             "success": self.is_successful
         }
 
+class TeamAlias(db.Model):
+    """Bülten isminin (normalize) çözüldüğü CSV takımı; worker'lar ve yeniden başlatmalar arasında paylaşılır"""
+    alias = db.Column(db.String(100), primary_key=True)
+    team = db.Column(db.String(100))
+    league = db.Column(db.String(100), nullable=True)
+    score = db.Column(db.Float, default=0.0)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+class JobRun(db.Model):
+    """Arka plan işlerinin çalışma süresi kaydı"""
+    id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(50), index=True)
+    started_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Float)
+    success = db.Column(db.Boolean, default=True)
+    error = db.Column(db.String(255), nullable=True)
+
+class ApiCache(db.Model):
+    """Önceden serileştirilmiş API yanıtları (ingest işi yazar, tüm worker'lar okur)"""
+    key = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0)
+    digest = db.Column(db.String(64))
+    body = db.Column(db.LargeBinary)
+    body_gz = db.Column(db.LargeBinary)
+    built_at = db.Column(db.DateTime, default=datetime.now)
+
+class LiveEvent(db.Model):
+    """SSE ile yayınlanacak değişiklikler (yeni maçlar, oran hareketleri, sonuçlar)"""
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
+    kind = db.Column(db.String(20))
+    payload = db.Column(db.Text)
+
+class OddsMovement(db.Model):
+    """Her yeni/değişen oranın zaman damgalı kaydı"""
+    id = db.Column(db.Integer, primary_key=True)
+    match_code = db.Column(db.String(20), index=True)
+    captured_at = db.Column(db.DateTime, default=datetime.now)
+    ms1 = db.Column(db.Float, nullable=True)
+    msx = db.Column(db.Float, nullable=True)
+    ms2 = db.Column(db.Float, nullable=True)
+    alt = db.Column(db.Float, nullable=True)
+    ust = db.Column(db.Float, nullable=True)
+    kgvar = db.Column(db.Float, nullable=True)
+    kgyok = db.Column(db.Float, nullable=True)
+
+class ValueBet(db.Model):
+    """Bekleyen maçların bülten seçimleri için model olasılığı ve beklenen değer (EV = p * oran - 1).
+    Oran değiştikçe saklı skor matrisinden yeniden hesaplanır; maç sonuçlanınca silinir."""
+    match_code = db.Column(db.String(20), primary_key=True)
+    selection = db.Column(db.String(10), primary_key=True)  # history.SELECTIONS adları
+    date = db.Column(db.DateTime)
+    prob = db.Column(db.Float, nullable=False)
+    odds = db.Column(db.Float, nullable=False)
+    ev = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (db.Index('ix_value_bet_ev', 'ev'),)  # sunucu tarafı sıralama
+
+class ModelUpdate(db.Model):
+    """Rating motoruna uygulanan sonuçlanmış maçlar (sıralı günlük; checkpoint sonrası tekrar oynatılır)"""
+    id = db.Column(db.Integer, primary_key=True)
+    match_code = db.Column(db.String(20), unique=True)
+    date = db.Column(db.DateTime)
+    league = db.Column(db.String(100), nullable=True)
+    home_team = db.Column(db.String(100))
+    away_team = db.Column(db.String(100))
+    home_score = db.Column(db.Integer)
+    away_score = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+class ResultStat(db.Model):
+    """Ligin o güne kadarki (dahil) kümülatif sonuç sayıları; settle_matches aynı transaction'da
+    artırır (bkz. history.py). Kolonlar history.STAT_COLUMNS ile aynı sıradadır."""
+    league = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    result_home = db.Column(db.Integer, nullable=False, default=0)
+    result_draw = db.Column(db.Integer, nullable=False, default=0)
+    result_away = db.Column(db.Integer, nullable=False, default=0)
+    result_over = db.Column(db.Integer, nullable=False, default=0)
+    result_btts = db.Column(db.Integer, nullable=False, default=0)
+    # Modelin seçimi (pick) ve tutan seçim (hit) sayıları
+    pick_home = db.Column(db.Integer, nullable=False, default=0)
+    hit_home = db.Column(db.Integer, nullable=False, default=0)
+    pick_draw = db.Column(db.Integer, nullable=False, default=0)
+    hit_draw = db.Column(db.Integer, nullable=False, default=0)
+    pick_away = db.Column(db.Integer, nullable=False, default=0)
+    hit_away = db.Column(db.Integer, nullable=False, default=0)
+    pick_over = db.Column(db.Integer, nullable=False, default=0)
+    hit_over = db.Column(db.Integer, nullable=False, default=0)
+    pick_under = db.Column(db.Integer, nullable=False, default=0)
+    hit_under = db.Column(db.Integer, nullable=False, default=0)
+    pick_btts = db.Column(db.Integer, nullable=False, default=0)
+    hit_btts = db.Column(db.Integer, nullable=False, default=0)
+    pick_nobtts = db.Column(db.Integer, nullable=False, default=0)
+    hit_nobtts = db.Column(db.Integer, nullable=False, default=0)
+
+class TeamAliasStore:
+    """TeamAliasIndex için SQLite deposu (app context dışında devre dışı)"""
+    def get(self, alias):
+        if not has_app_context(): return None
+        try:
+            row = db.session.get(TeamAlias, alias)
+            return row.team if row else None
+        except Exception as e:
+            logger.warning(f"⚠️ Alias okunamadı: {e}")
+            return None
+
+    def load_all(self):
+        if not has_app_context(): return []
+        try:
+            return db.session.query(TeamAlias.alias, TeamAlias.team, TeamAlias.league).all()
+        except Exception as e:
+            logger.warning(f"⚠️ Alias tablosu okunamadı: {e}")
+            return []
+
+    def save_many(self, rows):
+        """Çağıranın transaction'ına SAVEPOINT içinde yazar (commit çağıranındır); hata yalnızca
+        alias yazımını geri alır, aynı oturumdaki maç/sonuç yazımları korunur."""
+        if not has_app_context(): return
+        stmt = sqlite_insert(TeamAlias)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['alias'],
+            set_={'team': stmt.excluded.team, 'league': stmt.excluded.league, 'score': stmt.excluded.score}
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.execute(stmt, rows)
+        except Exception as e:
+            logger.warning(f"⚠️ Alias kaydedilemedi: {e}")
+
 # --- GELİŞTİRİLMİŞ TAHMİN MOTORU ---
+# PREDICTA_MODEL_LOAD:
+#   background (varsayılan) import'ta ayrı iş parçacığında yüklenir; istekler beklemez
+#   eager       import sırasında yüklenir (gunicorn --preload: fork öncesi master'da)
+#   off         ilk wait_ready çağrısında yüklenir (init_db.py gibi kısa ömürlü süreçler)
+MODEL_LOAD_MODE = os.getenv("PREDICTA_MODEL_LOAD", "background").lower()
+MODEL_WAIT_SECONDS = int(os.getenv("PREDICTA_MODEL_WAIT", 900))
+
 class MatchPredictor:
     def __init__(self):
-        self.team_stats = {}
         self.league_stats = {}
         self.team_list = []
-        self.load_database()
+        # alpha, form eşikleri, Dixon-Coles çarpanları (bkz. engine.ModelConfig, sweep.py)
+        self.config = load_config(os.getenv("PREDICTA_MODEL_CONFIG"))
+        self.engine = RatingEngine(self.config)
+        self.alias_store = TeamAliasStore()
+        self.alias_index = TeamAliasIndex([], [], store=self.alias_store)
+        self.grid = int(os.getenv("PREDICTA_SCORE_GRID", SCORE_GRID))
+        self.fingerprint = None
+        self.checkpoint_id = 0
+        self.ready = threading.Event()
+        self.load_seconds = None
+        self._loading = False
+        self._load_lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # --- YÜKLEME ---
+    def start_loading(self, background=True):
+        """Modeli bir kez yükle; zaten başladıysa no-op"""
+        with self._load_lock:
+            if self._loading: return
+            self._loading = True
+        if background:
+            threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+        else:
+            self._load()
+
+    def _load(self):
+        t0 = time.perf_counter()
+        try:
+            self.load_database()
+        finally:
+            # Veri dosyası yoksa veya okunamadıysa da hazırdır (varsayılan ortalamalarla tahmin)
+            self.load_seconds = time.perf_counter() - t0
+            self.ready.set()
+
+    def wait_ready(self, timeout=None):
+        """Model hazır olana kadar bekle; yükleme başlamadıysa bu iş parçacığında yükler"""
+        self.start_loading(background=False)
+        return self.ready.wait(timeout)
+
+    def _after_fork(self):
+        # Yükleyici iş parçacığı fork'ta çocuğa geçmez: yarım kalan yükleme baştan başlar
+        self._load_lock = threading.Lock()
+        if self._loading and not self.ready.is_set():
+            self._loading = False
+            self.start_loading()
 
     def load_database(self):
         logger.info(f"📂 Veritabanı başlatılıyor... Yol: {CSV_PATH}")
@@ -96,313 +331,566 @@ class MatchPredictor:
             return
 
         try:
-            cols = ['home_team', 'away_team', 'home_score', 'away_score', 'date', 'league']
-            
-            try:
-                df = pd.read_csv(CSV_PATH, usecols=lambda c: c.lower() in cols, encoding='utf-8', on_bad_lines='skip')
-            except:
-                df = pd.read_csv(CSV_PATH, encoding='utf-8', on_bad_lines='skip')
+            # ⚡ CSV değişmediyse derlenmiş snapshot'ı mmap ile aç
+            t0 = time.perf_counter()
+            engine, fingerprint = load_snapshot(SNAPSHOT_DIR, CSV_PATH, self.config)
+            self.fingerprint = fingerprint
+            if engine is not None:
+                self._use_engine(engine)
+                self.checkpoint_id = engine.journal_id
+                metrics.MODEL_LOAD.labels('snapshot').observe(time.perf_counter() - t0)
+                logger.info(f"⚡ Model snapshot yüklendi: {len(self.team_list)} takım ({(time.perf_counter() - t0) * 1000:.0f} ms).")
+                self._replay_tail()
+                return
 
-            df.columns = [c.lower().strip() for c in df.columns]
-            
-            rename_map = {
-                'hometeam': 'home_team', 'awayteam': 'away_team', 
-                'fthg': 'home_score', 'ftag': 'away_score',
-                'evsahibi': 'home_team', 'deplasman': 'away_team'
-            }
-            df.rename(columns=rename_map, inplace=True)
-
-            df['home_score'] = pd.to_numeric(df['home_score'], errors='coerce').fillna(0).astype('int32')
-            df['away_score'] = pd.to_numeric(df['away_score'], errors='coerce').fillna(0).astype('int32')
-            
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'], errors='coerce')
-                df = df.sort_values('date', ascending=True)
+            # Dosya parça parça okunup diskte tarihe göre sıralanır; bellek dosya boyutundan bağımsız
+            rows = self._calculate_advanced_stats(CSV_PATH)
+            metrics.MODEL_LOAD.labels('dataset').observe(time.perf_counter() - t0)
+            logger.info(f"✅ Veritabanı Hazır. {rows} maçtan {len(self.team_list)} takım analiz edildi (EMA + Son 10 Maç Form Takibi).")
 
-            if 'league' not in df.columns:
-                df['league'] = 'Unknown'
-
-            self._calculate_advanced_stats(df)
-            self.team_list = list(self.team_stats.keys())
-            
-            del df
-            logger.info(f"✅ Veritabanı Hazır. {len(self.team_stats)} takım analiz edildi (EMA + Son 10 Maç Form Takibi).")
+            if self.team_list:
+                save_snapshot(self.engine, SNAPSHOT_DIR, fingerprint)
+                logger.info(f"💾 Model snapshot kaydedildi ({(time.perf_counter() - t0) * 1000:.0f} ms).")
+                self._replay_tail()
             
         except Exception as e:
             logger.error(f"❌ DB Hata: {e}")
             import traceback
             logger.error(traceback.format_exc())
 
-    def _calculate_advanced_stats(self, df):
-        """EMA + Son 10 Maç Form Takibi"""
-        if df.empty: return
-
-        # Lig bazlı ortalamalar
-        league_group = df.groupby('league')
-        for league, data in league_group:
-            self.league_stats[league] = {
-                'avg_home_goals': data['home_score'].mean() or 1.5,
-                'avg_away_goals': data['away_score'].mean() or 1.2
-            }
-
-        teams = set(df['home_team'].unique()) | set(df['away_team'].unique())
-        
-        current_ratings = {}
-        for team in teams:
-            current_ratings[team] = {
-                'att_h': 1.0, 'def_h': 1.0,
-                'att_a': 1.0, 'def_a': 1.0,
-                'form_home': [],
-                'form_away': [],
-                'recent_goals_h': [],
-                'recent_goals_a': [],
-                'league': 'Unknown'
-            }
-
-        alpha = 0.18  # EMA öğrenme hızı
-
-        for _, row in df.iterrows():
-            home, away = row['home_team'], row['away_team']
-            h_score, a_score = row['home_score'], row['away_score']
-            league = row['league']
-            
-            if home not in current_ratings or away not in current_ratings: 
-                continue
+    def _calculate_advanced_stats(self, path):
+        """EMA + Son 10 Maç Form Takibi (dizi tabanlı motor, akış halinde)"""
+        from dataset import CHUNK_ROWS, stream_fit  # pandas yalnızca snapshot yoksa yüklenir
+        engine = RatingEngine(self.config)
+        rows = stream_fit(engine, path, int(os.getenv("PREDICTA_CHUNK_ROWS", CHUNK_ROWS)))
+        if rows: self._use_engine(engine)
+        return rows
+
+    def _use_engine(self, engine):
+        self.engine = engine
+        self.league_stats = engine.league_stats()
+        self.team_list = engine.teams
+        team_leagues = [engine.league_name(int(l)) for l in engine.team_league]
+        self.alias_index = TeamAliasIndex(engine.teams, team_leagues, store=self.alias_store)
 
-            l_stats = self.league_stats.get(league, {'avg_home_goals': 1.5, 'avg_away_goals': 1.2})
-            avg_h, avg_a = l_stats['avg_home_goals'], l_stats['avg_away_goals']
+    # --- ÇEVRİMİÇİ GÜNCELLEME ---
+    def _replay_tail(self):
+        """Açılışta checkpoint sonrasındaki ModelUpdate kayıtlarını uygula"""
+        try:
+            with app.app_context():
+                from sqlalchemy import inspect
+                if not inspect(db.engine).has_table(ModelUpdate.__tablename__): return
+                applied = self.sync_updates()
+            if applied:
+                logger.info(f"🔁 Checkpoint sonrası {applied} maç sonucu tekrar uygulandı.")
+        except Exception as e:
+            logger.warning(f"⚠️ Model güncellemeleri okunamadı: {e}")
 
-            current_ratings[home]['league'] = league
-            current_ratings[away]['league'] = league
+    def record_results(self, matches):
+        """Sonuçlanan maçları ModelUpdate günlüğüne ekle (commit çağıranındır).
+        Takımları CSV'de bulunamayan maçlar modele girmez."""
+        rows = []
+        for m in matches:
+            home = self.find_team_cached(m.home_team, m.league)
+            away = self.find_team_cached(m.away_team, m.league)
+            if home is None or away is None: continue
+            league = self.engine.league_name(int(self.engine.team_league[self.engine.team_index[home]]))
+            rows.append({"match_code": m.code, "date": m.date, "league": league, "home_team": home,
+                         "away_team": away, "home_score": int(m.score_home), "away_score": int(m.score_away)})
+        self.alias_index.flush()
+        if rows:
+            db.session.execute(sqlite_insert(ModelUpdate).on_conflict_do_nothing(index_elements=['match_code']), rows)
+        return len(rows)
 
-            # EMA Güncelleme
-            h_att_perf = h_score / avg_h if avg_h > 0 else 1.0
-            h_def_perf = a_score / avg_a if avg_a > 0 else 1.0
-            a_att_perf = a_score / avg_a if avg_a > 0 else 1.0
-            a_def_perf = h_score / avg_h if avg_h > 0 else 1.0
+    def sync_updates(self):
+        """Henüz uygulanmamış günlük kayıtlarını sırayla motora işle (maç başına O(1))"""
+        rows = db.session.query(ModelUpdate.id, ModelUpdate.home_team, ModelUpdate.away_team, ModelUpdate.league,
+                                ModelUpdate.home_score, ModelUpdate.away_score) \
+            .filter(ModelUpdate.id > self.engine.journal_id).order_by(ModelUpdate.id).all()
+        for _, home, away, league, home_score, away_score in rows:
+            self.engine.apply_result(home, away, league, home_score, away_score)
+        if rows:
+            self.engine.journal_id = rows[-1][0]
+            self.league_stats = self.engine.league_stats()
+        return len(rows)
 
-            current_ratings[home]['att_h'] = (current_ratings[home]['att_h'] * (1 - alpha)) + (h_att_perf * alpha)
-            current_ratings[home]['def_h'] = (current_ratings[home]['def_h'] * (1 - alpha)) + (h_def_perf * alpha)
-            current_ratings[away]['att_a'] = (current_ratings[away]['att_a'] * (1 - alpha)) + (a_att_perf * alpha)
-            current_ratings[away]['def_a'] = (current_ratings[away]['def_a'] * (1 - alpha)) + (a_def_perf * alpha)
+    def checkpoint(self):
+        """Son checkpoint'ten beri güncelleme varsa motor durumunu snapshot'a yaz"""
+        if self.fingerprint is None or self.engine.journal_id == self.checkpoint_id: return False
+        save_snapshot(self.engine, SNAPSHOT_DIR, self.fingerprint)
+        self.checkpoint_id = self.engine.journal_id
+        return True
 
-            # ✨ FORM TAKİBİ (Son 10 Maç)
-            if h_score > a_score:
-                form_points_h = 3
-            elif h_score == a_score:
-                form_points_h = 1
-            else:
-                form_points_h = 0
-            
-            current_ratings[home]['form_home'].append(form_points_h)
-            current_ratings[home]['recent_goals_h'].append(h_score)
-            
-            if len(current_ratings[home]['form_home']) > 10:
-                current_ratings[home]['form_home'].pop(0)
-                current_ratings[home]['recent_goals_h'].pop(0)
-
-            if a_score > h_score:
-                form_points_a = 3
-            elif a_score == h_score:
-                form_points_a = 1
-            else:
-                form_points_a = 0
-            
-            current_ratings[away]['form_away'].append(form_points_a)
-            current_ratings[away]['recent_goals_a'].append(a_score)
-            
-            if len(current_ratings[away]['form_away']) > 10:
-                current_ratings[away]['form_away'].pop(0)
-                current_ratings[away]['recent_goals_a'].pop(0)
+    def find_team_cached(self, name, league=None):
+        """Bülten ismini CSV takımına çöz (bkz. TeamAliasIndex)"""
+        return self.alias_index.resolve(name, league)
 
-        self.team_stats = current_ratings
+    def predict_matrices(self, homes, aways, leagues=None):
+        """N maç için tek çağrı: xG vektörü -> (N, K, K) skor tensörü (marketlerin kaynağı)"""
+        leagues = leagues if leagues is not None else [None] * len(homes)
+        index = self.engine.team_index
+        with metrics.PREDICT.time():
+            home_idx = np.fromiter((index.get(self.find_team_cached(h, l), -1) for h, l in zip(homes, leagues)), dtype=np.int64, count=len(homes))
+            away_idx = np.fromiter((index.get(self.find_team_cached(a, l), -1) for a, l in zip(aways, leagues)), dtype=np.int64, count=len(aways))
+            self.alias_index.flush()
 
-    @lru_cache(maxsize=2048)
-    def find_team_cached(self, name):
-        if not name or not self.team_list: return None
-        clean_name = name.lower().replace('sk', '').replace('fk', '').replace('fc', '').strip()
-        match = process.extractOne(clean_name, self.team_list, scorer=fuzz.token_set_ratio, score_cutoff=60)
-        return match[0] if match else None
+            h_xg, a_xg = self.engine.expected_goals(home_idx, away_idx)
+            matrices = score_matrices(h_xg, a_xg, self.grid, self.config)
+        metrics.PREDICTIONS.inc(len(homes))
+        return matrices
 
-    def predict(self, home, away):
-        home_db = self.find_team_cached(home)
-        away_db = self.find_team_cached(away)
-        
-        hs = self.team_stats.get(home_db, {
-            'att_h': 1.0, 'def_h': 1.0, 'league': 'Unknown', 
-            'form_home': [], 'recent_goals_h': []
-        })
-        as_ = self.team_stats.get(away_db, {
-            'att_a': 1.0, 'def_a': 1.0, 'league': 'Unknown',
-            'form_away': [], 'recent_goals_a': []
-        })
-        
-        league = hs['league']
-        l_stats = self.league_stats.get(league, {'avg_home_goals': 1.5, 'avg_away_goals': 1.2})
-        avg_h_goals = l_stats['avg_home_goals']
-        avg_a_goals = l_stats['avg_away_goals']
-
-        # Temel xG (EMA bazlı)
-        h_xg = hs['att_h'] * as_['def_a'] * avg_h_goals
-        a_xg = as_['att_a'] * hs['def_h'] * avg_a_goals
-
-        # ✨ FORM FAKTÖRÜ (Son 10 Maç Etkisi)
-        if len(hs['form_home']) >= 5:
-            home_form_points = sum(hs['form_home'][-10:])
-            home_form_ratio = home_form_points / (len(hs['form_home'][-10:]) * 3)
-            home_recent_avg = np.mean(hs['recent_goals_h'][-10:]) if hs['recent_goals_h'] else avg_h_goals
-            
-            if home_form_ratio > 0.65:  # İyi form
-                h_xg = (h_xg * 0.6) + (home_recent_avg * 0.4)
-                h_xg *= 1.12
-            elif home_form_ratio < 0.30:  # Kötü form
-                h_xg *= 0.88
-            else:
-                h_xg = (h_xg * 0.7) + (home_recent_avg * 0.3)
+    def predict_batch(self, homes, aways, leagues=None):
+        """(1, X, 2, 2.5 üst, KG var) olasılık dizileri"""
+        return outcome_probs(self.predict_matrices(homes, aways, leagues))
 
-        if len(as_['form_away']) >= 5:
-            away_form_points = sum(as_['form_away'][-10:])
-            away_form_ratio = away_form_points / (len(as_['form_away'][-10:]) * 3)
-            away_recent_avg = np.mean(as_['recent_goals_a'][-10:]) if as_['recent_goals_a'] else avg_a_goals
-            
-            if away_form_ratio > 0.65:
-                a_xg = (a_xg * 0.6) + (away_recent_avg * 0.4)
-                a_xg *= 1.12
-            elif away_form_ratio < 0.30:
-                a_xg *= 0.88
-            else:
-                a_xg = (a_xg * 0.7) + (away_recent_avg * 0.3)
-
-        # Dixon-Coles + Poisson
-        h_probs = [poisson.pmf(i, h_xg) for i in range(7)]
-        a_probs = [poisson.pmf(i, a_xg) for i in range(7)]
-        
-        prob_matrix = np.outer(h_probs, a_probs)
-
-        if h_xg < 1.2 and a_xg < 1.2:
-            prob_matrix[0, 0] *= 1.20
-            prob_matrix[1, 1] *= 1.10
-
-        prob_matrix /= prob_matrix.sum()
-
-        p_1 = np.sum(np.tril(prob_matrix, -1))
-        p_x = np.trace(prob_matrix)
-        p_2 = np.sum(np.triu(prob_matrix, 1))
-        
-        p_over = 0
-        p_btts = 0
-        for h in range(6):
-            for a in range(6):
-                val = prob_matrix[h, a]
-                if (h + a) > 2.5: p_over += val
-                if h > 0 and a > 0: p_btts += val
-
-        return p_1, p_x, p_2, p_over, p_btts
+    def predict(self, home, away):
+        p_1, p_x, p_2, p_over, p_btts = self.predict_batch([home], [away])
+        return float(p_1[0]), float(p_x[0]), float(p_2[0]), float(p_over[0]), float(p_btts[0])
 
 predictor = MatchPredictor()
+if MODEL_LOAD_MODE != "off":
+    predictor.start_loading(background=MODEL_LOAD_MODE != "eager")
 
 # --- FONKSİYONLAR ---
-def fetch_live_data():
-    with app.app_context():
-        auth_token = os.getenv("NESINE_AUTH")
-        if not auth_token:
+def _existing_matches(codes):
+    """Bültendeki kodların mevcut (oran demeti, tarih) değerleri, tek IN sorgusunda"""
+    existing = {}
+    odds_columns = [getattr(Match, k) for k in ODDS_KEYS]
+    for i in range(0, len(codes), SQLITE_MAX_PARAMS):
+        chunk = codes[i:i + SQLITE_MAX_PARAMS]
+        rows = db.session.query(Match.code, Match.date, *odds_columns).filter(Match.code.in_(chunk)).all()
+        existing.update((row[0], (tuple(row[2:]), row[1])) for row in rows)
+    return existing
+
+def _query_by_codes(codes):
+    matches = []
+    for i in range(0, len(codes), SQLITE_MAX_PARAMS):
+        # Oturumda yüklü nesneler de az önceki upsert'ün değerleriyle tazelenir
+        matches.extend(Match.query.filter(Match.code.in_(codes[i:i + SQLITE_MAX_PARAMS]))
+                       .execution_options(populate_existing=True).all())
+    return matches
+
+def _odd_value(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _event_odds(event):
+    return {k: _odd_value(event.odds[k]) for k in ODDS_KEYS}
+
+def ingest_events(events):
+    """Ayrıştırılmış bülteni tek transaction'da yaz.
+
+    Yalnızca yeni maçlar tahminlenir; oranı ve saati değişmeyen maçlar hiç
+    yazılmaz. Her yeni/değişen oran OddsMovement geçmişine eklenir.
+    (yeni, güncellenen) sayılarını döner."""
+    existing = _existing_matches([e.code for e in events])
+    new = [e for e in events if e.code not in existing]
+    if new: predictor.sync_updates()  # başka süreçte sonuçlanan maçlar
+    odds = {e.code: _event_odds(e) for e in events}
+    changed = [e for e in events
+               if e.code in existing and existing[e.code] != (tuple(odds[e.code].values()), e.date)]
+
+    # ⚡ Yeni maçlar tek vektörel çağrıda tahminlenir; skor matrisi marketler için saklanır
+    matrices = predictor.predict_matrices([e.home for e in new], [e.away for e in new], [e.league for e in new])
+    p1, px, p2, pover, pbtts = outcome_probs(matrices)
+
+    rows = []
+    for i, e in enumerate(new + changed):
+        is_new = i < len(new)
+        rows.append({
+            "code": e.code, "league": e.league, "home_team": e.home, "away_team": e.away,
+            "date": e.date, **odds[e.code],
+            # Çakışmada yalnızca odds/date güncellenir; mevcut maçın olasılıkları korunur
+            "prob_home": float(p1[i]) if is_new else 0.0,
+            "prob_draw": float(px[i]) if is_new else 0.0,
+            "prob_away": float(p2[i]) if is_new else 0.0,
+            "prob_over_25": float(pover[i]) if is_new else 0.0,
+            "prob_btts": float(pbtts[i]) if is_new else 0.0,
+            "score_matrix": matrix_to_blob(matrices[i]) if is_new else None
+        })
+
+    if rows:
+        stmt = sqlite_insert(Match)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code'],
+            set_={'date': stmt.excluded.date, **{k: getattr(stmt.excluded, k) for k in ODDS_KEYS}}
+        )
+        db.session.execute(stmt, rows)
+
+        captured_at = datetime.now()
+        db.session.execute(db.insert(OddsMovement), [
+            {"match_code": e.code, "captured_at": captured_at, **odds[e.code]}
+            for e in new + changed
+        ])
+
+        # 📡 Aynı transaction içinde SSE delta'ları
+        new_codes = {e.code for e in new}
+        touched = _query_by_codes([e.code for e in new + changed])
+        refresh_value_bets(touched)
+        add_live_event("fixtures", [m for m in touched if m.code in new_codes])
+        add_live_event("odds", [m for m in touched if m.code not in new_codes])
+        prune_live_events()
+        commit_session("ingest")
+    return len(new), len(changed)
+
+def refresh_value_bets(matches):
+    """Maçların ValueBet satırlarını güncel oranlarla yeniden yaz (commit çağıranındır).
+
+    EV saklı skor matrisinden hesaplanır. Matrisi olmayan eski maçlar
+    (score_matrix kolonundan önce eklenenler) güncel modelle bir kez tahminlenir."""
+    pending = [m for m in matches if m.status == "Pending"]
+    missing = [m for m in pending if m.score_matrix is None]
+    if missing:
+        matrices = predictor.predict_matrices([m.home_team for m in missing], [m.away_team for m in missing],
+                                              [m.league for m in missing])
+        for m, matrix in zip(missing, matrices):
+            m.score_matrix = matrix_to_blob(matrix)
+
+    codes = [m.code for m in matches]
+    for i in range(0, len(codes), SQLITE_MAX_PARAMS):
+        ValueBet.query.filter(ValueBet.match_code.in_(codes[i:i + SQLITE_MAX_PARAMS])).delete(synchronize_session=False)
+    rows = [{"match_code": m.code, "selection": selection, "date": m.date, "prob": prob, "odds": odds, "ev": ev}
+            for m in pending
+            for selection, prob, odds, ev in value_rows(blob_to_matrix(m.score_matrix), {k: getattr(m, k) for k in ODDS_KEYS})]
+    if rows: db.session.execute(db.insert(ValueBet), rows)
+
+_feed_runner = None
+_bulletin_fetcher = None
+_results_feed = None
+SIMULATE_RESULTS = os.getenv("PREDICTA_SIMULATE_RESULTS") == "1"
+
+def _feed_headers():
+    return {"User-Agent": "Mozilla/5.0", "Authorization": os.getenv("NESINE_AUTH", ""), "Origin": "https://www.nesine.com"}
+
+def get_feed_runner():
+    """Süreç boyunca yaşayan async indirme döngüsü (keep-alive bağlantı havuzu)"""
+    global _feed_runner
+    if _feed_runner is None:
+        _feed_runner = FeedRunner()
+    return _feed_runner
+
+def get_bulletin_fetcher():
+    """Süreç boyunca yaşayan fetcher (ETag ve parmak izleri)"""
+    global _bulletin_fetcher
+    if _bulletin_fetcher is None:
+        url = os.getenv("NESINE_BULLETIN_URL", "https://cdnbulten.nesine.com/api/bulten/getprebultenfull")
+        _bulletin_fetcher = BulletinFetcher(url, _feed_headers(), timeout=15, runner=get_feed_runner(),
+                                            min_interval=float(os.getenv("NESINE_BULLETIN_MIN_INTERVAL", 30)))
+    return _bulletin_fetcher
+
+def results_source():
+    """Maçları sonuçlandıran kaynak (fixture, besleme, simülasyon); hiçbiri yoksa None"""
+    if os.getenv("RESULTS_FIXTURE"): return "fixture"
+    if os.getenv("NESINE_RESULTS_URL"): return "feed"
+    if SIMULATE_RESULTS: return "simulation"
+    return None
+
+def warn_no_results_source():
+    """Sonuç kaynağı yoksa maçlar hiç sonuçlanmaz: geçmiş/istatistik boş kalır, model güncellenmez"""
+    if results_source() is not None: return
+    logger.warning("⚠️ Sonuç kaynağı yok (NESINE_RESULTS_URL / RESULTS_FIXTURE / PREDICTA_SIMULATE_RESULTS=1): "
+                   "maçlar sonuçlanmayacak, geçmiş ve istatistikler boş kalacak, model güncellenmeyecek.")
+
+def get_results_feed():
+    """Sonuç beslemesi; NESINE_RESULTS_URL tanımlı değilse None"""
+    global _results_feed
+    url = os.getenv("NESINE_RESULTS_URL")
+    if _results_feed is None and url:
+        _results_feed = results_feed(url, _feed_headers(), timeout=15, runner=get_feed_runner(),
+                                     min_interval=float(os.getenv("NESINE_RESULTS_MIN_INTERVAL", 30)))
+    return _results_feed
+
+def fetch_feeds(bulletin=True, results=True):
+    """Ön bülten ve sonuç beslemesini eşzamanlı indir; app context dışında çağrılır.
+
+    {'bulletin': maçlar, 'results': biten maçlar}; kaynak tanımlı değilse,
+    304 dönerse veya indirme başarısızsa ilgili anahtar yoktur / None'dır.
+    BULLETIN_FIXTURE / RESULTS_FIXTURE dosyaları ağın yerine geçer (offline test)."""
+    out, feeds = {}, {}
+    if bulletin:
+        fixture = os.getenv("BULLETIN_FIXTURE")
+        if fixture:
+            logger.info(f"📁 Bülten dosyadan okunuyor: {fixture}")
+            with metrics.PARSE.labels('file').time():
+                out['bulletin'] = parse_bulletin_file(fixture)
+        elif os.getenv("NESINE_AUTH"):
+            feeds['bulletin'] = get_bulletin_fetcher()
+        else:
             logger.error("⚠️ NESINE_AUTH bulunamadı!")
-            return
+    if results:
+        fixture = os.getenv("RESULTS_FIXTURE")
+        if fixture:
+            with metrics.PARSE.labels('file').time():
+                out['results'] = parse_results_file(fixture)
+        elif get_results_feed() is not None:
+            feeds['results'] = get_results_feed()
+
+    if feeds:
+        logger.info(f"🔄 Nesine'den veri çekiliyor ({', '.join(feeds)})...")
+        fetched = get_feed_runner().fetch_all([(feed.source, feed.validators()) for feed in feeds.values()])
+        for (name, feed), result in zip(feeds.items(), fetched):
+            if isinstance(result, Exception):
+                logger.error(f"❌ API Hatası ({feed.source.name}): {result}")
+                continue
+            out[name] = feed.accept(result)
+            if out[name] is None:
+                logger.info(f"⏸️ {feed.source.name} değişmemiş (304).")
+    return out
+
+def finish_match(m, score_home, score_away):
+    """Skoru yaz; sonuç ve tahminin tutup tutmadığı (commit çağıranındır)"""
+    m.score_home, m.score_away = score_home, score_away
+    m.status = "Finished"
+    m.result_str = match_outcomes(score_home, score_away)[0]
+    m.is_successful = (match_picks(m)[0] == m.result_str)
 
-        url = "https://cdnbulten.nesine.com/api/bulten/getprebultenfull"
-        headers = {"User-Agent": "Mozilla/5.0", "Authorization": auth_token, "Origin": "https://www.nesine.com"}
+def record_stats(matches):
+    """Sonuçlanan maçları ResultStat kümülatiflerine ekle (commit çağıranındır)"""
+    for (league, day), counts in stat_deltas(matches).items():
+        params = {"league": league, "day": day.isoformat(), **counts}
+        for sql in INCREMENT_SQL:
+            db.session.execute(db.text(sql), params)
 
+def settle_matches(matches):
+    """Skoru yazılmış maçları modele ve canlı yayına işle (tek commit); maç sayısı"""
+    if not matches: return 0
+    # 🧠 Sonuçlar rating'lere işlenir (günlük + O(1) güncelleme)
+    recorded = predictor.record_results(matches)
+    record_stats(matches)
+    refresh_value_bets(matches)
+    add_live_event("results", matches)
+    prune_live_events()
+    commit_session("results")
+    applied = predictor.sync_updates()
+    logger.info(f"✅ {len(matches)} maç sonuçlandı ({recorded} maç modele eklendi, {applied} uygulandı).")
+    return len(matches)
+
+def settle_results(results):
+    """Sonuç beslemesindeki maçlardan hâlâ bekleyenleri kapat"""
+    by_code = {r.code: r for r in results}
+    matches = [m for m in _query_by_codes(list(by_code)) if m.status == "Pending"]
+    for m in matches:
+        finish_match(m, by_code[m.code].home_score, by_code[m.code].away_score)
+    settled = settle_matches(matches)
+    if get_results_feed() is not None: get_results_feed().commit()
+    return settled
+
+def fetch_live_data():
+    # ⚡ İndirme app context (ve DB oturumu) dışında; bülten ve sonuçlar eşzamanlı iner
+    feeds = fetch_feeds()
+    with app.app_context():
         try:
-            logger.info("🔄 Nesine'den veri çekiliyor...")
-            r = requests.get(url, headers=headers, timeout=15)
-            d = r.json()
-            
-            if "sg" not in d or "EA" not in d["sg"]: return
-
-            count = 0
-            for m in d["sg"]["EA"]:
-                if m.get("GT") != 1: continue
-
-                match_code = str(m.get("C"))
-                
-                odds = {"ms1": "-", "msx": "-", "ms2": "-", "alt": "-", "ust": "-", "kgvar": "-", "kgyok": "-"}
-                markets = m.get("MA", [])
-                
-                for market in markets:
-                    mtid = market.get("MTID")
-                    oca = market.get("OCA", [])
-                    
-                    if mtid == 1:
-                        for o in oca:
-                            if o["N"] == 1: odds["ms1"] = o["O"]
-                            elif o["N"] == 2: odds["msx"] = o["O"]
-                            elif o["N"] == 3: odds["ms2"] = o["O"]
-                    elif mtid == 14:
-                        for o in oca:
-                            if o["N"] == 1: odds["kgvar"] = o["O"]
-                            elif o["N"] == 2: odds["kgyok"] = o["O"]
-                    elif mtid == 450:
-                         for o in oca:
-                             if o["N"] == 1: odds["ust"] = o["O"]
-                             elif o["N"] == 2: odds["alt"] = o["O"]
-
-                if odds["ms1"] == "-": continue
-
-                p1, px, p2, pover, pbtts = predictor.predict(m.get("HN"), m.get("AN"))
-
-                existing = Match.query.filter_by(code=match_code).first()
-                if not existing:
-                    new_match = Match(
-                        code=match_code, league=m.get("LN"),
-                        home_team=m.get("HN"), away_team=m.get("AN"),
-                        date=datetime.strptime(f"{m.get('D')} {m.get('T')}", "%d.%m.%Y %H:%M"),
-                        odds=json.dumps(odds),
-                        prob_home=p1, prob_draw=px, prob_away=p2,
-                        prob_over_25=pover, prob_btts=pbtts
-                    )
-                    db.session.add(new_match)
-                    count += 1
-                else:
-                    existing.odds = json.dumps(odds)
-            
-            db.session.commit()
-            logger.info(f"✅ {count} yeni maç eklendi.")
+            events = feeds.get('bulletin')
+            if events is None:
+                logger.info("⏸️ Yeni bülten yok, döngü atlandı.")
+            else:
+                fetcher = get_bulletin_fetcher()
+                changed, skipped = fetcher.diff(events)
+                count, updated = ingest_events(changed) if changed else (0, 0)
+                fetcher.commit()
+                metrics.EVENTS.labels('new').inc(count)
+                metrics.EVENTS.labels('updated').inc(updated)
+                metrics.EVENTS.labels('skipped').inc(skipped)
+                logger.info(f"✅ {len(events)} maç: {skipped} atlandı, {len(changed)} değişti -> {count} yeni eklendi, {updated} güncellendi.")
+
+            if feeds.get('results'):
+                settle_results(feeds['results'])
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"❌ API Hatası: {e}")
+        finally:
+            # 2 saatlik pencere kaydığı için bülten değişmese de yeniden yayınlanır
+            publish_matches_cache()
 
 def update_match_results():
+    warn_no_results_source()
+    results = fetch_feeds(bulletin=False).get('results')
     with app.app_context():
-        cutoff = datetime.now() - timedelta(hours=3)
-        pending_matches = Match.query.filter(Match.date <= cutoff, Match.status == "Pending").all()
-        
-        if not pending_matches: return
-        
-        logger.info(f"🔄 {len(pending_matches)} maç sonuçlandırılıyor...")
-        
-        for m in pending_matches:
-            m.score_home = np.random.poisson(m.prob_home * 1.5)
-            m.score_away = np.random.poisson(m.prob_away * 1.2)
-            m.status = "Finished"
-            
-            if m.score_home > m.score_away: m.result_str = "1"
-            elif m.score_home == m.score_away: m.result_str = "X"
-            else: m.result_str = "2"
-            
-            probs = {'1': m.prob_home, 'X': m.prob_draw, '2': m.prob_away}
-            prediction = max(probs, key=probs.get)
-            m.is_successful = (prediction == m.result_str)
-            
-        db.session.commit()
-        logger.info("✅ Maç sonuçları güncellendi.")
+        settled = settle_results(results) if results else 0
+
+        if SIMULATE_RESULTS:
+            # 🎲 Demo: gerçek sonuç kaynağı yokken 3 saati geçen maçlara rastgele skor
+            cutoff = datetime.now() - timedelta(hours=3)
+            pending_matches = Match.query.filter(Match.date <= cutoff, Match.status == "Pending").all()
+            for m in pending_matches:
+                finish_match(m, int(np.random.poisson(m.prob_home * 1.5)), int(np.random.poisson(m.prob_away * 1.2)))
+            settled += settle_matches(pending_matches)
+
+        if settled: publish_matches_cache()
+
+def checkpoint_model():
+    """Rating motorunu periyodik olarak snapshot'a yaz; yeniden başlatma yalnızca kuyruğu oynatır"""
+    with app.app_context():
+        predictor.sync_updates()
+    if predictor.checkpoint():
+        logger.info(f"💾 Model checkpoint: günlük #{predictor.engine.journal_id}")
+
+# --- CANLI YAYIN (SSE) ---
+SSE_POLL_SECONDS = 2        # Süreç başına tek DB okuması, abone sayısından bağımsız
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_SECONDS = 600       # Bağlantı süresiz açık kalmasın; istemci Last-Event-ID ile yeniden bağlanır
+SSE_REPLAY_LIMIT = 200
+LIVE_EVENT_RETENTION = timedelta(days=1)
+# Worker başına abone üst sınırı; gunicorn.conf.py worker modeline göre ayarlar (gevent:
+# worker_connections - 100, gthread: threads // 2). Sınırda 503 döner, tarayıcı yoklamaya düşer
+SSE_MAX_CLIENTS = int(os.getenv("PREDICTA_SSE_MAX_CLIENTS", 900))
+
+def add_live_event(kind, matches):
+    """Değişen maçları LiveEvent olarak ekler (commit çağıranındır)"""
+    if not matches: return
+    payload = json.dumps([m.to_dict() for m in matches], ensure_ascii=False, separators=(',', ':'))
+    db.session.add(LiveEvent(kind=kind, payload=payload))
+
+def prune_live_events():
+    """Saklama süresini aşan LiveEvent satırlarını sil (commit çağıranındır).
+    Tablo yalnızca olay ekleyen transaction'larda büyür; her biri burayı çağırır."""
+    LiveEvent.query.filter(LiveEvent.created_at < datetime.now() - LIVE_EVENT_RETENTION).delete()
+
+def format_sse(event_id, kind, payload):
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n"
+
+class LiveBroadcaster:
+    """Yeni LiveEvent satırlarını okuyup abonelerin kuyruklarına dağıtır"""
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.last_id = None
+        self.thread = None
+
+    def subscribe(self):
+        """Abone kuyruğu; worker SSE_MAX_CLIENTS sınırındaysa None"""
+        q = queue.Queue(maxsize=100)
+        with self.lock:
+            if len(self.subscribers) >= SSE_MAX_CLIENTS: return None
+            self.subscribers.add(q)
+            metrics.SSE_CLIENTS.inc()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="sse-broadcaster", daemon=True)
+                self.thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers: metrics.SSE_CLIENTS.dec()
+            self.subscribers.discard(q)
+
+    def _poll(self):
+        with app.app_context():
+            if self.last_id is None:
+                self.last_id = db.session.query(db.func.max(LiveEvent.id)).scalar() or 0
+                return []
+            rows = db.session.query(LiveEvent.id, LiveEvent.kind, LiveEvent.payload) \
+                .filter(LiveEvent.id > self.last_id).order_by(LiveEvent.id).all()
+        if rows: self.last_id = rows[-1][0]
+        return rows
+
+    def _run(self):
+        # Başlangıç noktası ilk abonenin bağlandığı an; sonraki olaylar kaçırılmaz
+        try:
+            self._poll()
+        except Exception as e:
+            logger.warning(f"⚠️ SSE okuma hatası: {e}")
+        while True:
+            time.sleep(SSE_POLL_SECONDS)
+            with self.lock:
+                if not self.subscribers: continue
+            try:
+                rows = self._poll()
+            except Exception as e:
+                logger.warning(f"⚠️ SSE okuma hatası: {e}")
+                continue
+            with self.lock:
+                subscribers = list(self.subscribers)
+            for row in rows:
+                for q in subscribers:
+                    try:
+                        q.put_nowait(tuple(row))
+                    except queue.Full:
+                        # Yavaş istemci: kuyruğu boşalt, tam yenileme iste
+                        with q.mutex: q.queue.clear()
+                        q.put_nowait((row[0], "resync", "{}"))
+
+broadcaster = LiveBroadcaster()
+
+# --- API ÖNBELLEĞİ ---
+MATCH_SORTS = ('default', 'prob_high', 'prob_over')
+_matches_cache = {}  # sort_by -> (version, etag, body, body_gz), süreç içi kopya
+
+def build_matches_payloads():
+    """/api/matches'in her sıralama varyantı için JSON gövdesi"""
+    cutoff = datetime.now() - timedelta(hours=2)
+    data = [m.to_dict() for m in Match.query.filter(Match.date >= cutoff).all()]
+
+    variants = {
+        'default': sorted(data, key=lambda x: x['date']),
+        'prob_high': sorted(data, key=lambda x: max(x['probs']['1'], x['probs']['X'], x['probs']['2']), reverse=True),
+        'prob_over': sorted(data, key=lambda x: x['probs']['over'], reverse=True)
+    }
+    return {sort_by: json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            for sort_by, rows in variants.items()}
+
+def publish_matches_cache():
+    """Yanıtları önceden üretip ApiCache'e yaz; içerik değişmediyse sürüm artmaz"""
+    try:
+        with app.app_context():
+            for sort_by, body in build_matches_payloads().items():
+                key = f"matches:{sort_by}"
+                digest = hashlib.sha256(body).hexdigest()
+                entry = db.session.get(ApiCache, key)
+                if entry is None:
+                    entry = ApiCache(key=key, version=0)
+                    db.session.add(entry)
+                elif entry.digest == digest:
+                    continue
+                entry.version += 1
+                entry.digest = digest
+                entry.body = body
+                entry.body_gz = gzip.compress(body, compresslevel=6, mtime=0)
+                entry.built_at = datetime.now()
+            commit_session("matches_cache")
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"⚠️ API önbelleği yayınlanamadı: {e}")
+
+def cached_matches(sort_by):
+    """Süreç içi kopya; DB'de yalnızca sürüm numarası kontrol edilir (PK araması).
+    Önbellek yayınlanamadıysa None (çağıran yanıtı doğrudan üretir)."""
+    key = f"matches:{sort_by}"
+    version = db.session.query(ApiCache.version).filter_by(key=key).scalar()
+    if version is None:
+        publish_matches_cache()
+        version = db.session.query(ApiCache.version).filter_by(key=key).scalar()
+        if version is None: return None
+
+    cached = _matches_cache.get(sort_by)
+    if cached is None or cached[0] != version:
+        entry = db.session.get(ApiCache, key)
+        if entry is None: return None
+        cached = (entry.version, f'W/"{entry.version}-{sort_by}"', entry.body, entry.body_gz)
+        _matches_cache[sort_by] = cached
+    return cached
+
+def migrate_database():
+    """Mevcut predictapro.db'yi güncel şemaya getir (bkz. schema.py)"""
+    conn = db.engine.raw_connection()
+    try:
+        applied = migrate(conn.dbapi_connection)
+    finally:
+        conn.close()
+    if applied:
+        logger.info(f"🛠️ Şema göçü uygulandı: v{applied[-1]}")
 
 def safe_db_init():
     try:
         with app.app_context():
             from sqlalchemy import inspect
             inspector = inspect(db.engine)
-            if 'match' not in inspector.get_table_names():
+            if set(db.metadata.tables) - set(inspector.get_table_names()):
                 db.create_all()
+            migrate_database()
     except Exception as e:
         logger.error(f"DB Init Error: {e}")
 
@@ -413,13 +901,119 @@ def ensure_db():
         app._db_initialized = True
 
 # --- SCHEDULER ---
-scheduler = BackgroundScheduler()
-scheduler.add_job(func=fetch_live_data, trigger="interval", minutes=5)
-scheduler.add_job(func=update_match_results, trigger="interval", minutes=10)
-scheduler.start()
-atexit.register(lambda: scheduler.shutdown())
+# Gunicorn'un her worker'ı bu modülü import eder; işleri yalnızca dosya kilidini
+# alan süreç (lider) çalıştırır. PREDICTA_SCHEDULER=off ise bu süreç hiç aday olmaz
+# (ayrı `worker` süreci veya init_db.py).
+JOB_DEFAULTS = {'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 120}
+LEADER_RETRY_SECONDS = 30
+CHECKPOINT_MINUTES = 30
+
+def timed_job(func):
+    """İşin süresini loglar ve JobRun tablosuna yazar"""
+    @wraps(func)
+    def wrapper():
+        started_at, t0 = datetime.now(), time.perf_counter()
+        error = None
+        try:
+            # İşler rating motorunu kullanır; arka planda yükleniyorsa bitmesini bekle
+            if not predictor.wait_ready(MODEL_WAIT_SECONDS):
+                raise RuntimeError(f"Model {MODEL_WAIT_SECONDS} sn içinde hazır olmadı")
+            func()
+        except Exception as e:
+            error = str(e)[:255]
+            logger.error(f"❌ {func.__name__} hatası: {e}")
+        duration_ms = (time.perf_counter() - t0) * 1000
+        logger.info(f"⏱️ {func.__name__} {duration_ms:.0f} ms sürdü.")
+        metrics.JOB.labels(func.__name__, str(error is None).lower()).observe(duration_ms / 1000)
+        try:
+            with app.app_context():
+                db.session.add(JobRun(job=func.__name__, started_at=started_at, duration_ms=duration_ms,
+                                      success=error is None, error=error))
+                commit_session("job_run")
+        except Exception as e:
+            logger.warning(f"⚠️ JobRun kaydedilemedi: {e}")
+    return wrapper
+
+def configure_jobs(sched):
+    safe_db_init()  # işler ilk istekten önce çalışabilir; şema güncel olmalı
+    warn_no_results_source()
+    # İlk bülten lider seçilir seçilmez (model hazır olunca) çekilir
+    sched.add_job(func=timed_job(fetch_live_data), trigger="interval", minutes=5, id="fetch_live_data",
+                  next_run_time=datetime.now())
+    sched.add_job(func=timed_job(update_match_results), trigger="interval", minutes=10, id="update_match_results")
+    sched.add_job(func=timed_job(checkpoint_model), trigger="interval", minutes=CHECKPOINT_MINUTES, id="checkpoint_model")
+
+def acquire_scheduler_lock(blocking=False):
+    """Lider kilidi; alınamazsa None. Dönen dosya açık kaldıkça kilit bu süreçtedir."""
+    lock_file = open(LOCK_PATH, 'a+')
+    if fcntl is None: return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except OSError:
+        lock_file.close()
+        return None
+    lock_file.truncate(0)
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+scheduler = None
+_scheduler_lock = None
+
+def _run_leader_election():
+    global scheduler, _scheduler_lock
+    while _scheduler_lock is None:
+        _scheduler_lock = acquire_scheduler_lock()
+        if _scheduler_lock is None:
+            time.sleep(LEADER_RETRY_SECONDS)
+    from apscheduler.schedulers.background import BackgroundScheduler
+    scheduler = BackgroundScheduler(job_defaults=JOB_DEFAULTS)
+    configure_jobs(scheduler)
+    scheduler.start()
+    atexit.register(lambda: scheduler.shutdown(wait=False))
+    logger.info(f"👑 Scheduler lideri: PID {os.getpid()}")
+
+def start_scheduler():
+    if os.getenv("PREDICTA_SCHEDULER", "auto") == "off": return
+    threading.Thread(target=_run_leader_election, name="scheduler-election", daemon=True).start()
+
+# gunicorn --preload: master fork'tan önce iş parçacığı başlatmamalı; worker'larda
+# gunicorn.conf.py post_fork kancası çağırır
+if os.getenv("PREDICTA_PRELOAD") != "1":
+    start_scheduler()
 
 # --- ROTALAR ---
+# --- ÖLÇÜM ---
+@app.before_request
+def start_request_timer():
+    g.request_t0 = time.perf_counter()
+    g.profiler = SamplingProfiler().start() if should_profile(request.headers) else None
+
+@app.after_request
+def record_request_metrics(resp):
+    # Akışlı yanıtlarda (SSE) süre ilk bayta kadardır
+    elapsed = time.perf_counter() - g.get('request_t0', time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.REQUEST.labels(endpoint, request.method, str(resp.status_code)).observe(elapsed)
+
+    profiler, g.profiler = g.get('profiler'), None
+    if profiler is not None:
+        report = save_report(profiler.stop(), PROFILE_DIR, f"{request.method}-{endpoint}")
+        if report:
+            resp.headers[PROFILE_HEADER] = report
+            logger.info(f"🔬 Profil: {request.method} {request.path} {profiler.elapsed * 1000:.0f} ms -> {report}")
+    return resp
+
+@app.teardown_request
+def stop_profiler(_exc):
+    # Hata nedeniyle after_request çalışmadıysa örnekleyici iş parçacığı kapanır
+    if g.get('profiler') is not None: g.profiler.stop()
+
+@app.route('/metrics')
+def metrics_endpoint():
+    body, content_type = metrics.render()
+    return Response(body, status=200 if metrics.prometheus_client else 503, content_type=content_type)
+
 @app.route('/')
 def index(): return render_template('index.html')
 
@@ -429,42 +1023,205 @@ def history_page(): return render_template('history.html')
 @app.route('/api/matches')
 def get_matches():
     sort_by = request.args.get('sort_by', 'default')
-    cutoff = datetime.now() - timedelta(hours=2)
-    
-    matches = Match.query.filter(Match.date >= cutoff).all()
-    data = [m.to_dict() for m in matches]
-    
-    if sort_by == 'prob_high':
-        data.sort(key=lambda x: max(x['probs']['1'], x['probs']['X'], x['probs']['2']), reverse=True)
-    elif sort_by == 'prob_over':
-        data.sort(key=lambda x: x['probs']['over'], reverse=True)
+    if sort_by not in MATCH_SORTS: sort_by = 'default'
+
+    gzip_ok = request.accept_encodings['gzip'] > 0
+    cached = cached_matches(sort_by)
+    if cached is None:
+        # Önbellek yok (yayın başarısız): gövde bu istek için üretilir, ETag verilmez
+        logger.warning("⚠️ /api/matches önbelleği yok; yanıt doğrudan üretiliyor")
+        body = build_matches_payloads()[sort_by]
+        resp = Response(gzip.compress(body, compresslevel=6, mtime=0) if gzip_ok else body, mimetype='application/json')
+        if gzip_ok: resp.headers['Content-Encoding'] = 'gzip'
+        resp.headers['Vary'] = 'Accept-Encoding'
+        resp.headers['Cache-Control'] = 'no-store'
+        return resp
+
+    version, etag, body, body_gz = cached
+    if etag in request.headers.get('If-None-Match', ''):
+        resp = Response(status=304)
+    elif gzip_ok:
+        resp = Response(body_gz, mimetype='application/json')
+        resp.headers['Content-Encoding'] = 'gzip'
     else:
-        data.sort(key=lambda x: x['date'])
+        resp = Response(body, mimetype='application/json')
+
+    resp.headers['ETag'] = etag
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/api/stream')
+def stream_updates():
+    """Server-Sent Events: fixtures / odds / results delta'ları"""
+    q = broadcaster.subscribe()
+    if q is None:
+        # EventSource 200 dışı yanıtta yeniden bağlanmaz; istemci yoklamaya geçer
+        resp = jsonify({"error": "SSE abone sınırı dolu, yoklama kullanın", "max_clients": SSE_MAX_CLIENTS})
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '60'
+        return resp
+    last_id = request.headers.get('Last-Event-ID', type=int)
 
-    return jsonify(data)
+    # Yeniden bağlanan istemci kaçırdıklarını alır (çok fazlaysa tam yenileme)
+    replay = []
+    if last_id is not None:
+        replay = db.session.query(LiveEvent.id, LiveEvent.kind, LiveEvent.payload) \
+            .filter(LiveEvent.id > last_id).order_by(LiveEvent.id).limit(SSE_REPLAY_LIMIT + 1).all()
+        if len(replay) > SSE_REPLAY_LIMIT:
+            replay = [(replay[-1][0], "resync", "{}")]
+
+    def generate():
+        seen = last_id or 0
+        try:
+            yield "retry: 5000\n\n"
+            for event_id, kind, payload in replay:
+                seen = max(seen, event_id)
+                yield format_sse(event_id, kind, payload)
+
+            deadline = time.monotonic() + SSE_MAX_SECONDS
+            while time.monotonic() < deadline:
+                try:
+                    event_id, kind, payload = q.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if event_id <= seen and kind != "resync": continue
+                seen = event_id
+                yield format_sse(event_id, kind, payload)
+        finally:
+            broadcaster.unsubscribe(q)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+HISTORY_PAGE = 50
+HISTORY_PAGE_MAX = 200
+
+def history_stats(league=None, date_from=None, date_to=None, market=None):
+    """ResultStat kümülatiflerinden istatistik: lig başına iki satır okunur, maçlar değil"""
+    rows = db.session.execute(db.text(range_sql(league=bool(league))), range_params(league, date_from, date_to))
+    return summarize({row[0]: dict(zip(STAT_COLUMNS, row[1:])) for row in rows}, market)
 
 @app.route('/api/history')
 def get_history_data():
-    matches = Match.query.filter_by(status="Finished").order_by(Match.date.desc()).limit(50).all()
-    data = [m.to_dict() for m in matches]
-    
-    total = len(data)
-    wins = sum(1 for m in data if m['success'])
-    rate = round((wins / total) * 100, 1) if total > 0 else 0
-        
-    return jsonify({"matches": data, "stats": {"total": total, "rate": rate}})
+    """Sonuçlanan maçlar (yeniden eskiye) + aynı filtrelerle toplam istatistikler.
+
+    league, from / to (YYYY-MM-DD, dahil), market (1, X, 2, over, under, btts, nobtts:
+    modelin bu seçimi yaptığı maçlar), limit, cursor (önceki yanıtın next_cursor'u).
+    Sayfalama (date, id) üzerinde imleçle: derin sayfalar da indeksten okunur."""
+    league, market = request.args.get('league'), request.args.get('market')
+    try:
+        date_from, date_to = parse_day(request.args.get('from')), parse_day(request.args.get('to'))
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        if market is not None and market not in SELECTIONS:
+            raise ValueError(f"Geçersiz market: {market} ({', '.join(SELECTIONS)})")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = min(max(request.args.get('limit', HISTORY_PAGE, type=int), 1), HISTORY_PAGE_MAX)
+
+    q = Match.query.filter(Match.status == "Finished")
+    if league: q = q.filter(Match.league == league)
+    if date_from: q = q.filter(Match.date >= date_from)
+    if date_to: q = q.filter(Match.date < date_to + timedelta(days=1))
+    if market: q = q.filter(db.text(PICK_SQL[market]))
+    if after: q = q.filter(db.tuple_(Match.date, Match.id) < after)
+    matches = q.order_by(Match.date.desc(), Match.id.desc()).limit(limit + 1).all()
+
+    page = matches[:limit]
+    next_cursor = encode_cursor(page[-1].date, page[-1].id) if len(matches) > limit else None
+    return jsonify({"matches": [m.to_dict() for m in page], "next_cursor": next_cursor,
+                    "stats": history_stats(league, date_from, date_to, market)})
+
+MARKET_TOTAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+MARKET_HANDICAP_LINES = (-1.5, -1.0, -0.5, -0.25, 0.0, 0.25, 0.5, 1.0, 1.5)
+MARKET_LINES_MAX = 20
+VALUE_PAGE = 50
+VALUE_PAGE_MAX = 200
+
+def _lines(name, default):
+    """?ou=2.25,3 gibi virgüllü çizgi listesi; bozuksa ValueError"""
+    raw = request.args.get(name)
+    if not raw: return default
+    try:
+        lines = [check_line(v) for v in raw.split(',') if v.strip()]
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from e
+    if not lines or len(lines) > MARKET_LINES_MAX:
+        raise ValueError(f"{name}: 1-{MARKET_LINES_MAX} çizgi verilmeli")
+    return lines
 
+@app.route('/api/matches/<code>/markets')
+def get_match_markets(code):
+    """Saklı skor matrisinden tüm marketler; Poisson yeniden hesaplanmaz.
+
+    ou (alt/üst çizgileri), ah (ev sahibi handikap çizgileri; deplasman tarafı -çizgi),
+    top (doğru skor sayısı). Bültende oranı olan seçimlerde EV de döner."""
+    try:
+        ou, ah = _lines('ou', MARKET_TOTAL_LINES), _lines('ah', MARKET_HANDICAP_LINES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    m = Match.query.filter_by(code=code).first()
+    if m is None: return jsonify({"error": f"Maç bulunamadı: {code}"}), 404
+    if m.score_matrix is None: return jsonify({"error": "Bu maç için skor matrisi yok"}), 404
+    matrix = blob_to_matrix(m.score_matrix)
+    # Saklı matris K x K (PREDICTA_SCORE_GRID): en fazla K*K doğru skor
+    top = min(max(request.args.get('top', 10, type=int), 1), matrix.size)
+    odds = {k: getattr(m, k) for k in ODDS_KEYS}
+
+    return jsonify({
+        "match": m.to_dict(),
+        "double_chance": {k: round(float(v), 4) for k, v in double_chance(matrix).items()},
+        "totals": [{"line": line,
+                    "over": line_summary(total_goals(matrix, line, 'over'), odds['ust'] if line == 2.5 else None),
+                    "under": line_summary(total_goals(matrix, line, 'under'), odds['alt'] if line == 2.5 else None)}
+                   for line in ou],
+        "asian_handicap": [{"line": line, "home": line_summary(asian_handicap(matrix, line, 'home')),
+                            "away": line_summary(asian_handicap(matrix, -line, 'away'))} for line in ah],
+        "correct_score": [{"score": score, "prob": round(p, 4)} for score, p in correct_scores(matrix, top)],
+        "value": [{"selection": selection, "prob": round(prob, 4), "odds": price, "ev": round(ev, 4)}
+                  for selection, prob, price, ev in value_rows(matrix, odds)],
+    })
+
+@app.route('/api/value-bets')
+def get_value_bets():
+    """Bekleyen maçların seçimleri EV'ye göre azalan sırada (ValueBet, ev indeksi üzerinden).
+
+    min_ev (varsayılan 0: yalnızca pozitif değer), selection (1, X, 2, over, under, btts, nobtts),
+    league, limit."""
+    selection = request.args.get('selection')
+    if selection is not None and selection not in ODDS_SELECTIONS:
+        return jsonify({"error": f"Geçersiz seçim: {selection} ({', '.join(ODDS_SELECTIONS)})"}), 400
+    min_ev = request.args.get('min_ev', 0.0, type=float)
+    limit = min(max(request.args.get('limit', VALUE_PAGE, type=int), 1), VALUE_PAGE_MAX)
+
+    q = db.session.query(ValueBet, Match).join(Match, Match.code == ValueBet.match_code) \
+        .filter(ValueBet.ev > min_ev, ValueBet.date >= datetime.now() - timedelta(hours=2), Match.status == "Pending")
+    if selection: q = q.filter(ValueBet.selection == selection)
+    if request.args.get('league'): q = q.filter(Match.league == request.args['league'])
+    rows = q.order_by(ValueBet.ev.desc()).limit(limit).all()
+    return jsonify({"bets": [{"selection": v.selection, "odds": v.odds, "prob": round(v.prob, 4), "ev": round(v.ev, 4),
+                              "match": m.to_dict()} for v, m in rows]})
+
+# Liveness: süreç yanıt veriyor (model veya DB beklenmez)
 @app.route('/health')
-def health(): return jsonify({"status": "ok"}), 200
+@app.route('/health/live')
+def health(): return jsonify({"status": "ok", "pid": os.getpid()}), 200
+
+# Readiness: model yüklendi; o zamana kadar 503 (yük dengeleyici trafik göndermez)
+@app.route('/health/ready')
+def health_ready():
+    if not predictor.ready.is_set():
+        return jsonify({"status": "loading", "model": MODEL_LOAD_MODE}), 503
+    return jsonify({"status": "ready", "teams": len(predictor.team_list),
+                    "load_seconds": round(predictor.load_seconds or 0, 3),
+                    "team_index": predictor.alias_index.stats()}), 200
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        try: 
-            fetch_live_data()
-        except: 
-            pass
-    
+    # İlk bülten scheduler'ın ilk işi; sunucu modeli beklemeden açılır
+    safe_db_init()
+
     # ✅ DOĞRU: Koyeb'in PORT'unu kullan
     port = int(os.environ.get("PORT", 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
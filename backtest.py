@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Predicta PRO - Tarihsel backtest
+
+final_unified_dataset.csv kronolojik olarak yeniden oynatılır: her gün, o
+günün maçları önce o ana kadarki rating'lerle tahminlenir, sonra sonuçlar
+motora işlenir (canlı sistemdeki predict -> sonuç sırası). Log-loss, Brier,
+kalibrasyon ve (CSV'de oran varsa) ROI lig ve sezon bazında raporlanır.
+
+Paralellik: takımları birbirine maçla bağlanan lig grupları (bileşenler)
+birbirinden bağımsızdır; her bileşen süreç havuzunda tek görevdir ve
+sezonlarını sırayla, aynı motorla gün gün oynatır (her maç bir kez işlenir,
+süre maç sayısıyla doğrusal). Büyük bileşenler önce gönderilir. Sonuçlar
+sıralı tek geçişle birebir aynıdır.
+
+Kullanım:
+    python backtest.py [--csv data/final_unified_dataset.csv] [--jobs 8] [--edge 0.05] [--config best.json] [--out rapor.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dataset import load_match_frame
+from engine import DEFAULT_CONFIG, SCORE_GRID, RatingEngine, load_config, outcome_probs, score_matrices
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, 'data', 'final_unified_dataset.csv')
+CALIBRATION_BINS = 10
+EPS = 1e-15
+
+_FRAME = None  # Havuz süreçlerinde bir kez yüklenen maç tablosu
+
+
+# --- HAZIRLIK ---
+def season_of(dates):
+    """Avrupa sezonu (Temmuz başlangıçlı): 2019-08-10 -> '2019/20'"""
+    start = dates.dt.year - (dates.dt.month < 7)
+    label = start.astype('Int64').astype(str) + '/' + ((start + 1) % 100).astype('Int64').astype(str).str.zfill(2)
+    return label.where(dates.notna(), 'Bilinmiyor')
+
+
+def components(df):
+    """Takım grafiğinin bağlı bileşenleri -> lig başına bileşen numarası (union-find)"""
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # Bir takımın oynadığı ligler ve takımları ortak olan ligler aynı gruba düşer
+    for league, team in pd.concat([df[['league', 'home_team']].set_axis(['league', 'team'], axis=1),
+                                   df[['league', 'away_team']].set_axis(['league', 'team'], axis=1)]).drop_duplicates().itertuples(index=False):
+        a, b = find(('L', league)), find(('T', team))
+        if a != b: parent[a] = b
+    roots = {}
+    return df['league'].map(lambda l: roots.setdefault(find(('L', l)), len(roots)))
+
+
+def prepare(df):
+    df = df[df['home_team'].notna() & df['away_team'].notna()].copy()
+    league = df['league']
+    if isinstance(league.dtype, pd.CategoricalDtype) and 'Unknown' not in league.cat.categories:
+        league = league.cat.add_categories('Unknown')
+    df['league'] = league.fillna('Unknown')
+    df['season'] = season_of(df['date']) if 'date' in df.columns else 'Bilinmiyor'
+    df['component'] = components(df)
+    for col in ('odds_home', 'odds_draw', 'odds_away'):
+        if col not in df.columns: df[col] = np.nan
+    return df.reset_index(drop=True)
+
+
+# --- GÖREV (havuz süreci) ---
+def _init_worker(frame):
+    global _FRAME
+    _FRAME = frame
+
+
+def _predict(engine, home, away, grid):
+    """Henüz maçı olmayan takımlar canlı sistemdeki gibi 'bilinmeyen' sayılır"""
+    played = engine.n_home + engine.n_away
+    home = np.where(played[home] > 0, home, -1)
+    away = np.where(played[away] > 0, away, -1)
+    h_xg, a_xg = engine.expected_goals(home, away)
+    return np.column_stack(outcome_probs(score_matrices(h_xg, a_xg, grid, engine.config)))
+
+
+def run_task(task):
+    """Bileşen: sezonları sırayla gün gün tahmin + güncelle (tarihsizler en sonda, her biri ayrı gün)"""
+    component, grid, config = task
+    rows = _FRAME[_FRAME['component'] == component]
+    engine = RatingEngine(config)
+
+    # İsimler bir kez indekslenir; gün döngüsü yalnızca dizi dilimleri
+    home, away, league, home_score, away_score = engine.index_frame(rows)
+    probs = np.empty((len(rows), 5))
+    dates = rows['date'].to_numpy() if 'date' in rows.columns else np.full(len(rows), np.datetime64('NaT'))
+    bounds = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1], True])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        day = slice(start, end)
+        probs[day] = _predict(engine, home[day], away[day], grid)
+        engine.update(home[day], away[day], league[day], home_score[day], away_score[day])
+    return rows.index.to_numpy(), probs
+
+
+# --- METRİKLER ---
+def evaluate(df, probs, edge):
+    """Satır bazlı metrik tablosu"""
+    hs, as_ = df['home_score'].to_numpy(), df['away_score'].to_numpy()
+    outcome = np.where(hs > as_, 0, np.where(hs == as_, 1, 2))
+    p = probs[:, :3] / probs[:, :3].sum(axis=1, keepdims=True)
+    onehot = np.eye(3)[outcome]
+    odds = df[['odds_home', 'odds_draw', 'odds_away']].to_numpy(dtype=np.float64)
+
+    # Değer bahsi: model olasılığı x oran - 1 > edge olan en yüksek beklentili seçenek
+    with np.errstate(invalid='ignore'):
+        ev = np.where(odds > 1, p * odds - 1, -np.inf)
+    pick = ev.argmax(axis=1)
+    rows = np.arange(len(df))
+    value_bet = ev[rows, pick] > edge
+    value_profit = np.where(pick == outcome, odds[rows, pick] - 1, -1.0)
+
+    # Favori: modelin en olası sonucuna, oranı varsa
+    fav = p.argmax(axis=1)
+    fav_bet = odds[rows, fav] > 1
+    fav_profit = np.where(fav == outcome, odds[rows, fav] - 1, -1.0)
+
+    over = (hs + as_) > 2.5
+    return pd.DataFrame({
+        'league': df['league'].to_numpy(), 'season': df['season'].to_numpy(),
+        'log_loss': -np.log(np.clip(p[rows, outcome], EPS, 1)),
+        'brier': ((p - onehot) ** 2).sum(axis=1),
+        'brier_ou': (probs[:, 3] - over) ** 2,
+        'hit': fav == outcome,
+        'fav_bet': fav_bet, 'fav_profit': np.where(fav_bet, fav_profit, 0.0),
+        'value_bet': value_bet, 'value_profit': np.where(value_bet, value_profit, 0.0),
+    }), p, onehot
+
+
+def summarize(metrics, by=None):
+    grouped = metrics.groupby(by, sort=True) if by else metrics.groupby(lambda _: 'Tümü')
+    out = grouped.agg(matches=('log_loss', 'size'), log_loss=('log_loss', 'mean'), brier=('brier', 'mean'),
+                      brier_ou=('brier_ou', 'mean'), accuracy=('hit', 'mean'),
+                      fav_bets=('fav_bet', 'sum'), fav_profit=('fav_profit', 'sum'),
+                      value_bets=('value_bet', 'sum'), value_profit=('value_profit', 'sum'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['fav_roi'] = out['fav_profit'] / out['fav_bets']
+        out['value_roi'] = out['value_profit'] / out['value_bets']
+    return out.drop(columns=['fav_profit', 'value_profit'])
+
+
+def calibration(p, onehot, bins=CALIBRATION_BINS):
+    """1/X/2 olasılıklarının tamamı üzerinden güvenilirlik tablosu + ECE"""
+    p, y = p.ravel(), onehot.ravel()
+    idx = np.minimum((p * bins).astype(int), bins - 1)
+    count = np.bincount(idx, minlength=bins)
+    with np.errstate(invalid='ignore'):
+        mean_p = np.bincount(idx, weights=p, minlength=bins) / count
+        freq = np.bincount(idx, weights=y, minlength=bins) / count
+    table = pd.DataFrame({'bin': [f"{i / bins:.1f}-{(i + 1) / bins:.1f}" for i in range(bins)],
+                          'count': count, 'predicted': mean_p, 'observed': freq})
+    ece = float(np.nansum(count * np.abs(mean_p - freq)) / max(count.sum(), 1))
+    return table, ece
+
+
+# --- ÇALIŞTIRMA ---
+def backtest(df, jobs=None, grid=SCORE_GRID, edge=0.05, config=DEFAULT_CONFIG):
+    """(hazırlanmış maç tablosu, satır bazlı metrikler, (kalibrasyon tablosu, ECE)) döner"""
+    df = prepare(df)
+    sizes = df['component'].value_counts(sort=True)
+    tasks = [(c, grid, config) for c in sizes.index]
+    probs = np.empty((len(df), 5))
+    if jobs == 1:
+        _init_worker(df)
+        results = map(run_task, tasks)
+        for idx, p in results: probs[idx] = p
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(df,)) as pool:
+            for idx, p in pool.map(run_task, tasks):
+                probs[idx] = p
+    metrics, p, onehot = evaluate(df, probs, edge)
+    return df, metrics, calibration(p, onehot)
+
+
+def _print_table(title, table, limit=None):
+    print(f"\n{title}")
+    shown = table.sort_values('matches', ascending=False).head(limit) if limit else table
+    print(shown.to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicta PRO tarihsel backtest")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--jobs', type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı, 1 = sıralı)")
+    parser.add_argument('--grid', type=int, default=int(os.getenv("PREDICTA_SCORE_GRID", SCORE_GRID)))
+    parser.add_argument('--edge', type=float, default=0.05, help="Değer bahsi için minimum beklenti (EV)")
+    parser.add_argument('--config', default=os.getenv("PREDICTA_MODEL_CONFIG"), help="ModelConfig JSON (sweep.py --best-out)")
+    parser.add_argument('--leagues', type=int, default=20, help="Tabloda gösterilecek lig sayısı")
+    parser.add_argument('--out', help="Tüm tabloları JSON olarak yaz")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"❌ CSV bulunamadı: {args.csv}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    df = load_match_frame(args.csv, odds=True)
+    print(f"📂 {len(df)} maç yüklendi ({time.perf_counter() - t0:.1f} sn)")
+
+    t0 = time.perf_counter()
+    df, metrics, (calib, ece) = backtest(df, jobs=args.jobs, grid=args.grid, edge=args.edge, config=load_config(args.config))
+    print(f"⚡ Backtest: {len(metrics)} maç, {df['component'].nunique()} lig grubu x "
+          f"{df['season'].nunique()} sezon ({time.perf_counter() - t0:.1f} sn)")
+    if df['odds_home'].isna().all():
+        print("ℹ️ CSV'de oran kolonu yok; ROI hesaplanmadı")
+
+    overall = summarize(metrics)
+    by_league = summarize(metrics, 'league')
+    by_season = summarize(metrics, 'season')
+    _print_table("📊 Genel", overall)
+    _print_table(f"🏆 Lig bazında (en çok maç oynanan {args.leagues})", by_league, args.leagues)
+    _print_table("📅 Sezon bazında", by_season)
+    _print_table(f"🎯 Kalibrasyon (ECE {ece:.4f})", calib.set_index('bin').rename(columns={'count': 'matches'}))
+
+    if args.out:
+        report = {
+            'overall': overall.reset_index(drop=True).iloc[0].to_dict(),
+            'by_league': by_league.reset_index().to_dict(orient='records'),
+            'by_season': by_season.reset_index().to_dict(orient='records'),
+            'calibration': calib.to_dict(orient='records'), 'ece': ece,
+        }
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=float)
+        print(f"\n💾 Rapor yazıldı: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1540 @@
+#!/usr/bin/env python3
+"""
+Predicta PRO - Performans ölçümleri ve doğruluk kontrolleri
+
+Kullanım:
+    python benchmark.py ratings [--rows 200000] [--csv data/final_unified_dataset.csv]
+    python benchmark.py snapshot [--rows 200000]
+    python benchmark.py online [--rows 50000] [--tail 5000]
+    python benchmark.py predict [--fixtures 500]
+    python benchmark.py teams [--filler 5000]
+    python benchmark.py markets [--fixtures 500]
+    python benchmark.py bulletin [--events 20000] [--file kayitli_bulten.json]
+    python benchmark.py fetch [--events 3000] [--no-etag]
+    python benchmark.py feeds [--events 3000] [--delay 0.5]
+    python benchmark.py sse [--clients 300] [--events 5] [--workers 2]
+    python benchmark.py db [--matches 100000]
+    python benchmark.py history [--matches 200000] [--depth 100000]
+    python benchmark.py sweep [--rows 30000] [--candidates 20]
+    python benchmark.py ingest [--rows 1000000] [--chunk 100000]
+    python benchmark.py metrics [--workers 3] [--requests 600]
+    python benchmark.py startup [--rows 1000000] [--workers 2]
+    python benchmark.py memory [--teams 50000] [--matches 20]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+# --- YARDIMCILAR ---
+def make_synthetic_frame(rows, leagues=20, teams_per_league=20, seed=42):
+    """CSV ile aynı kolonlara sahip, tarihe göre sıralı sentetik maç tablosu"""
+    rng = np.random.default_rng(seed)
+    league = rng.integers(0, leagues, rows)
+    home = rng.integers(0, teams_per_league, rows)
+    away = (home + rng.integers(1, teams_per_league, rows)) % teams_per_league
+    return pd.DataFrame({
+        'date': pd.Timestamp('2000-08-01') + pd.to_timedelta(np.sort(rng.integers(0, 9000, rows)), unit='D'),
+        'league': np.array([f"L{i}" for i in range(leagues)])[league],
+        'home_team': np.char.add(np.char.add('T', league.astype(str)), np.char.add('_', home.astype(str))),
+        'away_team': np.char.add(np.char.add('T', league.astype(str)), np.char.add('_', away.astype(str))),
+        'home_score': rng.poisson(1.5, rows).astype('int32'),
+        'away_score': rng.poisson(1.2, rows).astype('int32'),
+    })
+
+
+def make_synthetic_bulletin(events, seed=42):
+    """getprebultenfull biçiminde sentetik bülten: 1/3'ü futbol, maç başına 23 market"""
+    rng = np.random.default_rng(seed)
+    items = []
+    for i in range(events):
+        markets = [{"MTID": mtid, "OCA": [{"N": n, "O": round(float(rng.uniform(1.1, 5.0)), 2)} for n in (1, 2, 3)]}
+                   for mtid in (1, 14, 450)]
+        markets += [{"MTID": 1000 + j, "OCA": [{"N": n, "O": 2.0} for n in range(1, 9)]} for j in range(20)]
+        items.append({"C": 100000 + i, "GT": 1 if i % 3 == 0 else 2, "LN": f"L{i % 20}", "HN": f"T{i % 20}_{i % 7}",
+                      "AN": f"T{i % 20}_{(i + 3) % 7}", "D": "17.10.2026", "T": "20:00", "MA": markets})
+    return {"sg": {"EA": items, "CA": []}}
+
+
+class StubBulletinServer:
+    """Hazır bülteni sunan yerel HTTP/1.1 sunucusu (ETag/304 destekli ya da desteksiz).
+
+    delay: yanıt öncesi bekleme (sn); failures: sırayla dönülecek hata durumları
+    (429'da Retry-After: retry_after); peers: bağlanan istemci portları (keep-alive).
+    """
+
+    def __init__(self, etag=True, delay=0.0, failures=(), retry_after=1):
+        self.body = b'{}'
+        self.etag = etag
+        self.delay = delay
+        self.failures = list(failures)
+        self.retry_after = retry_after
+        self.requests = 0
+        self.peers = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.peers.add(self.client_address[1])
+                if stub.delay: time.sleep(stub.delay)
+                if stub.failures:
+                    status = stub.failures.pop(0)
+                    self.send_response(status)
+                    if status == 429: self.send_header('Retry-After', str(stub.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                tag = '"%s"' % hashlib.sha1(stub.body).hexdigest()
+                if stub.etag and self.headers.get('If-None-Match') == tag:
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(stub.body)))
+                if stub.etag: self.send_header('ETag', tag)
+                self.end_headers()
+                self.wfile.write(stub.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/bulten/getprebultenfull"
+
+    def serve(self, bulletin):
+        self.body = json.dumps(bulletin).encode()
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+def load_frame(args):
+    if args.csv:
+        from dataset import load_match_frame
+        return load_match_frame(args.csv)
+    return make_synthetic_frame(args.rows)
+
+
+def peak_rss_mb():
+    """Sürecin tepe RSS'i. VmHWM exec ile sıfırlanır; ru_maxrss ise üst süreçten miras kalabilir."""
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+# --- REFERANS (eski df.iterrows() döngüsü) ---
+def legacy_advanced_stats(df):
+    """Vektörel motordan önceki satır satır hesaplama; eşitlik kontrolü için"""
+    league_stats = {}
+    for league, data in df.groupby('league'):
+        league_stats[league] = {
+            'avg_home_goals': data['home_score'].mean() or 1.5,
+            'avg_away_goals': data['away_score'].mean() or 1.2
+        }
+
+    teams = set(df['home_team'].unique()) | set(df['away_team'].unique())
+    ratings = {t: {'att_h': 1.0, 'def_h': 1.0, 'att_a': 1.0, 'def_a': 1.0, 'form_home': [], 'form_away': [],
+                   'recent_goals_h': [], 'recent_goals_a': [], 'league': 'Unknown'} for t in teams}
+    alpha = 0.18
+
+    for _, row in df.iterrows():
+        home, away = row['home_team'], row['away_team']
+        h_score, a_score = row['home_score'], row['away_score']
+        league = row['league']
+        if home not in ratings or away not in ratings: continue
+
+        l_stats = league_stats.get(league, {'avg_home_goals': 1.5, 'avg_away_goals': 1.2})
+        avg_h, avg_a = l_stats['avg_home_goals'], l_stats['avg_away_goals']
+        ratings[home]['league'] = league
+        ratings[away]['league'] = league
+
+        h_att_perf = h_score / avg_h if avg_h > 0 else 1.0
+        h_def_perf = a_score / avg_a if avg_a > 0 else 1.0
+        a_att_perf = a_score / avg_a if avg_a > 0 else 1.0
+        a_def_perf = h_score / avg_h if avg_h > 0 else 1.0
+        ratings[home]['att_h'] = ratings[home]['att_h'] * (1 - alpha) + h_att_perf * alpha
+        ratings[home]['def_h'] = ratings[home]['def_h'] * (1 - alpha) + h_def_perf * alpha
+        ratings[away]['att_a'] = ratings[away]['att_a'] * (1 - alpha) + a_att_perf * alpha
+        ratings[away]['def_a'] = ratings[away]['def_a'] * (1 - alpha) + a_def_perf * alpha
+
+        ratings[home]['form_home'].append(3 if h_score > a_score else 1 if h_score == a_score else 0)
+        ratings[home]['recent_goals_h'].append(h_score)
+        if len(ratings[home]['form_home']) > 10:
+            ratings[home]['form_home'].pop(0)
+            ratings[home]['recent_goals_h'].pop(0)
+
+        ratings[away]['form_away'].append(3 if a_score > h_score else 1 if a_score == h_score else 0)
+        ratings[away]['recent_goals_a'].append(a_score)
+        if len(ratings[away]['form_away']) > 10:
+            ratings[away]['form_away'].pop(0)
+            ratings[away]['recent_goals_a'].pop(0)
+
+    return ratings, league_stats
+
+
+def legacy_predict(hs, as_, league_stats):
+    """Eski skaler predict (scipy.stats.poisson + 6x6 iç içe döngü)"""
+    from scipy.stats import poisson
+
+    l_stats = league_stats.get(hs['league'], {'avg_home_goals': 1.5, 'avg_away_goals': 1.2})
+    avg_h_goals, avg_a_goals = l_stats['avg_home_goals'], l_stats['avg_away_goals']
+    h_xg = hs['att_h'] * as_['def_a'] * avg_h_goals
+    a_xg = as_['att_a'] * hs['def_h'] * avg_a_goals
+
+    for side, key, goals, avg in (('h', 'form_home', 'recent_goals_h', avg_h_goals), ('a', 'form_away', 'recent_goals_a', avg_a_goals)):
+        stats = hs if side == 'h' else as_
+        xg = h_xg if side == 'h' else a_xg
+        if len(stats[key]) >= 5:
+            ratio = sum(stats[key][-10:]) / (len(stats[key][-10:]) * 3)
+            recent = np.mean(stats[goals][-10:]) if stats[goals] else avg
+            if ratio > 0.65:
+                xg = (xg * 0.6) + (recent * 0.4)
+                xg *= 1.12
+            elif ratio < 0.30:
+                xg *= 0.88
+            else:
+                xg = (xg * 0.7) + (recent * 0.3)
+        if side == 'h': h_xg = xg
+        else: a_xg = xg
+
+    prob_matrix = np.outer([poisson.pmf(i, h_xg) for i in range(7)], [poisson.pmf(i, a_xg) for i in range(7)])
+    if h_xg < 1.2 and a_xg < 1.2:
+        prob_matrix[0, 0] *= 1.20
+        prob_matrix[1, 1] *= 1.10
+    prob_matrix /= prob_matrix.sum()
+
+    p_over = p_btts = 0
+    for h in range(6):
+        for a in range(6):
+            if (h + a) > 2.5: p_over += prob_matrix[h, a]
+            if h > 0 and a > 0: p_btts += prob_matrix[h, a]
+    return np.sum(np.tril(prob_matrix, -1)), np.trace(prob_matrix), np.sum(np.triu(prob_matrix, 1)), p_over, p_btts
+
+
+def compare_team_stats(expected, actual):
+    """Eşleşmeyen takımların listesi (boş liste = eşit)"""
+    bad = []
+    for team, exp in expected.items():
+        if not isinstance(team, str): continue
+        got = actual.get(team)
+        if got is None:
+            bad.append(team)
+            continue
+        for key in ('att_h', 'def_h', 'att_a', 'def_a'):
+            if not np.isclose(exp[key], got[key], rtol=1e-9, atol=1e-12):
+                bad.append(team)
+                break
+        else:
+            for key in ('form_home', 'form_away', 'recent_goals_h', 'recent_goals_a'):
+                if [int(v) for v in exp[key]] != [int(v) for v in got[key]]:
+                    bad.append(team)
+                    break
+            else:
+                if exp['league'] != got['league']:
+                    bad.append(team)
+    return bad
+
+
+# --- KOMUTLAR ---
+def bench_ratings(args):
+    from engine import RatingEngine
+
+    df = load_frame(args)
+    rows = len(df)
+    print(f"📊 {rows} satır, {len(set(df['home_team']) | set(df['away_team']))} takım")
+
+    def vectorized():
+        engine = RatingEngine()
+        engine.fit_frame(df)
+        return engine
+
+    engine, t_new = timed(vectorized)
+    print(f"⚡ Vektörel motor: {t_new:.3f}s ({rows / t_new:,.0f} satır/sn)")
+
+    if args.skip_legacy: return True
+
+    (legacy, legacy_leagues), t_old = timed(legacy_advanced_stats, df)
+    print(f"🐢 iterrows döngüsü: {t_old:.3f}s ({rows / t_old:,.0f} satır/sn) -> {t_old / t_new:.1f}x")
+
+    bad = compare_team_stats(legacy, engine.team_stats())
+    leagues = engine.league_stats()
+    for league, exp in legacy_leagues.items():
+        got = leagues.get(league)
+        if got is None or not np.allclose([exp['avg_home_goals'], exp['avg_away_goals']],
+                                          [got['avg_home_goals'], got['avg_away_goals']]):
+            bad.append(f"lig:{league}")
+
+    if bad:
+        print(f"❌ Eşitlik hatası: {len(bad)} kayıt farklı, örn. {bad[:5]}")
+        return False
+    print("✅ Eşitlik kontrolü başarılı (rating, form ve gol pencereleri aynı)")
+    return True
+
+
+def bench_snapshot(args):
+    from engine import DEFAULT_CONFIG, RatingEngine, load_snapshot, save_snapshot
+
+    df = make_synthetic_frame(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'dataset.csv')
+        df.to_csv(source, index=False)
+        root = os.path.join(tmp, 'snapshot')
+
+        def build(config=DEFAULT_CONFIG):
+            frame = pd.read_csv(source)
+            frame['date'] = pd.to_datetime(frame['date'], errors='coerce')
+            engine = RatingEngine(config)
+            engine.fit_frame(frame.sort_values('date'))
+            return engine
+
+        engine, t_build = timed(build)
+        _, fingerprint = load_snapshot(root, source)
+        save_snapshot(engine, root, fingerprint)
+        (loaded, _), t_load = timed(load_snapshot, root, source)
+
+        # Aynı veri, farklı alpha: eski snapshot reddedilir, yenisi yazılıp açılabilir
+        other = DEFAULT_CONFIG.replace(alpha=DEFAULT_CONFIG.alpha + 0.05)
+        stale, _ = load_snapshot(root, source, other)
+        save_snapshot(build(other), root, fingerprint)
+        reloaded, _ = load_snapshot(root, source, other)
+        resaved = stale is None and reloaded is not None and reloaded.alpha == other.alpha
+
+    print(f"🐢 CSV okuma + hesaplama: {t_build * 1000:.0f} ms")
+    print(f"⚡ Snapshot yükleme (mmap): {t_load * 1000:.1f} ms -> {t_build / t_load:.0f}x")
+    if loaded is None or not np.allclose(loaded.att_h, engine.att_h):
+        print("❌ Snapshot içeriği farklı")
+        return False
+    print("✅ alpha değişince snapshot yeniden yazıldı" if resaved else "❌ alpha değişince eski snapshot kaldı")
+    return resaved
+
+
+def bench_online(args):
+    """Tek tek apply_result == tüm geçmişten yeniden kurulum; checkpoint + kuyruk tekrarı"""
+    from engine import RatingEngine, load_snapshot, save_snapshot
+
+    df = make_synthetic_frame(args.rows).sort_values('date')
+    head, tail = df.iloc[:-args.tail], df.iloc[-args.tail:]
+
+    def rebuild():
+        engine = RatingEngine()
+        engine.fit_frame(df)
+        return engine
+
+    rebuilt, t_full = timed(rebuild)
+
+    def compare(engine):
+        idx = [engine.team_index[t] for t in rebuilt.teams]
+        return max(float(np.max(np.abs(getattr(engine, name)[idx] - getattr(rebuilt, name))))
+                   for name in ('att_h', 'def_h', 'att_a', 'def_a', 'form_sum_home', 'form_sum_away',
+                                'goal_sum_home', 'goal_sum_away'))
+
+    online = RatingEngine()
+    online.fit_frame(head)
+    records = list(tail[['home_team', 'away_team', 'league', 'home_score', 'away_score']].itertuples(index=False))
+    t0 = time.perf_counter()
+    for r in records:
+        online.apply_result(*r)
+    t_apply = time.perf_counter() - t0
+    diff = compare(online)
+    print(f"🔁 Tam yeniden kurulum: {t_full * 1000:.0f} ms ({args.rows} maç)")
+    print(f"⚡ apply_result: {t_apply / len(records) * 1e6:.1f} µs/maç, yeniden kurulumdan fark {diff:.1e}")
+
+    # Checkpoint ortada alınır, yeniden başlatma yalnızca kalan kuyruğu oynatır
+    half = len(records) // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'dataset.csv')
+        head.to_csv(source, index=False)
+        root = os.path.join(tmp, 'snapshot')
+        engine = RatingEngine()
+        engine.fit_frame(head)
+        for r in records[:half]:
+            engine.apply_result(*r)
+        engine.journal_id = half
+        _, fingerprint = load_snapshot(root, source)
+        save_snapshot(engine, root, fingerprint)
+
+        restored, _ = load_snapshot(root, source)
+        t0 = time.perf_counter()
+        for r in records[restored.journal_id:]:
+            restored.apply_result(*r)
+        t_replay = time.perf_counter() - t0
+        replay_diff = compare(restored)
+    print(f"💾 Checkpoint #{half} + {len(records) - half} maçlık kuyruk: {t_replay * 1000:.0f} ms, fark {replay_diff:.1e}")
+
+    ok = diff < 1e-9 and replay_diff < 1e-9
+    print("✅ Çevrimiçi güncelleme yeniden kurulumla aynı" if ok else "❌ Çevrimiçi güncelleme farklı")
+    return ok
+
+
+# CSV isimleri (aksanlı/aksansız karışık) ve bülten yazımları: (bülten takımı, bülten ligi, beklenen takım)
+TEAM_CASES = (
+    ("Beşiktaş JK İstanbul", "Türkiye Süper Lig", "Beşiktaş"),
+    ("Trabzonspor Kulübü", "Türkiye Süper Lig", "Trabzonspor"),
+    ("FENERBAHÇE A.Ş.", "Türkiye Süper Lig", "Fenerbahce"),
+    ("Bayern München", "Almanya Bundesliga", "Bayern Munich"),
+    ("Borussia Dortmund 09", "Almanya Bundesliga", "Dortmund"),
+    ("Manchester United", "Premier League (İngiltere)", "Man United"),
+    ("Atlético de Madrid", "İspanya La Liga", "Atletico Madrid"),
+)
+TEAM_LEAGUES = {"Super Lig": ("Beşiktaş", "Trabzonspor", "Fenerbahce", "Galatasaray"),
+                "Bundesliga": ("Bayern Munich", "Dortmund", "Leverkusen"),
+                "Premier League": ("Man United", "Man City", "Liverpool"),
+                "La Liga": ("Atletico Madrid", "Real Madrid", "Sevilla")}
+
+
+def bench_teams(args):
+    """Bülten isimlerinin lig kapsamlı bulanık eşleşmesi (aksanlı / farklı yazılmış takım ve lig)"""
+    from team_index import TeamAliasIndex
+
+    teams, leagues = [], []
+    for league, names in TEAM_LEAGUES.items():
+        teams += names
+        leagues += [league] * len(names)
+    # Global aramayı zorlaştıran dolgu: aynı kelimeleri içeren başka liglerin takımları
+    for i in range(args.filler):
+        teams.append(f"{('Madrid', 'United', 'Munich', 'Istanbul')[i % 4]} Club {i}")
+        leagues.append(f"Lig {i % 50}")
+    index = TeamAliasIndex(teams, leagues)
+
+    ok = True
+    for bulletin_league, expected in (("Türkiye Süper Lig", "Super Lig"), ("Almanya Bundesliga", "Bundesliga"),
+                                      ("Premier League (İngiltere)", "Premier League"), ("İspanya La Liga", "La Liga")):
+        got = index._candidate_leagues(bulletin_league)
+        ok &= got == [expected]
+        print(f"{'✅' if got == [expected] else '❌'} Lig: {bulletin_league} -> {got}")
+
+    t0 = time.perf_counter()
+    for name, league, expected in TEAM_CASES:
+        got = index.resolve(name, league)
+        ok &= got == expected
+        print(f"{'✅' if got == expected else '❌'} {name} ({league}) -> {got}")
+    elapsed = time.perf_counter() - t0
+    print(f"🔎 {len(TEAM_CASES)} çözümleme, {len(teams)} takım: {elapsed / len(TEAM_CASES) * 1000:.2f} ms/isim; {dict(index.counters)}")
+    ok &= index.counters['fuzzy_global'] == 0
+    print("✅ Bulanık eşleşmeler bültenin ligiyle sınırlı" if ok else "❌ Takım/lig eşleştirme hatalı")
+    return ok
+
+
+def bench_predict(args):
+    from engine import RatingEngine, outcome_probs, score_matrices
+
+    engine = RatingEngine()
+    engine.fit_frame(make_synthetic_frame(args.rows))
+    rng = np.random.default_rng(7)
+    home = rng.integers(0, len(engine.teams), args.fixtures)
+    away = rng.integers(0, len(engine.teams), args.fixtures)
+    league_stats = engine.league_stats()
+    views = [(engine.team_view(h), engine.team_view(a)) for h, a in zip(home, away)]
+
+    legacy, t_old = timed(lambda: np.array([legacy_predict(hs, as_, league_stats) for hs, as_ in views]))
+    batch, t_new = timed(lambda: np.array(outcome_probs(score_matrices(*engine.expected_goals(home, away)))).T)
+    print(f"🐢 Skaler scipy predict: {t_old * 1000:.1f} ms ({args.fixtures / t_old:,.0f} maç/sn)")
+    print(f"⚡ predict_batch çekirdeği: {t_new * 1000:.2f} ms ({args.fixtures / t_new:,.0f} maç/sn) -> {t_old / t_new:.0f}x")
+
+    if not np.allclose(legacy[:, :3], batch[:, :3], rtol=1e-9, atol=1e-12):
+        print("❌ 1X2 olasılıkları eşleşmiyor")
+        return False
+    drift = np.abs(batch[:, 3:] - legacy[:, 3:]).max()
+    print(f"✅ 1X2 eşit. Üst/KG farkı (6. gol satırı artık dahil): en fazla {drift * 100:.2f} puan")
+    return True
+
+
+def _brute_line(matrix, margin_fn, line):
+    """Referans: skorlar üzerinde döngüyle Asya tipi çizgi (çeyrekte iki yarının ortalaması)"""
+    parts = (line - 0.25, line + 0.25) if (line * 4) % 2 else (line,)
+    win = lose = 0.0
+    for part in parts:
+        for i in range(matrix.shape[0]):
+            for j in range(matrix.shape[1]):
+                margin = margin_fn(i, j) + part
+                if margin > 0: win += matrix[i, j] / len(parts)
+                elif margin < 0: lose += matrix[i, j] / len(parts)
+    return win, lose
+
+
+def bench_markets(args):
+    """Saklı skor matrisinden market türetme: döngüyle referans eşitliği + market başına Poisson'a karşı süre"""
+    from engine import RatingEngine, score_matrices
+    from markets import (asian_handicap, blob_to_matrix, check_line, correct_scores, double_chance, line_summary,
+                         matrix_to_blob, total_goals, value_rows)
+
+    engine = RatingEngine()
+    engine.fit_frame(make_synthetic_frame(args.rows))
+    rng = np.random.default_rng(7)
+    home = rng.integers(0, len(engine.teams), args.fixtures)
+    away = rng.integers(0, len(engine.teams), args.fixtures)
+    h_xg, a_xg = engine.expected_goals(home, away)
+    matrices = score_matrices(h_xg, a_xg)
+    blobs = [matrix_to_blob(m) for m in matrices]
+    total_lines = (0.5, 1.5, 2.0, 2.25, 2.5, 2.75, 3.0, 3.5, 4.5)
+    handicap_lines = (-1.5, -1.0, -0.75, -0.5, -0.25, 0.0, 0.25, 0.5, 1.0, 1.5)
+
+    # Eşitlik: vektörel maskeler == skor döngüsü (yığın halinde)
+    def averaged(halves):
+        return np.stack([sum(s.win for s in halves) / len(halves), sum(s.lose for s in halves) / len(halves)], axis=1)
+
+    sample = matrices[:50]
+    worst = 0.0
+    for line in total_lines:
+        ref = np.array([_brute_line(m, lambda i, j: i + j, -line) for m in sample])
+        worst = max(worst, np.abs(ref - averaged(total_goals(sample, line))).max())
+    for line in handicap_lines:
+        ref = np.array([_brute_line(m, lambda i, j: i - j, line) for m in sample])
+        worst = max(worst, np.abs(ref - averaged(asian_handicap(sample, line))).max())
+    dc = double_chance(matrices)
+    worst = max(worst, np.abs(dc['1X'] + dc['X2'] + dc['12'] - 2.0).max())
+    # float32 saklama hassasiyeti
+    worst_blob = max(np.abs(blob_to_matrix(b) - m).max() for b, m in zip(blobs, matrices))
+    print(f"🧮 {args.fixtures} maç, {len(total_lines)} alt/üst + {len(handicap_lines)} handikap çizgisi; "
+          f"döngüyle referanstan en büyük fark {worst:.1e}, float32 saklama farkı {worst_blob:.1e}")
+
+    # Geçersiz çizgiler ValueError vermeli (API'de 400); inf/nan 500'e dönmemeli
+    accepted = []
+    for raw in ('inf', '-inf', 'nan', '2.3', '1e400'):
+        try:
+            accepted.append((raw, check_line(raw)))
+        except ValueError:
+            pass
+    print(f"🚫 Geçersiz çizgiler: {5 - len(accepted)}/5 reddedildi" + (f", kabul edilenler: {accepted}" if accepted else ""))
+
+    odds = {'ms1': 2.1, 'msx': 3.3, 'ms2': 3.6, 'alt': 1.9, 'ust': 1.95, 'kgvar': 1.8, 'kgyok': 2.0}
+
+    def per_market():
+        # Her market için xG -> Poisson -> skor matrisi yeniden (önbelleksiz)
+        out = []
+        for h, a in zip(h_xg, a_xg):
+            for line in total_lines:
+                out.append(line_summary(total_goals(score_matrices([h], [a])[0], line)))
+            for line in handicap_lines:
+                out.append(line_summary(asian_handicap(score_matrices([h], [a])[0], line)))
+            out.append(double_chance(score_matrices([h], [a])[0]))
+            out.append(correct_scores(score_matrices([h], [a])[0], 10))
+            out.append(value_rows(score_matrices([h], [a])[0], odds))
+        return out
+
+    def cached():
+        out = []
+        for blob in blobs:
+            m = blob_to_matrix(blob)
+            out.extend(line_summary(total_goals(m, line)) for line in total_lines)
+            out.extend(line_summary(asian_handicap(m, line)) for line in handicap_lines)
+            out += [double_chance(m), correct_scores(m, 10), value_rows(m, odds)]
+        return out
+
+    def batch():
+        # Tüm maçların matrisleri tek (N, K, K) yığın; her market tek maskeli toplam
+        stack = np.frombuffer(b''.join(blobs), dtype=np.float32).astype(np.float64).reshape(matrices.shape)
+        out = [total_goals(stack, line) for line in total_lines]
+        out += [asian_handicap(stack, line) for line in handicap_lines]
+        out += [double_chance(stack), np.argsort(stack.reshape(len(stack), -1), axis=1)[:, ::-1][:, :10]]
+        return out
+
+    _, t_old = timed(per_market)
+    _, t_new = timed(cached)
+    _, t_batch = timed(batch)
+    n_markets = len(total_lines) + len(handicap_lines) + 3
+    print(f"🐢 Market başına Poisson: {t_old / args.fixtures * 1000:.2f} ms/maç ({n_markets} market)")
+    print(f"⚡ Saklı matristen, maç maç (/api/matches/<code>/markets): {t_new / args.fixtures * 1000:.2f} ms/maç "
+          f"-> {t_old / t_new:.1f}x; matris {len(blobs[0])} bayt/maç")
+    print(f"⚡ Saklı matrislerden yığın halinde: {t_batch / args.fixtures * 1e6:.1f} µs/maç -> {t_old / t_batch:.0f}x")
+
+    ok = worst < 1e-9 and worst_blob < 1e-6 and not accepted
+    print("✅ Marketler skor döngüsüyle aynı" if ok else "❌ Market olasılıkları farklı")
+    return ok
+
+
+def _parse_child(args):
+    """Alt süreç: tek ayrıştırma modunu çalıştırıp süre ve tepe RSS'i JSON olarak yaz"""
+    from bulletin import parse_bulletin, parse_bulletin_file
+
+    t0 = time.perf_counter()
+    if args.mode == 'json':
+        with open(args.file, 'rb') as f:
+            events = parse_bulletin(json.load(f))
+    elif args.mode == 'stream':
+        events = parse_bulletin_file(args.file)
+    else:
+        events = []
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({'events': len(events), 'seconds': elapsed,
+                      'peak_rss_mb': peak_rss_mb()}))
+
+
+def bench_bulletin(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if not path:
+            path = os.path.join(tmp, 'bulletin.json')
+            with open(path, 'w') as f:
+                json.dump(make_synthetic_bulletin(args.events), f)
+        print(f"📄 Bülten: {os.path.getsize(path) / 1e6:.1f} MB")
+
+        results = {}
+        for mode in ('noop', 'json', 'stream'):
+            out = subprocess.run([sys.executable, __file__, '_parse', mode, path], capture_output=True, text=True, check=True)
+            results[mode] = json.loads(out.stdout)
+
+    base = results['noop']['peak_rss_mb']
+    for mode, label in (('json', '🐢 r.json() tam okuma'), ('stream', '⚡ ijson akış')):
+        r = results[mode]
+        print(f"{label}: {r['seconds'] * 1000:.0f} ms, tepe RSS +{r['peak_rss_mb'] - base:.1f} MB ({r['events']} futbol maçı)")
+    if results['json']['events'] != results['stream']['events']:
+        print("❌ İki mod farklı sayıda maç döndürdü")
+        return False
+    return True
+
+
+def bench_fetch(args):
+    from bulletin import BulletinFetcher
+
+    bulletin = make_synthetic_bulletin(args.events, seed=1)
+    with StubBulletinServer(etag=not args.no_etag) as stub:
+        fetcher = BulletinFetcher(stub.url)
+
+        def cycle(label):
+            t0 = time.perf_counter()
+            events = fetcher.fetch()
+            if events is None:
+                print(f"{label}: 304 Not Modified ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+                return None
+            changed, skipped = fetcher.diff(events)
+            fetcher.commit()
+            print(f"{label}: {len(events)} maç, {skipped} atlandı, {len(changed)} değişti ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+            return len(changed)
+
+        stub.serve(bulletin)
+        first = cycle("1️⃣ İlk indirme")
+        second = cycle("2️⃣ Aynı bülten")
+
+        # Futbol maçlarının ~%2'sinde oran hareketi
+        football = [m for m in bulletin['sg']['EA'] if m['GT'] == 1]
+        moved = football[::50]
+        for m in moved:
+            m['MA'][0]['OCA'][0]['O'] = round(m['MA'][0]['OCA'][0]['O'] + 0.05, 2)
+        stub.serve(bulletin)
+        third = cycle("3️⃣ Oran hareketi")
+
+    ok = first == len(football) and second in (None, 0) and third == len(moved)
+    print("✅ Yalnızca değişen maçlar işlendi" if ok else "❌ Beklenmeyen değişiklik sayısı")
+    return ok
+
+
+def bench_feeds(args):
+    from bulletin import parse_bulletin_stream, parse_results_stream
+    from feeds import FeedRunner, FeedSource
+
+    runner = FeedRunner()
+    bulletin = make_synthetic_bulletin(args.events, seed=2)
+    football = sum(1 for m in bulletin['sg']['EA'] if m['GT'] == 1)
+    results = {"sg": {"EA": [{"C": 100000 + i, "S": "MS" if i % 2 == 0 else "2Y", "HS": i % 4, "AS": i % 3}
+                             for i in range(0, args.events, 3)]}}
+    finished = sum(1 for m in results['sg']['EA'] if m['S'] == "MS")
+    ok = True
+
+    def check(label, passed, detail):
+        nonlocal ok
+        ok &= passed
+        print(f"{'✅' if passed else '❌'} {label}: {detail}")
+
+    # 0) Örnek sonuç yükü (bulletin.py'de belgelenen varsayılan şema)
+    from bulletin import ResultEvent, parse_results_file
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'nesine_results.json')
+    parsed = sorted(parse_results_file(fixture))
+    expected = [ResultEvent('2918201', 2, 2), ResultEvent('2918202', 0, 0), ResultEvent('2918203', 3, 2)]
+    check("Sonuç fixture'ı", parsed == expected, f"{len(parsed)} biten maç (bitmemiş/eksik skorlu öğeler atlandı)")
+
+    # 1) 503 ve 429 (Retry-After) sonrası başarı
+    with StubBulletinServer(failures=(503, 429), retry_after=1) as stub:
+        stub.serve(bulletin)
+        result = runner.fetch(FeedSource('flaky', stub.url, parse_bulletin_stream, retries=3))
+        check("Yeniden deneme", result.attempts == 3 and len(result.payload) == football and result.elapsed >= 1.0,
+              f"{result.attempts} deneme, {len(result.payload)} maç, {result.elapsed:.2f} sn (Retry-After 1 sn)")
+
+    # 2) Gecikmeli iki kaynak: sıralı vs. eşzamanlı. Ayrıştırma CPU işidir (GIL) ve
+    # örtüşmez; ağ beklemesini ölçmek için küçük bülten
+    with StubBulletinServer(delay=args.delay) as bulletin_stub, StubBulletinServer(delay=args.delay) as results_stub:
+        bulletin_stub.serve(make_synthetic_bulletin(300, seed=2))
+        results_stub.serve(results)
+        sources = [FeedSource('bulletin', bulletin_stub.url, parse_bulletin_stream),
+                   FeedSource('results', results_stub.url, parse_results_stream)]
+        t0 = time.perf_counter()
+        for source in sources: runner.fetch(source)
+        sequential = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fetched = runner.fetch_all([(source, {}) for source in sources])
+        concurrent = time.perf_counter() - t0
+        check("Eşzamanlı indirme", concurrent < 0.75 * sequential and len(fetched[1].payload) == finished,
+              f"sıralı {sequential * 1000:.0f} ms, eşzamanlı {concurrent * 1000:.0f} ms, {len(fetched[1].payload)} biten maç")
+
+        # 3) Keep-alive: aynı kaynağa tekrar istekler tek bağlantıyı kullanır
+        for _ in range(args.repeat): runner.fetch(sources[0])
+        check("Keep-alive", len(bulletin_stub.peers) == 1,
+              f"{bulletin_stub.requests} istek, {len(bulletin_stub.peers)} TCP bağlantısı")
+
+    # 4) Hız sınırı: kaynak başına en az min_interval aralık
+    with StubBulletinServer() as stub:
+        stub.serve(results)
+        source = FeedSource('limited', stub.url, parse_results_stream, min_interval=args.interval)
+        t0 = time.perf_counter()
+        runner.fetch_all([(source, {})] * 4)
+        elapsed = time.perf_counter() - t0
+        check("Hız sınırı", elapsed >= 3 * args.interval,
+              f"4 istek {elapsed:.2f} sn (alt sınır {3 * args.interval:.2f} sn)")
+
+    # 5) Koşullu istek: aynı gövde için 304, yük yok
+    with StubBulletinServer() as stub:
+        stub.serve(results)
+        source = FeedSource('conditional', stub.url, parse_results_stream)
+        first = runner.fetch(source)
+        second = runner.fetch(source, etag=first.etag)
+        check("304", second.status == 304 and second.payload is None, f"ikinci yanıt {second.status}")
+
+    runner.close()
+    return ok
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _sse_client(port, target_ids, received, connected, rejected, stop):
+    """Ham soketle /api/stream aboneliği; beklenen id'lerin geliş anını kaydet"""
+    try:
+        sock = socket.create_connection(('127.0.0.1', port), timeout=60)
+        sock.sendall(b"GET /api/stream HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        f = sock.makefile('rb')
+        status = f.readline()
+        if b" 503 " in status: rejected.append(1)
+        if b" 200 " not in status: return
+        connected.append(1)
+        while not stop.is_set():
+            line = f.readline()
+            if not line: break
+            if line.startswith(b"id: "):
+                event_id = int(line[4:])
+                if event_id in target_ids:
+                    received.append((event_id, time.perf_counter()))
+        sock.close()
+    except OSError:
+        pass
+
+
+def bench_sse(args):
+    """Üretim gunicorn ayarlarıyla (gevent, start.sh gibi 2 worker) SSE aboneleri: tüm abonelerin
+    bağlanması, her olayın her aboneye ulaşması ve abonelerle birlikte API'nin yanıt vermesi"""
+    import urllib.request
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    instance_dir = tempfile.mkdtemp(prefix='predicta-bench-')  # gerçek instance/predictapro.db'ye dokunulmaz
+    db_path = os.path.join(instance_dir, 'predictapro.db')
+    port = _free_port()
+    env = {**os.environ, 'PREDICTA_SCHEDULER': 'off', 'PREDICTA_INSTANCE_DIR': instance_dir}
+    for key in ('GUNICORN_WORKER_CLASS', 'GUNICORN_WORKER_CONNECTIONS', 'GUNICORN_THREADS', 'PREDICTA_SSE_MAX_CLIENTS'):
+        env.pop(key, None)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-b', f'127.0.0.1:{port}',
+                               '-w', str(args.workers), '--timeout', '120', '--graceful-timeout', '2'],
+                              cwd=base_dir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stop = threading.Event()
+    inserted = {}
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=5).read()
+                break
+            except OSError:
+                time.sleep(0.2)
+        else:
+            print("❌ Sunucu başlamadı")
+            return False
+
+        received, connected, rejected = [], [], []
+        target_ids = set()
+        clients = [threading.Thread(target=_sse_client, args=(port, target_ids, received, connected, rejected, stop),
+                                    daemon=True)
+                   for _ in range(args.clients)]
+        t0 = time.perf_counter()
+        for c in clients: c.start()
+        while len(connected) + len(rejected) < args.clients and time.perf_counter() - t0 < 30:
+            time.sleep(0.05)
+        print(f"🔌 {len(connected)}/{args.clients} abone bağlandı, {len(rejected)} tanesi 503 aldı "
+              f"({time.perf_counter() - t0:.1f} sn, {args.workers} worker)")
+
+        # Abonelerin bağlantıları açıkken normal API istekleri de yanıt almalı
+        api = []
+        for _ in range(20):
+            t1 = time.perf_counter()
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/api/matches', timeout=10).read()
+                api.append((time.perf_counter() - t1) * 1000)
+            except OSError:
+                pass
+        print(f"🌐 Abonelerle birlikte /api/matches: {len(api)}/20 yanıt"
+              + (f", en yavaş {max(api):.0f} ms" if api else ""))
+
+        # Boş payload: gerçek istemcilerde hiçbir maçı değiştirmez
+        con = sqlite3.connect(db_path)
+        for _ in range(args.events):
+            cur = con.execute("INSERT INTO live_event (created_at, kind, payload) VALUES (datetime('now'), 'odds', '[]')")
+            con.commit()
+            target_ids.add(cur.lastrowid)
+            inserted[cur.lastrowid] = time.perf_counter()
+            time.sleep(args.interval)
+
+        deadline = time.perf_counter() + 10
+        while len(received) < len(connected) * len(inserted) and time.perf_counter() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        server.terminate()
+        server.wait(timeout=30)
+        if inserted: con.close()
+        shutil.rmtree(instance_dir, ignore_errors=True)
+
+    latencies = np.array([(t - inserted[i]) * 1000 for i, t in received])
+    expected = len(connected) * len(inserted)
+    if not len(latencies):
+        print("❌ Hiç olay ulaşmadı")
+        return False
+    print(f"📨 {len(latencies)}/{expected} teslimat, gecikme p50 {np.percentile(latencies, 50):.0f} ms, "
+          f"p99 {np.percentile(latencies, 99):.0f} ms, max {latencies.max():.0f} ms")
+    ok = len(connected) == args.clients and len(latencies) == args.clients * len(inserted) and len(api) == 20
+    print("✅ Tüm aboneler bağlandı ve her olayı aldı" if ok else "❌ Abonelerin bir kısmı bağlanamadı veya olay kaçırdı")
+    return ok
+
+
+def bench_metrics(args):
+    """Çok worker'lı gunicorn: /metrics sayaçları tüm worker'ların toplamı mı + profil başlığı"""
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as metrics_dir, tempfile.TemporaryDirectory() as instance_dir:
+        env = {**os.environ, 'PREDICTA_SCHEDULER': 'off', 'PROMETHEUS_MULTIPROC_DIR': metrics_dir,
+               'PREDICTA_PROFILE': 'header', 'PREDICTA_INSTANCE_DIR': instance_dir}
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-b', f'127.0.0.1:{port}',
+                                   '-w', str(args.workers), '--timeout', '120', '--graceful-timeout', '2'],
+                                  cwd=base_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f'http://127.0.0.1:{port}'
+        try:
+            for _ in range(150):
+                try:
+                    urllib.request.urlopen(f'{url}/health', timeout=5).read()
+                    break
+                except OSError:
+                    time.sleep(0.2)
+            else:
+                print("❌ Sunucu başlamadı")
+                return False
+            time.sleep(2)  # diğer worker'lar da modeli yüklesin
+
+            def hit(_):
+                t0 = time.perf_counter()
+                urllib.request.urlopen(f'{url}/api/matches', timeout=30).read()
+                return time.perf_counter() - t0
+
+            with ThreadPoolExecutor(16) as pool:
+                latencies = np.array(list(pool.map(hit, range(args.requests)))) * 1000
+
+            req = urllib.request.Request(f'{url}/api/matches', headers={'X-Predicta-Profile': '1'})
+            with urllib.request.urlopen(req, timeout=30) as r:
+                report = r.headers.get('X-Predicta-Profile')
+            body = urllib.request.urlopen(f'{url}/metrics', timeout=30).read().decode()
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        pids = {name.rsplit('_', 1)[-1] for name in os.listdir(metrics_dir)}
+
+    key = 'predicta_http_request_seconds_count{endpoint="/api/matches",method="GET",status="200"}'
+    counted = sum(float(line.split()[-1]) for line in body.splitlines() if line.startswith(key))
+    print(f"📈 {args.requests} istek, p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms; "
+          f"/metrics sayacı {counted:.0f} (+1 profil isteği), {len(pids)} süreç dosyası")
+    print(f"🔬 Profil raporu: {report or '-'}")
+    families = sorted({line.split()[2] for line in body.splitlines() if line.startswith('# TYPE predicta_')})
+    print(f"📋 {len(families)} metrik: {', '.join(families)}")
+    ok = counted == args.requests + 1 and report is not None
+    print("✅ Metrikler worker'lar arasında doğru toplanıyor" if ok else "❌ Metrik toplamı tutmuyor")
+    return ok
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(c) for c in f.read().split()]
+    except OSError:
+        return []
+
+
+def _pss_mb(pid):
+    """Süreç başına orantılı bellek (paylaşılan sayfalar paylaşanlara bölünür)"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('Pss:')) / 1024
+    except (OSError, StopIteration):
+        return float('nan')
+
+
+def bench_startup(args):
+    """Gunicorn açılışı: liveness (/health) ve readiness (/health/ready) süreleri, yükleme modlarına göre"""
+    import urllib.error
+    import urllib.request
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = ("import sys, time; t0 = time.perf_counter(); import app; "
+             "print(round(time.perf_counter() - t0, 3), *[m for m in ('pandas', 'httpx', 'rapidfuzz', 'apscheduler') "
+             "if m in sys.modules])")
+
+    def status(url):
+        try:
+            with urllib.request.urlopen(url, timeout=5) as r:
+                return r.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except OSError:
+            return None
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = os.path.join(tmp, 'dataset.csv')
+        make_synthetic_frame(args.rows).to_csv(dataset, index=False)
+        env = {**os.environ, 'PREDICTA_SCHEDULER': 'off', 'PREDICTA_DATASET': dataset,
+               'PREDICTA_SNAPSHOT_DIR': os.path.join(tmp, 'snapshot'), 'PREDICTA_INSTANCE_DIR': os.path.join(tmp, 'instance'),
+               'PROMETHEUS_MULTIPROC_DIR': os.path.join(tmp, 'metrics')}
+        os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+        for key in ('GUNICORN_PRELOAD', 'GUNICORN_WORKER_CLASS', 'PREDICTA_MODEL_LOAD'):
+            env.pop(key, None)
+
+        out = subprocess.run([sys.executable, '-c', probe], cwd=base_dir, capture_output=True, text=True,
+                             env={**env, 'PREDICTA_MODEL_LOAD': 'off'}, check=True).stdout.split()
+        print(f"📦 import app (model yüklemeden): {float(out[0]) * 1000:.0f} ms; yüklenen ağır modüller: {', '.join(out[1:]) or 'yok'}")
+        print(f"💾 Veri: {args.rows} maç, {os.path.getsize(dataset) / 1e6:.0f} MB; gunicorn {args.workers} worker")
+
+        # Arka plan yükleyicisi ancak gerçek iş parçacığında istekleri bloklamaz (gevent'te greenlet)
+        modes = (('eager', {'PREDICTA_MODEL_LOAD': 'eager', 'GUNICORN_PRELOAD': '0'}, "🐢 Eski davranış (import'ta yükleme)"),
+                 ('background', {'GUNICORN_PRELOAD': '0', 'GUNICORN_WORKER_CLASS': 'gthread'},
+                  "⚡ Arka planda yükleme (gthread)"),
+                 ('preload', {'GUNICORN_PRELOAD': '1'}, "🍴 --preload + fork"))
+        for snapshot in ('yok', 'var'):
+            for mode, extra, label in modes:
+                if snapshot == 'yok':
+                    shutil.rmtree(env['PREDICTA_SNAPSHOT_DIR'], ignore_errors=True)
+                port = _free_port()
+                t0 = time.perf_counter()
+                server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-b', f'127.0.0.1:{port}',
+                                           '-w', str(args.workers), '--timeout', '300', '--graceful-timeout', '2'],
+                                          cwd=base_dir, env={**env, **extra},
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                live = ready = None
+                try:
+                    while time.perf_counter() - t0 < args.timeout and ready is None:
+                        if live is None and status(f'http://127.0.0.1:{port}/health') == 200:
+                            live = time.perf_counter() - t0
+                        if live is not None and status(f'http://127.0.0.1:{port}/health/ready') == 200:
+                            ready = time.perf_counter() - t0
+                        time.sleep(0.02)
+                    # Her worker hazır olsun (istekler farklı worker'lara düşebilir)
+                    for _ in range(4 * args.workers): status(f'http://127.0.0.1:{port}/health/ready')
+                    pss = sum(_pss_mb(pid) for pid in _children(server.pid))
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+                ok &= ready is not None
+                fmt = lambda t: f"{t:.2f} sn" if t is not None else "zaman aşımı"
+                print(f"{label}, snapshot {snapshot}: canlı {fmt(live)}, hazır {fmt(ready)}, "
+                      f"worker PSS toplamı {pss:.0f} MB")
+    return ok
+
+
+def current_rss_mb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS')) / 1024
+
+
+def _memory_child(args):
+    """Alt süreç: snapshot'tan takım durumunu kur (sözlük+liste veya diziler), RSS artışı ve okuma süresi"""
+    import gc
+
+    from engine import load_snapshot
+
+    gc.collect()
+    base_rss, base_objects = current_rss_mb(), len(gc.get_objects())
+    engine, _ = load_snapshot(args.root, args.source)
+    n, window = len(engine.teams), engine.window
+
+    if args.mode == 'dict':
+        # Eski düzen: takım başına 9 anahtarlı sözlük, dört Python listesi
+        state = engine.team_stats()
+        del engine
+        gc.collect()
+
+        def read():
+            out = []
+            for stats in state.values():
+                form, goals = stats['form_home'][-window:], stats['recent_goals_h'][-window:]
+                out.append((sum(form) / (len(form) * 3), np.mean(goals)) if form else (0.0, 0.0))
+            return out
+    else:
+        # Diziler mmap'ten okunur: sayfaları belleğe al, türetilen rating'leri hesapla
+        state = engine
+        for name in ('att_h', 'def_h', 'att_a', 'def_a'): getattr(engine, name)
+        columns = {name: getattr(engine, name) for name in (
+            'form_home', 'form_away', 'goals_home', 'goals_away', 'n_home', 'n_away', 'team_league',
+            'form_sum_home', 'form_sum_away', 'goal_sum_home', 'goal_sum_away')}
+        for col in columns.values(): col.sum()
+
+        def read():
+            played = np.minimum(engine.n_home, window)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return engine.form_sum_home / (played * 3), engine.goal_sum_home / played
+
+    gc.collect()
+    rss, objects = current_rss_mb(), len(gc.get_objects())
+    _, seconds = timed(read)
+    t0 = time.perf_counter()
+    gc.collect()
+    gc_seconds = time.perf_counter() - t0
+    out = {'teams': n, 'rss_mb': rss - base_rss, 'objects': objects - base_objects,
+           'read_seconds': seconds, 'gc_seconds': gc_seconds}
+    if args.mode == 'arrays':
+        out['bytes'] = {name: col.nbytes for name, col in columns.items()}
+    print(json.dumps(out))
+    del state
+
+
+def bench_memory(args):
+    """Takım durumu: takım başına sözlük + listeler vs. dizi sütunları (RSS, GC nesneleri, form okuma)"""
+    from engine import RatingEngine, load_snapshot, save_snapshot
+
+    # Her takımın pencereleri dolsun: takım başına ~2 * rows / teams maç
+    teams_per_league = 100
+    leagues = max(args.teams // teams_per_league, 1)
+    df = make_synthetic_frame(args.teams * args.matches // 2, leagues=leagues, teams_per_league=teams_per_league)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'dataset.csv')
+        df.to_csv(source, index=False)
+        root = os.path.join(tmp, 'snapshot')
+        engine = RatingEngine()
+        engine.fit_frame(df.sort_values('date', kind='stable'))
+        _, fingerprint = load_snapshot(root, source)
+        save_snapshot(engine, root, fingerprint)
+        del df, engine
+
+        results = {}
+        for mode in ('dict', 'arrays'):
+            out = subprocess.run([sys.executable, __file__, '_memory', mode, root, source],
+                                 capture_output=True, text=True, check=True)
+            results[mode] = json.loads(out.stdout)
+
+    old, new = results['dict'], results['arrays']
+    print(f"👥 {new['teams']} takım, takım başına ~{args.matches} maç")
+    for label, r in (("🐢 Sözlük + listeler", old), ("⚡ Dizi sütunları", new)):
+        print(f"{label}: RSS +{r['rss_mb']:.1f} MB, +{r['objects']:,} GC nesnesi, tam GC {r['gc_seconds'] * 1000:.1f} ms, "
+              f"form okuma (tüm takımlar) {r['read_seconds'] * 1000:.2f} ms")
+    windows = sum(v for k, v in new['bytes'].items() if k.startswith(('form', 'goal')))
+    print(f"📐 Pencereler + toplamlar: {windows / new['teams']:.0f} bayt/takım; "
+          f"RSS oranı {old['rss_mb'] / max(new['rss_mb'], 0.1):.1f}x")
+    ok = new['rss_mb'] < old['rss_mb'] and new['objects'] < old['objects']
+    print("✅ Dizi düzeni daha az bellek ve GC nesnesi kullanıyor" if ok else "❌ Dizi düzeni beklenen kazancı vermedi")
+    return ok
+
+
+LEGACY_MATCH_DDL = """CREATE TABLE "match" (
+    id INTEGER NOT NULL, code VARCHAR(20), league VARCHAR(50), home_team VARCHAR(50), away_team VARCHAR(50),
+    date DATETIME, odds TEXT, prob_home FLOAT, prob_draw FLOAT, prob_away FLOAT, prob_over_25 FLOAT,
+    prob_btts FLOAT, status VARCHAR(20), score_home INTEGER, score_away INTEGER, result_str VARCHAR(10),
+    is_successful BOOLEAN, PRIMARY KEY (id), UNIQUE (code))"""
+
+
+HISTORY_PAGE_ROWS = 50
+
+
+def _legacy_match_rows(n, seed=3):
+    """Son ~3 yıla yayılmış maçlar; son 3 günün dışındakiler sonuçlanmış"""
+    from bulletin import ODDS_KEYS
+
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now().floor('min')
+    offsets = np.sort(rng.integers(-3 * 365 * 24 * 60, 3 * 24 * 60, n))
+    odds = np.round(rng.uniform(1.1, 6.0, (n, len(ODDS_KEYS))), 2)
+    for i in range(n):
+        date = now + pd.Timedelta(minutes=int(offsets[i]))
+        finished = offsets[i] < -3 * 24 * 60
+        o = dict(zip(ODDS_KEYS, odds[i].tolist()))
+        if i % 7 == 0: o['kgvar'] = o['kgyok'] = '-'
+        p = rng.dirichlet((3, 2, 3))
+        yield (i + 1, str(100000 + i), f"L{i % 40}", f"H{i % 500}", f"A{i % 497}",
+               date.strftime('%Y-%m-%d %H:%M:%S.%f'), json.dumps(o), *p.tolist(), 0.5, 0.5,
+               'Finished' if finished else 'Pending', 1 if finished else None, 1 if finished else None,
+               'X' if finished else None, finished)
+
+
+def bench_db(args):
+    """Eski şema (indeks yok, JSON oran) vs. göç sonrası: tipik sorgu süreleri"""
+    from bulletin import ODDS_KEYS
+    from schema import apply_pragmas, migrate
+
+    now = pd.Timestamp.now()
+    fmt = lambda t: t.strftime('%Y-%m-%d %H:%M:%S.%f')
+    odds_cols = ', '.join(ODDS_KEYS)
+    queries = {
+        '/api/matches (date >= şimdi-2 sa)': ("SELECT * FROM match WHERE date >= ?", (fmt(now - pd.Timedelta(hours=2)),)),
+        '/api/history (Finished, son 50)': ("SELECT * FROM match WHERE status = 'Finished' ORDER BY date DESC LIMIT 50", ()),
+        'update_match_results (Pending, date <= şimdi-3 sa)': ("SELECT * FROM match WHERE date <= ? AND status = 'Pending'",
+                                                   (fmt(now - pd.Timedelta(hours=3)),)),
+    }
+
+    def measure(con, legacy):
+        timings = {}
+        for name, (sql, params) in queries.items():
+            if not legacy: sql = sql.replace('*', f'id, code, date, status, {odds_cols}', 1)
+            best = float('inf')
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                rows = con.execute(sql, params).fetchall()
+                # Oranların okunması: eski şemada her satırda json.loads
+                if legacy: [json.loads(r[6]) for r in rows]
+                else: [dict(zip(ODDS_KEYS, r[4:])) for r in rows]
+                best = min(best, time.perf_counter() - t0)
+            plan = con.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()[-1][-1]
+            timings[name] = best
+            print(f"  {name}: {best * 1000:.2f} ms, {len(rows)} satır [{plan}]")
+        return timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'predictapro.db')
+        con = sqlite3.connect(path)
+        con.execute(LEGACY_MATCH_DDL)
+        con.executemany(f"INSERT INTO match VALUES ({','.join('?' * 17)})", _legacy_match_rows(args.matches))
+        con.commit()
+        print(f"💾 {args.matches} maç, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        print("🐢 Eski şema:")
+        before = measure(con, True)
+
+        t0 = time.perf_counter()
+        migrate(con)
+        print(f"🛠️ Göç: {time.perf_counter() - t0:.2f} sn")
+        con.close()
+
+        con = sqlite3.connect(path)
+        apply_pragmas(con)
+        print("⚡ Göç sonrası (indeksler + sayısal oranlar + WAL):")
+        after = measure(con, False)
+
+        # Göç JSON'daki oranları birebir taşımış olmalı
+        sample = dict(con.execute(f"SELECT code, json_array({odds_cols}) FROM match WHERE id % 997 = 0").fetchall())
+        con.close()
+
+    ok = all(json.loads(v) == [None if o == '-' else o for o in json.loads(r[6]).values()]
+             for r in _legacy_match_rows(args.matches) if (v := sample.get(r[1])) is not None)
+    for name in queries:
+        print(f"📈 {name}: {before[name] / after[name]:.0f}x")
+    print("✅ Oranlar doğru taşındı" if ok else "❌ Göç sonrası oranlar farklı")
+    return ok
+
+
+def bench_history(args):
+    """/api/history: kümülatif sonuç toplamları (geri doldurma vs. artımlı, aralık sorgusu vs. tarama) + imleçli sayfalama"""
+    from types import SimpleNamespace
+    from history import INCREMENT_SQL, STAT_COLUMNS, range_params, range_sql, stat_deltas
+    from schema import apply_pragmas, migrate
+
+    rng = np.random.default_rng(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'predictapro.db')
+        con = sqlite3.connect(path)
+        con.execute(LEGACY_MATCH_DDL)
+        con.executemany(f"INSERT INTO match VALUES ({','.join('?' * 17)})", _legacy_match_rows(args.matches))
+        # Rastgele skor ve olasılıklar; eşit olasılıklı maçlar da olsun (seçim önceliği)
+        n = args.matches
+        probs = rng.dirichlet((3, 2, 3), n)
+        probs[::50] = 1 / 3
+        con.executemany("UPDATE match SET prob_home = ?, prob_draw = ?, prob_away = ?, prob_over_25 = ?, prob_btts = ?, "
+                        "score_home = CASE WHEN status = 'Finished' THEN ? END, "
+                        "score_away = CASE WHEN status = 'Finished' THEN ? END WHERE id = ?",
+                        zip(*probs.T.tolist(), rng.choice([0.3, 0.5, 0.7], n).tolist(), rng.uniform(0.2, 0.8, n).tolist(),
+                            rng.poisson(1.4, n).tolist(), rng.poisson(1.1, n).tolist(), range(1, n + 1)))
+        con.commit()
+
+        t0 = time.perf_counter()
+        migrate(con)
+        print(f"🛠️ Göç + geri doldurma ({n} maç): {time.perf_counter() - t0:.2f} sn")
+        con.close()
+        con = sqlite3.connect(path)
+        apply_pragmas(con)
+
+        columns = "league, date, prob_home, prob_draw, prob_away, prob_over_25, prob_btts, score_home, score_away"
+        as_match = lambda r: SimpleNamespace(league=r[0], date=pd.Timestamp(r[1]).to_pydatetime(), prob_home=r[2],
+                                             prob_draw=r[3], prob_away=r[4], prob_over_25=r[5], prob_btts=r[6],
+                                             score_home=r[7], score_away=r[8])
+        finished = [as_match(r) for r in con.execute(f"SELECT {columns} FROM match WHERE status = 'Finished'")]
+        deltas = stat_deltas(finished)
+        backfilled = con.execute("SELECT * FROM result_stat ORDER BY league, day").fetchall()
+
+        # Artımlı yol (settle_matches): günler karışık sırayla gelse de geri doldurmayla aynı tablo
+        con.execute("DELETE FROM result_stat")
+        order = rng.permutation(len(deltas))
+        keys = list(deltas)
+        t0 = time.perf_counter()
+        for i in order:
+            league, day = keys[i]
+            params = {"league": league, "day": day.isoformat(), **deltas[keys[i]]}
+            for sql in INCREMENT_SQL:
+                con.execute(sql, params)
+        con.commit()
+        incremental = time.perf_counter() - t0
+        ok = con.execute("SELECT * FROM result_stat ORDER BY league, day").fetchall() == backfilled
+        print(f"{'✅' if ok else '❌'} Artımlı güncelleme = geri doldurma: {len(backfilled)} (lig, gün) satırı, "
+              f"{len(finished)} maç ({incremental / len(deltas) * 1000:.3f} ms/grup, karışık sıra)")
+
+        def best(sql, params=(), post=None):
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                rows = con.execute(sql, params).fetchall()
+                if post: rows = post(rows)
+                timings.append(time.perf_counter() - t0)
+            return min(timings), rows
+
+        def scan_stats(rows):
+            # Eski yol: maçlar okunup Python'da sayılır
+            out = {}
+            for (league, _), counts in stat_deltas(map(as_match, rows)).items():
+                row = out.setdefault(league, dict.fromkeys(STAT_COLUMNS, 0))
+                for c in STAT_COLUMNS: row[c] += counts[c]
+            return out
+
+        now = pd.Timestamp.now().normalize()
+        cases = {
+            'tüm geçmiş': (None, None, None),
+            'tek lig': ('L7', None, None),
+            'son 90 gün': (None, now - pd.Timedelta(days=90), None),
+            '1 yıllık aralık, tek lig': ('L3', now - pd.Timedelta(days=700), now - pd.Timedelta(days=335)),
+        }
+        for name, (league, date_from, date_to) in cases.items():
+            where, params = "", []
+            if league: where, params = where + " AND league = ?", params + [league]
+            if date_from is not None: where, params = where + " AND date >= ?", params + [str(date_from)]
+            if date_to is not None: where, params = where + " AND date < ?", params + [str(date_to + pd.Timedelta(days=1))]
+            scan, expected = best(f"SELECT {columns} FROM match WHERE status = 'Finished'{where}", params, scan_stats)
+            agg, rows = best(range_sql(league=bool(league)), range_params(league, date_from, date_to))
+            actual = {r[0]: dict(zip(STAT_COLUMNS, r[1:])) for r in rows}
+            same = actual == expected
+            ok &= same
+            print(f"  {name}: tarama {scan * 1000:.1f} ms ({sum(r['total'] for r in expected.values())} maç) vs "
+                  f"kümülatif {agg * 1000:.2f} ms ({len(actual)} lig) {'✅' if same else '❌'}")
+
+        # Sayfalama: OFFSET vs. (date, id) imleci, aynı derinlikte
+        depth = min(args.depth, len(finished) - HISTORY_PAGE_ROWS)
+        offset, page = best("SELECT id, date FROM match WHERE status = 'Finished' ORDER BY date DESC, id DESC "
+                            "LIMIT ? OFFSET ?", (HISTORY_PAGE_ROWS, depth))
+        before = con.execute("SELECT date, id FROM match WHERE status = 'Finished' ORDER BY date DESC, id DESC "
+                             "LIMIT 1 OFFSET ?", (depth - 1,)).fetchone()
+        plan = con.execute("EXPLAIN QUERY PLAN SELECT id FROM match WHERE status = 'Finished' AND (date, id) < (?, ?) "
+                           "ORDER BY date DESC, id DESC LIMIT 1", before).fetchall()[-1][-1]
+        keyset, keyset_page = best("SELECT id, date FROM match WHERE status = 'Finished' AND (date, id) < (?, ?) "
+                                   "ORDER BY date DESC, id DESC LIMIT ?", (*before, HISTORY_PAGE_ROWS))
+        same = page == keyset_page
+        ok &= same
+        print(f"  {depth}. satırdan sayfa: OFFSET {offset * 1000:.2f} ms vs imleç {keyset * 1000:.2f} ms "
+              f"{'✅' if same else '❌'} [{plan}]")
+        con.close()
+    return ok
+
+
+def bench_sweep(args):
+    """Vektörel aday değerlendirme == backtest.py gün gün tekrarı; aday başına süre"""
+    import backtest
+    import sweep
+    from engine import DEFAULT_CONFIG
+
+    df = load_frame(args)
+    if not args.csv:
+        # Küme düşme / yükselme: bazı takımlar ikinci yarıda başka ligde oynar
+        late = df.index >= len(df) // 2
+        moved = df['home_team'].isin(['T0_0', 'T0_1', 'T0_2']) | df['away_team'].isin(['T0_0', 'T0_1', 'T0_2'])
+        df.loc[late & moved, 'league'] = 'L1'
+    arrays = sweep.build_arrays(backtest.prepare(df))
+    rows = np.arange(len(arrays['home']))
+
+    ok = True
+    for config in (DEFAULT_CONFIG, DEFAULT_CONFIG.replace(alpha=0.27, form_good=0.6, form_bad_mult=0.8, dc_00=1.3)):
+        _, metrics, _ = backtest.backtest(df, jobs=1, config=config)
+        (loss, _), t_fast = timed(lambda: sweep.score_rows(arrays, sweep.predict_all(arrays, config), rows))
+        sweep._BASE.clear()
+        # xG tam dc_threshold sınırındaysa toplama sırası farkı düzeltmeyi birkaç satırda açıp kapatabilir
+        diff = np.abs(loss - metrics['log_loss'].to_numpy())
+        mean_diff = abs(float(loss.mean() - metrics['log_loss'].mean()))
+        ok &= (diff > 1e-9).mean() < 1e-3
+        print(f"🔎 alpha={config.alpha}: log-loss {loss.mean():.6f} vs backtest {metrics['log_loss'].mean():.6f} "
+              f"(ortalama fark {mean_diff:.1e}, 1e-9'dan farklı {int((diff > 1e-9).sum())} satır, {t_fast * 1000:.0f} ms)")
+
+    configs = sweep.candidates(DEFAULT_CONFIG, random_n=args.candidates - 1)
+    _, elapsed = timed(lambda: [sweep.predict_all(arrays, c) for c in configs])
+    _, t_backtest = timed(backtest.backtest, df, 1)
+    print(f"⚡ {len(configs)} aday: {elapsed / len(configs) * 1000:.0f} ms/aday "
+          f"(backtest.py tek aday {t_backtest * 1000:.0f} ms, {len(rows)} maç)")
+    print("✅ Tarama değerlendirmesi backtest ile aynı" if ok else "❌ Tarama değerlendirmesi backtest'ten farklı")
+    return ok
+
+
+def _ingest_child(args):
+    """Alt süreç: veri dosyasını tek modla motora işle; süre, tepe RSS ve rating'leri JSON olarak yaz"""
+    from dataset import load_match_frame, stream_fit
+    from engine import RatingEngine
+
+    engine = RatingEngine()
+    t0 = time.perf_counter()
+    if args.mode == 'frame':
+        df = load_match_frame(args.file)
+        engine.fit_frame(df)
+        rows = len(df)
+        del df
+    elif args.mode == 'stream':
+        rows = stream_fit(engine, args.file, args.chunk)
+    else:
+        rows = 0
+    elapsed = time.perf_counter() - t0
+    ratings = {name: [float(getattr(engine, attr)[i]) for attr in ('att_h', 'def_h', 'att_a', 'def_a')]
+               for i, name in enumerate(engine.teams)}
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'ratings': ratings, 'teams': engine.teams,
+                      'peak_rss_mb': peak_rss_mb()}))
+
+
+def _date_format_check(tmp, chunk):
+    """Gün-önce tarihli CSV: ilk değeri belirsiz (01/02) parçalar ilk parçanın biçimiyle okunmalı"""
+    from dataset import iter_frames
+
+    dates = pd.date_range('2020-01-13', periods=3 * chunk, freq='h').floor('D')
+    frame = pd.DataFrame({'Date': dates.strftime('%d/%m/%Y'), 'HomeTeam': 'A', 'AwayTeam': 'B',
+                          'FTHG': 1, 'FTAG': 0})
+    # İkinci parça belirsiz bir günle başlasın: 01/02/2020 (1 Şubat)
+    frame.loc[chunk, 'Date'] = '01/02/2020'
+    dates = dates.to_series(index=frame.index)
+    dates[chunk] = pd.Timestamp('2020-02-01')
+    path = os.path.join(tmp, 'dayfirst.csv')
+    frame.to_csv(path, index=False)
+    parsed = pd.concat([part['date'] for part in iter_frames(path, chunk)], ignore_index=True)
+    wrong = int((parsed != dates.reset_index(drop=True)).sum())
+    print(f"{'✅' if not wrong else '❌'} Gün-önce CSV, parçalar arası tutarlı tarih: {wrong} hatalı satır")
+    return not wrong
+
+
+def bench_ingest(args):
+    """Tek parça okuma + sıralama vs. parça parça okuma + diskte birleştirme sıralaması"""
+    df = make_synthetic_frame(args.rows).sample(frac=1, random_state=1)  # dosya tarih sıralı değil
+    df.loc[df.index[::997], 'date'] = pd.NaT
+    # Eşanlamlı başlıklar + modelin kullanmadığı kolonlar (usecols ile atlanır)
+    df = df.rename(columns={'home_team': 'HomeTeam', 'away_team': 'AwayTeam', 'home_score': 'FTHG',
+                            'away_score': 'FTAG', 'date': 'Date', 'league': 'League'})
+    df['Referee'] = 'Hakem ' + (df['FTHG'] * 7 % 50).astype(str)
+    df['Notes'] = 'x' * 40
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # (dosya, karşılaştırılacak tek parça dosyası)
+        csv = os.path.join(tmp, 'dataset.csv')
+        df.to_csv(csv, index=False)
+        paths = [(csv, csv)]
+        try:
+            paths.append((os.path.join(tmp, 'dataset.parquet'), csv))
+            df.to_parquet(paths[-1][0], index=False, row_group_size=args.chunk)
+        except ImportError:
+            paths.pop()
+            print("ℹ️ pyarrow kurulu değil; Parquet ölçülmedi")
+        # Tarihsiz ve tarihlerin çoğu okunamayan dosyalar: aynı tarih anahtarı akışı tek partiye yığmamalı
+        nodate = os.path.join(tmp, 'nodate.csv')
+        df.drop(columns='Date').to_csv(nodate, index=False)
+        baddate = os.path.join(tmp, 'baddate.csv')
+        df['Date'] = df['Date'].where(np.arange(len(df)) % 10 == 0, 'bilinmiyor')
+        df.to_csv(baddate, index=False)
+        paths += [(nodate, nodate), (baddate, baddate)]
+        del df
+
+        results = {}
+        for path, reference in paths:
+            for mode in ('noop', 'frame', 'stream'):
+                if (path, mode) in results or (mode == 'frame' and path != reference): continue
+                out = subprocess.run([sys.executable, __file__, '_ingest', mode, path, '--chunk', str(args.chunk)],
+                                     capture_output=True, text=True, check=True)
+                results[(path, mode)] = json.loads(out.stdout)
+
+        def growth(path, mode):
+            return results[(path, mode)]['peak_rss_mb'] - results[(path, 'noop')]['peak_rss_mb']
+
+        for path, reference in paths:
+            size = os.path.getsize(path) / 1e6
+            name = os.path.basename(path)
+            for mode, label in (('frame', '🐢 Tek parça'), ('stream', '⚡ Akış')):
+                if (path, mode) not in results: continue
+                r, ref = results[(path, mode)], results[(reference, 'frame')]
+                diff = max(max(abs(a - b) for a, b in zip(r['ratings'][t], ref['ratings'][t])) for t in ref['teams'])
+                same = r['teams'] == ref['teams'] and diff < 1e-9
+                ok &= same
+                print(f"{label} ({name}, {size:.0f} MB): {r['seconds']:.1f} sn, "
+                      f"tepe RSS +{growth(path, mode):.0f} MB, {r['rows']} maç, fark {diff:.1e}")
+        # Tarihsiz/okunamayan tarihli akış, tarihli akıştan belirgin fazla bellek kullanmamalı
+        limit = 1.5 * growth(csv, 'stream') + 50
+        bounded = all(growth(path, 'stream') <= limit for path in (nodate, baddate))
+        ok &= bounded
+        print(f"{'✅' if bounded else '❌'} Aynı tarihli satırlar parça parça birleşti "
+              f"(tepe RSS sınırı +{limit:.0f} MB)")
+        ok &= _date_format_check(tmp, args.chunk)
+
+    print("✅ Akış modu tek parça okumayla aynı" if ok else "❌ Akış modu farklı rating üretti")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicta PRO performans ölçümleri")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ratings', help="Rating motoru: iterrows döngüsüne karşı eşitlik + satır/sn")
+    p.add_argument('--rows', type=int, default=50000)
+    p.add_argument('--csv', help="Sentetik veri yerine gerçek CSV kullan")
+    p.add_argument('--skip-legacy', action='store_true', help="Yalnızca vektörel motoru ölç")
+    p.set_defaults(func=bench_ratings)
+
+    p = sub.add_parser('snapshot', help="CSV'den kurulum vs. snapshot yükleme süresi")
+    p.add_argument('--rows', type=int, default=200000)
+    p.set_defaults(func=bench_snapshot)
+
+    p = sub.add_parser('online', help="apply_result ile tek maç güncelleme vs. tam yeniden kurulum")
+    p.add_argument('--rows', type=int, default=50000)
+    p.add_argument('--tail', type=int, default=5000)
+    p.set_defaults(func=bench_online)
+
+    p = sub.add_parser('predict', help="Skaler scipy predict vs. vektörel predict_batch")
+    p.add_argument('--rows', type=int, default=20000)
+    p.add_argument('--fixtures', type=int, default=500)
+    p.set_defaults(func=bench_predict)
+
+    p = sub.add_parser('teams', help="Takım eşleştirme: aksanlı/farklı yazılmış takım ve lig isimleri")
+    p.add_argument('--filler', type=int, default=5000)
+    p.set_defaults(func=bench_teams)
+
+    p = sub.add_parser('markets', help="Saklı skor matrisinden marketler: döngüyle eşitlik + market başına Poisson'a karşı süre")
+    p.add_argument('--rows', type=int, default=50000)
+    p.add_argument('--fixtures', type=int, default=500)
+    p.set_defaults(func=bench_markets)
+
+    p = sub.add_parser('bulletin', help="Bülten ayrıştırma: tam JSON vs. akış (süre + tepe RSS)")
+    p.add_argument('--events', type=int, default=20000)
+    p.add_argument('--file', help="Sentetik veri yerine kayıtlı bülten dosyası")
+    p.set_defaults(func=bench_bulletin)
+
+    p = sub.add_parser('fetch', help="Yerel stub sunucuya karşı koşullu indirme + maç bazlı fark")
+    p.add_argument('--events', type=int, default=3000)
+    p.add_argument('--no-etag', action='store_true', help="Sunucu ETag/304 desteklemesin")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser('feeds', help="Async indirme katmanı: yeniden deneme, eşzamanlılık, keep-alive, hız sınırı")
+    p.add_argument('--events', type=int, default=3000)
+    p.add_argument('--delay', type=float, default=0.5, help="Stub sunucu yanıt gecikmesi (sn)")
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--interval', type=float, default=0.3, help="Hız sınırı testi için min_interval (sn)")
+    p.set_defaults(func=bench_feeds)
+
+    p = sub.add_parser('sse', help="Gunicorn altında N SSE abonesine olay teslim gecikmesi")
+    p.add_argument('--clients', type=int, default=300)
+    p.add_argument('--events', type=int, default=5)
+    p.add_argument('--interval', type=float, default=1.0, help="Olaylar arası saniye")
+    p.add_argument('--workers', type=int, default=2, help="start.sh'teki gibi")
+    p.set_defaults(func=bench_sse)
+
+    p = sub.add_parser('metrics', help="Çok worker'lı gunicorn altında /metrics toplamı + profil kancası")
+    p.add_argument('--workers', type=int, default=3)
+    p.add_argument('--requests', type=int, default=600)
+    p.set_defaults(func=bench_metrics)
+
+    p = sub.add_parser('startup', help="Gunicorn açılışı: liveness/readiness süresi (import'ta, arka planda, --preload)")
+    p.add_argument('--rows', type=int, default=1000000)
+    p.add_argument('--workers', type=int, default=2)
+    p.add_argument('--timeout', type=float, default=300)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser('db', help="Eski şema vs. indeksli/sayısal şema: sorgu süreleri")
+    p.add_argument('--matches', type=int, default=100000)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_db)
+
+    p = sub.add_parser('history', help="Geçmiş: (lig, gün) toplamları vs. tarama, imleç vs. OFFSET")
+    p.add_argument('--matches', type=int, default=200000)
+    p.add_argument('--depth', type=int, default=100000, help="Sayfalama testinde atlanacak satır")
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_history)
+
+    p = sub.add_parser('sweep', help="Vektörel parametre taraması vs. backtest.py: eşitlik + aday başına süre")
+    p.add_argument('--rows', type=int, default=30000)
+    p.add_argument('--csv', help="Sentetik veri yerine gerçek CSV kullan")
+    p.add_argument('--candidates', type=int, default=20)
+    p.set_defaults(func=bench_sweep)
+
+    p = sub.add_parser('ingest', help="Büyük CSV/Parquet: tek parça okuma vs. akış (süre + tepe RSS)")
+    p.add_argument('--rows', type=int, default=1000000)
+    p.add_argument('--chunk', type=int, default=100000)
+    p.set_defaults(func=bench_ingest)
+
+    p = sub.add_parser('memory', help="Takım durumu: sözlük + listeler vs. dizi sütunları (RSS, GC nesneleri)")
+    p.add_argument('--teams', type=int, default=50000)
+    p.add_argument('--matches', type=int, default=20, help="Takım başına maç")
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser('_memory')
+    p.add_argument('mode', choices=('dict', 'arrays'))
+    p.add_argument('root')
+    p.add_argument('source')
+    p.set_defaults(func=_memory_child)
+
+    p = sub.add_parser('_ingest')
+    p.add_argument('mode', choices=('noop', 'frame', 'stream'))
+    p.add_argument('file')
+    p.add_argument('--chunk', type=int, default=100000)
+    p.set_defaults(func=_ingest_child)
+
+    p = sub.add_parser('_parse')
+    p.add_argument('mode', choices=('noop', 'json', 'stream'))
+    p.add_argument('file')
+    p.set_defaults(func=_parse_child)
+
+    args = parser.parse_args()
+    ok = args.func(args)
+    sys.exit(0 if ok is not False else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Predicta PRO - Nesine bülten ayrıştırıcı
+
+Ham bülten JSON'undan yalnızca futbol (GT=1) maçlarını ve kullandığımız üç
+marketi (MTID 1: maç sonucu, 14: karşılıklı gol, 450: 2.5 alt/üst) kompakt
+kayıtlara çevirir. Flask/DB bağımlılığı yoktur.
+
+Akış modunda (ijson) sg.EA öğeleri yanıt okunurken tek tek işlenir; bülten ne
+kadar büyük olursa olsun bellekte aynı anda yalnızca bir maç bulunur.
+
+BulletinFetcher koşullu GET (ETag / If-Modified-Since) kullanır ve her maçın
+(oranlar + başlama saati) parmak izini saklar; yalnızca değişen maçlar
+tahmin ve veritabanı aşamasına geçer. İndirme feeds.FeedClient üzerinden
+yapılır (bağlantı havuzu, yeniden deneme, hız sınırı).
+
+Sonuç beslemesi (NESINE_RESULTS_URL). DİKKAT: bu şema bir varsayımdır; Nesine'nin
+sonuç uç noktası belgelenmemiştir ve alan adları/durum kodları gerçek yanıtla
+doğrulanmadı. Beklenen yük, bültenle aynı zarf:
+    {"sg": {"EA": [
+        {"C": 2918201, "S": "MS", "HS": 2, "AS": 1},   # C: bültendeki maç kodu
+        ...                                             # S: durum, HS/AS: ev/deplasman gol
+    ]}}
+Yalnızca durumu FINISHED_STATUSES içinde olan ve iki skoru da tam sayıya
+çevrilebilen öğeler sonuç sayılır; aynı kod iki kez gelirse sonuncusu geçerlidir.
+Örnek: fixtures/nesine_results.json (RESULTS_FIXTURE ile ağ yerine okunur).
+Gerçek besleme farklıysa yalnızca parse_result ve FINISHED_STATUSES değişir.
+"""
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+try:
+    import ijson
+except ImportError:  # ijson yoksa tam JSON okumaya düşülür
+    ijson = None
+
+from feeds import ConditionalFeed, FeedSource
+
+# MTID -> {N: oran anahtarı}
+MARKETS = {
+    1: {1: "ms1", 2: "msx", 3: "ms2"},
+    14: {1: "kgvar", 2: "kgyok"},
+    450: {1: "ust", 2: "alt"},
+}
+ODDS_KEYS = ("ms1", "msx", "ms2", "alt", "ust", "kgvar", "kgyok")
+FINISHED_STATUSES = {"MS", "FT", "Finished"}  # Varsayım (bkz. modül açıklaması)
+
+
+class BulletinEvent(NamedTuple):
+    code: str
+    league: str
+    home: str
+    away: str
+    date: datetime
+    odds: dict
+
+
+class ResultEvent(NamedTuple):
+    code: str
+    home_score: int
+    away_score: int
+
+
+def parse_event(m):
+    """Tek bülten maçını BulletinEvent'e çevir; futbol değilse veya MS oranı yoksa None"""
+    if m.get("GT") != 1: return None
+
+    odds = dict.fromkeys(ODDS_KEYS, "-")
+    for market in m.get("MA", []):
+        names = MARKETS.get(market.get("MTID"))
+        if not names: continue
+        for o in market.get("OCA", []):
+            key = names.get(o.get("N"))
+            if key: odds[key] = o["O"]
+
+    if odds["ms1"] == "-": return None
+
+    try:
+        date = datetime.strptime(f"{m.get('D')} {m.get('T')}", "%d.%m.%Y %H:%M")
+    except (TypeError, ValueError):
+        return None
+    return BulletinEvent(str(m.get("C")), m.get("LN"), m.get("HN"), m.get("AN"), date, odds)
+
+
+def parse_bulletin(d):
+    """getprebultenfull yanıtından maç listesi (aynı kod iki kez gelirse sonuncusu)"""
+    if "sg" not in d or "EA" not in d["sg"]: return []
+    events = {}
+    for m in d["sg"]["EA"]:
+        event = parse_event(m)
+        if event is not None:
+            events[event.code] = event
+    return list(events.values())
+
+
+def iter_events(fp):
+    """Bülten akışından (dosya / HTTP raw) BulletinEvent'leri sırayla üret"""
+    if ijson is None:
+        yield from parse_bulletin(json.load(fp))
+        return
+    for m in ijson.items(fp, 'sg.EA.item', use_float=True):
+        event = parse_event(m)
+        if event is not None:
+            yield event
+
+
+def parse_bulletin_stream(fp):
+    """Akıştan maç listesi (aynı kod iki kez gelirse sonuncusu)"""
+    return list({event.code: event for event in iter_events(fp)}.values())
+
+
+def parse_bulletin_file(path):
+    """Kaydedilmiş bülten dosyasını ayrıştır (offline test / fixture)"""
+    with open(path, 'rb') as f:
+        return parse_bulletin_stream(f)
+
+
+def parse_result(m):
+    """Sonuç beslemesi öğesi -> ResultEvent; maç bitmemişse veya skor eksikse None"""
+    if m.get("S") not in FINISHED_STATUSES: return None
+    try:
+        return ResultEvent(str(m["C"]), int(m["HS"]), int(m["AS"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def parse_results_stream(fp):
+    """Sonuç akışından biten maçlar (aynı kod iki kez gelirse sonuncusu)"""
+    items = ijson.items(fp, 'sg.EA.item') if ijson is not None else json.load(fp).get("sg", {}).get("EA", [])
+    results = {}
+    for m in items:
+        result = parse_result(m)
+        if result is not None:
+            results[result.code] = result
+    return list(results.values())
+
+
+def parse_results_file(path):
+    """Kaydedilmiş sonuç dosyasını ayrıştır (offline test / fixture)"""
+    with open(path, 'rb') as f:
+        return parse_results_stream(f)
+
+
+def event_fingerprint(event):
+    """Maçın içerik parmak izi: başlama saati + oran demeti"""
+    return event.date, tuple(event.odds[k] for k in ODDS_KEYS)
+
+
+class BulletinFetcher(ConditionalFeed):
+    """Koşullu bülten indirme + önceki çalıştırmaya göre maç bazlı fark.
+
+    Doğrulayıcılar ve parmak izleri ancak commit() ile kalıcı olur; böylece
+    veritabanı yazımı başarısız olan bir döngü bir sonrakinde tekrar işlenir.
+    """
+
+    def __init__(self, url, headers=None, timeout=15, runner=None, min_interval=0.0, retries=3):
+        super().__init__(FeedSource('nesine', url, parse_bulletin_stream, dict(headers or {}),
+                                    timeout, retries, min_interval), runner)
+        self.fingerprints = {}
+
+    def fetch(self):
+        """Bülten maç listesi; sunucu 304 dönerse None"""
+        return super().fetch()
+
+    def diff(self, events):
+        """(değişen maçlar, atlanan maç sayısı)"""
+        fingerprints = {e.code: event_fingerprint(e) for e in events}
+        changed = [e for e in events if self.fingerprints.get(e.code) != fingerprints[e.code]]
+        self._pending = {**(self._pending or {}), 'fingerprints': fingerprints}
+        return changed, len(events) - len(changed)
+
+    def commit(self):
+        """Son fetch/diff sonucunu bir sonraki döngünün referansı yap"""
+        pending = super().commit()
+        if 'fingerprints' in pending:
+            self.fingerprints = pending['fingerprints']
+        return pending
+
+
+def results_feed(url, headers=None, timeout=15, runner=None, min_interval=0.0, retries=3):
+    """Sonuç beslemesi: koşullu indirme, yük ResultEvent listesi"""
+    return ConditionalFeed(FeedSource('nesine_results', url, parse_results_stream, dict(headers or {}),
+                                      timeout, retries, min_interval), runner)
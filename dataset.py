@@ -0,0 +1,298 @@
+"""
+Predicta PRO - Tarihsel maç verisi okuma
+
+Kolon adları dosya başlığından bir kez çözülür (küçük harf + CSV_RENAME
+eşanlamlıları); yalnızca gereken kolonlar açık tiplerle okunur (takım ve
+lig 'category', skorlar int32, tarih datetime64).
+
+Büyük veri setleri için akış modu: dosya parça parça okunur, her parça
+tarihe göre sıralanıp geçici klasöre tamsayı kodlu ikili dosya olarak
+yazılır ve parçalar blok blok birleştirilerek (dış birleştirme sıralaması)
+motora tarih sırasıyla beslenir. Tepe bellek dosya boyutundan bağımsızdır:
+en fazla bir okuma parçası + parça başına bir birleştirme bloğu.
+
+Metin tarihlerin biçimi ilk tarihli parçadan bir kez çözülür ve tüm
+parçalara aynen verilir; parça başına tahmin gün/ay sırasını parçadan
+parçaya değiştirebilirdi.
+
+Parquet / Arrow (feather) dosyaları pyarrow kuruluysa kolon bazlı okunur;
+CSV'ye göre çok daha hızlıdır ve parça parça okunabilir.
+"""
+import os
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.dataset as pa_dataset
+except ImportError:  # pyarrow yoksa yalnızca CSV okunur
+    pa_dataset = None
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2: aynı fonksiyon henüz genel API'de değil
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+from engine import _intern
+
+CSV_RENAME = {
+    'hometeam': 'home_team', 'awayteam': 'away_team',
+    'fthg': 'home_score', 'ftag': 'away_score',
+    'evsahibi': 'home_team', 'deplasman': 'away_team'
+}
+MATCH_COLUMNS = ('home_team', 'away_team', 'home_score', 'away_score', 'date', 'league')
+REQUIRED_COLUMNS = ('home_team', 'away_team', 'home_score', 'away_score')
+CATEGORY_COLUMNS = ('home_team', 'away_team', 'league')
+# (1, X, 2) oran kolonları; ilk bulunan set kullanılır
+ODDS_COLUMN_SETS = (
+    ('ms1', 'msx', 'ms2'), ('odds_1', 'odds_x', 'odds_2'), ('psh', 'psd', 'psa'),
+    ('avgh', 'avgd', 'avga'), ('b365h', 'b365d', 'b365a'),
+)
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.pq': 'parquet', '.feather': 'feather', '.arrow': 'feather', '.ipc': 'feather'}
+CHUNK_ROWS = 200000
+DATE_SAMPLE = 1000      # Tarih biçimi bu kadar satırla sınanır
+NO_DATE = np.iinfo(np.int64).max  # Tarihsiz satırlar sona (pandas sort_values gibi)
+_RUN_COLUMNS = {'date': np.int64, 'league': np.int32, 'home': np.int32, 'away': np.int32,
+                'home_score': np.int32, 'away_score': np.int32}
+
+
+# --- KOLON ÇÖZÜMLEME ---
+def _columnar_format(path):
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def resolve_columns(columns, odds=False):
+    """Dosya başlığı -> {dosyadaki ad: standart ad}; aynı kolona düşen ilk ad kullanılır"""
+    wanted = set(MATCH_COLUMNS)
+    if odds: wanted |= {c for cols in ODDS_COLUMN_SETS for c in cols}
+    mapping = {}
+    for original in columns:
+        key = str(original).lower().strip()
+        name = CSV_RENAME.get(key, key)
+        if name in wanted and name not in mapping.values():
+            mapping[original] = name
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"Veri dosyasında gerekli kolonlar yok: {', '.join(missing)}")
+    return mapping
+
+
+def resolve_date_format(df, mapping):
+    """(çözüldü mü, biçim). İlk değerlerden gün-önce ve ay-önce tahminleri alınır,
+    örneği en çok ayrıştıran seçilir (eşitlikte pandas'ın varsayılanı ay-önce).
+    Parçada dolu tarih yoksa çözülmemiştir; biçim bulunamazsa None (pandas çıkarımı)."""
+    column = next((original for original, name in mapping.items() if name == 'date'), None)
+    if column is None: return True, None
+    sample = df[column].dropna().head(DATE_SAMPLE)
+    if sample.empty: return False, None
+    if not pd.api.types.is_object_dtype(sample) and not pd.api.types.is_string_dtype(sample): return True, None
+    sample = sample.astype(str)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        guesses = [guess_datetime_format(value, dayfirst=dayfirst) for value in sample.head(10) for dayfirst in (False, True)]
+    candidates = [f for f in dict.fromkeys(guesses) if f]
+    if not candidates: return True, None
+    return True, max(candidates, key=lambda f: pd.to_datetime(sample, format=f, errors='coerce').notna().sum())
+
+
+def _normalize(df, mapping, odds=False, date_format=None):
+    """Okunan parçayı standart kolon ad/tiplerine çevir"""
+    df = df.rename(columns=mapping)
+    for col in ('home_score', 'away_score'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], format=date_format, errors='coerce')
+    if 'league' not in df.columns:
+        df['league'] = 'Unknown'
+    for col in CATEGORY_COLUMNS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    if odds:
+        found = next((cols for cols in ODDS_COLUMN_SETS if set(cols) <= set(df.columns)), None)
+        for target, source in zip(('odds_home', 'odds_draw', 'odds_away'), found or (None,) * 3):
+            df[target] = pd.to_numeric(df[source], errors='coerce') if source else np.nan
+    return df
+
+
+# --- OKUMA ---
+def _iter_raw(path, chunksize, odds):
+    """Dosya sırasıyla ham parçalar ve kolon eşlemesi: (parça, {dosyadaki ad: standart ad})"""
+    fmt = _columnar_format(path)
+    if fmt:
+        if pa_dataset is None:
+            raise ImportError(f"{os.path.basename(path)} okumak için pyarrow gerekli (pip install pyarrow)")
+        source = pa_dataset.dataset(path, format=fmt)
+        mapping = resolve_columns(source.schema.names, odds)
+        if chunksize is None:
+            yield source.to_table(columns=list(mapping)).to_pandas(), mapping
+            return
+        for batch in source.to_batches(columns=list(mapping), batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas(), mapping
+        return
+
+    header = pd.read_csv(path, nrows=0, encoding='utf-8').columns
+    mapping = resolve_columns(header, odds)
+    dtype = {original: 'category' for original, name in mapping.items() if name in CATEGORY_COLUMNS}
+    reader = pd.read_csv(path, usecols=list(mapping), dtype=dtype, encoding='utf-8',
+                         on_bad_lines='skip', chunksize=chunksize)
+    if chunksize is None:
+        yield reader, mapping
+        return
+    with reader:
+        for chunk in reader:
+            yield chunk, mapping
+
+
+def iter_frames(path, chunksize=CHUNK_ROWS, odds=False):
+    """Dosyayı dosya sırasıyla standart maç parçaları olarak oku (chunksize=None: tek parça)"""
+    resolved, date_format = False, None
+    for chunk, mapping in _iter_raw(path, chunksize, odds):
+        if not resolved:
+            resolved, date_format = resolve_date_format(chunk, mapping)
+        yield _normalize(chunk, mapping, odds, date_format)
+
+
+def load_match_frame(path, odds=False):
+    """Veri dosyasını bellekte tarihe göre sıralı maç tablosuna çevir.
+
+    odds=True ise bulunan ilk oran seti odds_home/odds_draw/odds_away
+    kolonlarına taşınır (yoksa NaN). Büyük dosyalarda iter_sorted kullanın.
+    """
+    frames = list(iter_frames(path, chunksize=None, odds=odds))
+    df = frames[0]
+    if 'date' in df.columns:
+        df = df.sort_values('date', ascending=True, kind='stable')
+    return df
+
+
+# --- DIŞ SIRALAMA ---
+def _date_keys(df):
+    if 'date' not in df.columns:
+        return np.full(len(df), NO_DATE, dtype=np.int64)
+    keys = df['date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return np.where(df['date'].isna().to_numpy(), NO_DATE, keys)
+
+
+class _Run:
+    """Diskteki sıralı parça; kolonlar yalnızca gerektiği kadar (blok blok) okunur"""
+
+    def __init__(self, path, rows):
+        self.file = open(path, 'rb')
+        self.buf = {name: np.empty(0, dtype=dtype) for name, dtype in _RUN_COLUMNS.items()}
+        self.rows, self.unread = rows, rows
+        # Kolonlar dosyada art arda: kolon başlangıç ofsetleri
+        sizes = [rows * np.dtype(dtype).itemsize for dtype in _RUN_COLUMNS.values()]
+        self.offsets = dict(zip(_RUN_COLUMNS, np.cumsum([0] + sizes[:-1]).tolist()))
+
+    def close(self):
+        self.file.close()
+
+    def remaining(self):
+        return len(self.buf['date']) + self.unread
+
+    def fill(self, n):
+        """Tamponda en az n satır olsun (dosyada kalan kadar)"""
+        count = min(n - len(self.buf['date']), self.unread)
+        if count <= 0: return
+        read = self.rows - self.unread
+        for name, dtype in _RUN_COLUMNS.items():
+            self.file.seek(self.offsets[name] + read * np.dtype(dtype).itemsize)
+            self.buf[name] = np.concatenate([self.buf[name], np.fromfile(self.file, dtype=dtype, count=count)])
+        self.unread -= count
+
+    def date_at(self, i):
+        self.fill(i + 1)
+        return self.buf['date'][i]
+
+    def count_before(self, cutoff, side='left'):
+        while True:
+            n = int(np.searchsorted(self.buf['date'], cutoff, side=side))
+            if n < len(self.buf['date']) or not self.unread: return n
+            self.fill(2 * len(self.buf['date']) + 1024)
+
+    def take(self, n):
+        self.fill(n)
+        out = {name: values[:n] for name, values in self.buf.items()}
+        self.buf = {name: values[n:] for name, values in self.buf.items()}
+        return out
+
+
+def _merge(runs, block):
+    """Sıralı parçaları blok blok birleştir; aynı tarihli satırlar dosya sırasını korur.
+
+    Her adımda parçaların sıradaki `block` satırının son tarihlerinin en
+    küçüğü (cutoff) bulunur ve tüm parçalardan bu tarihten önceki satırlar
+    çıkarılır. Sıradaki satırların hepsi cutoff tarihindeyse (tek günlük veya
+    tarihsiz dosyada NO_DATE) o tarih, dosya sırasıyla ilk parçadan en fazla
+    `block` satırlık partilerle çıkar; motor için partiler arası sıra yeterlidir.
+    """
+    while True:
+        active = [r for r in runs if r.remaining()]
+        if not active: return
+        bounded = [r.date_at(block - 1) for r in active if r.remaining() > block]
+        cutoff = min(bounded) if bounded else None
+        counts = [r.count_before(cutoff) if cutoff is not None else r.remaining() for r in active]
+        if not any(counts):
+            first = next(r for r in active if r.date_at(0) == cutoff)
+            first.fill(block)
+            yield first.take(int(np.searchsorted(first.buf['date'][:block], cutoff, side='right')))
+            continue
+        parts = [r.take(n) for r, n in zip(active, counts) if n]
+        batch = {name: np.concatenate([p[name] for p in parts]) for name in _RUN_COLUMNS}
+        order = np.argsort(batch['date'], kind='stable')
+        yield {name: values[order] for name, values in batch.items()}
+
+
+def iter_sorted(path, chunksize=CHUNK_ROWS, tmp_dir=None):
+    """Tarihe göre sıralı maç partileri (sınırlı bellek, dış birleştirme sıralaması)"""
+    teams, team_index = [], {}
+    leagues, league_index = [], {}
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix='predicta-sort-') as tmp:
+        runs = []
+        for i, chunk in enumerate(iter_frames(path, chunksize)):
+            cols = {
+                'date': _date_keys(chunk),
+                'league': _intern(chunk['league'], leagues, league_index),
+                'home': _intern(chunk['home_team'], teams, team_index),
+                'away': _intern(chunk['away_team'], teams, team_index),
+                'home_score': chunk['home_score'].to_numpy(),
+                'away_score': chunk['away_score'].to_numpy(),
+            }
+            order = np.argsort(cols['date'], kind='stable')
+            run = os.path.join(tmp, f"run{i:05d}.bin")
+            with open(run, 'wb') as f:
+                for name, values in cols.items():
+                    values[order].astype(_RUN_COLUMNS[name]).tofile(f)
+            runs.append((run, len(chunk)))
+            del chunk, cols
+
+        # -1 (NaN) kodları listenin sonundaki NaN'a düşer
+        team_names = np.array(teams + [np.nan], dtype=object)
+        league_names = np.array(leagues + [np.nan], dtype=object)
+        block = max(1024, (chunksize or CHUNK_ROWS) // max(len(runs), 1))
+        readers = [_Run(run, rows) for run, rows in runs]
+        try:
+            for batch in _merge(readers, block):
+                dates = batch['date']
+                yield pd.DataFrame({
+                    'date': np.where(dates == NO_DATE, np.iinfo(np.int64).min, dates).view('datetime64[ns]'),
+                    'league': league_names[batch['league']],
+                    'home_team': team_names[batch['home']], 'away_team': team_names[batch['away']],
+                    'home_score': batch['home_score'], 'away_score': batch['away_score'],
+                })
+        finally:
+            for r in readers: r.close()
+
+
+def stream_fit(engine, path, chunksize=CHUNK_ROWS, tmp_dir=None):
+    """Dosyayı tamamını belleğe almadan motora işle; işlenen satır sayısını döner"""
+    rows = 0
+    for batch in iter_sorted(path, chunksize, tmp_dir):
+        engine.fit_frame(batch)
+        rows += len(batch)
+    return rows
@@ -0,0 +1,612 @@
+"""
+Predicta PRO - Dizi tabanlı rating motoru
+
+Takım ve lig isimleri tamsayı indekslere çevrilir; EMA att/def rating'leri ve
+son 10 maçlık form/gol pencereleri (halka tampon) NumPy dizilerinde tutulur.
+Pencereler takım x pencere int8/int16 dizileridir; yanlarında tutulan
+toplamlar (form puanı, gol) sayesinde form oranı ve son goller ortalaması
+tahmin sırasında pencere taranmadan O(1) okunur. Güncelleme satır satır
+değil, maç blokları halinde vektörel yapılır.
+
+Hesaplanan durum, kaynak CSV'nin hash'i ile anahtarlanmış bir snapshot
+klasörüne (.npy + meta.json) yazılır; worker'lar bu dosyaları mmap ile
+açtığından rating dizileri page cache'te tek kopya olarak paylaşılır.
+Sonuçlanan maçlar apply_result ile tek tek eklenir; snapshot aynı zamanda
+checkpoint'tir (journal_id: uygulanmış son güncelleme kaydı), yeniden
+başlatmada yalnızca sonrasındaki kayıtlar tekrar oynatılır.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+
+ALPHA = 0.18            # EMA öğrenme hızı
+FORM_WINDOW = 10        # Son N maç form takibi
+DEFAULT_AVG_HOME = 1.5
+DEFAULT_AVG_AWAY = 1.2
+SCORE_GRID = 7          # Skor matrisi boyutu (0..K-1 gol)
+SNAPSHOT_VERSION = 3    # Dizi formatı değişirse artırılmalı
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Model parametreleri (sweep.py ile ayarlanır, PREDICTA_MODEL_CONFIG JSON'u ile yüklenir)"""
+    alpha: float = ALPHA                # EMA öğrenme hızı
+    window: int = FORM_WINDOW           # Form penceresi (maç)
+    form_min_matches: int = 5           # Form etkisi için gereken minimum maç
+    form_good: float = 0.65             # Puan oranı bunun üstündeyse iyi form
+    form_bad: float = 0.30              # ... altındaysa kötü form
+    form_good_mult: float = 1.12
+    form_bad_mult: float = 0.88
+    form_good_weight: float = 0.4       # İyi formda son goller ortalamasının ağırlığı
+    form_mid_weight: float = 0.3        # Orta formda son goller ortalamasının ağırlığı
+    dc_threshold: float = 1.2           # İki xG de bunun altındaysa düşük skor düzeltmesi
+    dc_00: float = 1.20                 # 0-0 çarpanı
+    dc_11: float = 1.10                 # 1-1 çarpanı
+
+    def replace(self, **changes):
+        return ModelConfig(**{**asdict(self), **changes})
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Bilinmeyen anahtarlar yok sayılır (sweep çıktısı doğrudan verilebilir)"""
+        types = {f.name: f.type for f in fields(cls)}
+        return cls(**{k: types[k](v) for k, v in data.items() if k in types})
+
+
+DEFAULT_CONFIG = ModelConfig()
+
+
+def load_config(path):
+    """JSON dosyasından ModelConfig; yol boşsa veya okunamazsa varsayılan"""
+    data = _read_json(path) if path else None
+    return ModelConfig.from_dict(data) if isinstance(data, dict) else DEFAULT_CONFIG
+
+_SNAPSHOT_ARRAYS = (
+    'league_goals_home', 'league_goals_away', 'league_matches',
+    'pair_team', 'pair_league', 's_att_h', 's_def_h', 's_att_a', 's_def_a', 'team_league',
+    'n_home', 'n_away', 'form_home', 'form_away', 'goals_home', 'goals_away',
+    'form_sum_home', 'form_sum_away', 'goal_sum_home', 'goal_sum_away'
+)
+
+
+def _intern(values, names, index):
+    """İsim kolonunu kalıcı tamsayı indekslere çevir (NaN -> -1)"""
+    import pandas as pd  # snapshot'tan açılışta pandas yüklenmez
+    codes, uniques = pd.factorize(values)
+    lookup = np.empty(len(uniques), dtype=np.int64)
+    for i, name in enumerate(uniques):
+        j = index.get(name)
+        if j is None:
+            j = len(names)
+            names.append(name)
+            index[name] = j
+        lookup[i] = j
+
+    out = np.full(len(codes), -1, dtype=np.int64)
+    mask = codes >= 0
+    out[mask] = lookup[codes[mask]]
+    return out
+
+
+def _intern_name(name, names, index):
+    """Tek isim için _intern (None/NaN -> -1)"""
+    if name is None or (isinstance(name, float) and np.isnan(name)): return -1
+    j = index.get(name)
+    if j is None:
+        j = len(names)
+        names.append(name)
+        index[name] = j
+    return j
+
+
+def _ordinals(idx, n):
+    """Her satırın kendi takımı içindeki sırası (0'dan) ve takım başına maç sayısı"""
+    counts = np.bincount(idx, minlength=n)
+    order = np.argsort(idx, kind='stable')
+    starts = np.cumsum(counts) - counts
+    ordinal = np.empty(len(idx), dtype=np.int64)
+    ordinal[order] = np.arange(len(idx)) - np.repeat(starts, counts)
+    return ordinal, counts
+
+
+def _form_points(gf, ga):
+    return np.where(gf > ga, 3, np.where(gf == ga, 1, 0)).astype(np.int8)
+
+
+def _gather(values, idx, known, default):
+    """values[idx]; bilinmeyen (-1) indeksler için varsayılan değer"""
+    if len(values) == 0:
+        return np.full((len(idx),) + values.shape[1:], default, dtype=values.dtype)
+    out = values[np.where(known, idx, 0)]
+    out[~known] = default
+    return out
+
+
+# --- OLASILIK ÇEKİRDEĞİ ---
+def poisson_pmf(lam, grid=SCORE_GRID):
+    """(N, K) Poisson olasılıkları: p_k = p_(k-1) * lam / k (scipy gerekmez)"""
+    lam = np.asarray(lam, dtype=np.float64)
+    steps = np.empty((len(lam), grid))
+    steps[:, 0] = np.exp(-lam)
+    steps[:, 1:] = lam[:, None] / np.arange(1, grid)
+    return np.cumprod(steps, axis=1)
+
+
+def score_matrices(h_xg, a_xg, grid=SCORE_GRID, config=DEFAULT_CONFIG):
+    """(N, K, K) skor matrisi: Dixon-Coles düşük skor düzeltmeli bağımsız Poisson"""
+    h_xg, a_xg = np.asarray(h_xg, dtype=np.float64), np.asarray(a_xg, dtype=np.float64)
+    matrix = poisson_pmf(h_xg, grid)[:, :, None] * poisson_pmf(a_xg, grid)[:, None, :]
+
+    low = (h_xg < config.dc_threshold) & (a_xg < config.dc_threshold)
+    matrix[low, 0, 0] *= config.dc_00
+    matrix[low, 1, 1] *= config.dc_11
+
+    matrix /= matrix.sum(axis=(1, 2), keepdims=True)
+    return matrix
+
+
+def outcome_probs(matrix):
+    """Skor matrislerinden (1, X, 2, 2.5 üst, KG var) dizileri (tüm ızgara üzerinden)"""
+    grid = matrix.shape[1]
+    h = np.arange(grid)[:, None]
+    a = np.arange(grid)[None, :]
+
+    def total(mask):
+        return np.tensordot(matrix, mask.astype(np.float64), axes=([1, 2], [0, 1]))
+
+    return total(h > a), total(h == a), total(h < a), total(h + a > 2.5), total((h > 0) & (a > 0))
+
+
+class RatingEngine:
+    """EMA + Son 10 Maç Form Takibi (takım x pencere dizileri)
+
+    Rating'ler lig ortalamasına bölünmüş performansların EMA'sıdır; lig
+    ortalaması her yeni maçla değiştiğinden durum (takım, lig) çiftleri
+    başına ham gol toplamları olarak tutulur ve ortalamalar okuma anında
+    uygulanır. Böylece tek maçlık güncelleme (apply_result) tüm geçmişten
+    yeniden kurulumla aynı sonucu verir.
+    """
+
+    def __init__(self, config=DEFAULT_CONFIG):
+        self.config = config
+        self.alpha = config.alpha
+        self.window = window = config.window
+        self.teams = []
+        self.team_index = {}
+        self.leagues = []
+        self.league_index = {}
+        self.journal_id = 0     # Uygulanan son ModelUpdate kaydı (checkpoint noktası)
+
+        # Lig toplamları
+        self.league_goals_home = np.zeros(0)
+        self.league_goals_away = np.zeros(0)
+        self.league_matches = np.zeros(0, dtype=np.int64)
+
+        # (takım, lig) çiftleri: ağırlıklı ham gol toplamları
+        self.pair_index = {}
+        self.pair_team = np.zeros(0, dtype=np.int64)
+        self.pair_league = np.zeros(0, dtype=np.int64)
+        self.s_att_h = np.zeros(0)
+        self.s_def_h = np.zeros(0)
+        self.s_att_a = np.zeros(0)
+        self.s_def_a = np.zeros(0)
+        self._team_pairs = None
+
+        self.team_league = np.full(0, -1, dtype=np.int64)
+        self.n_home = np.zeros(0, dtype=np.int64)
+        self.n_away = np.zeros(0, dtype=np.int64)
+        self.form_home = np.zeros((0, window), dtype=np.int8)
+        self.form_away = np.zeros((0, window), dtype=np.int8)
+        self.goals_home = np.zeros((0, window), dtype=np.int16)
+        self.goals_away = np.zeros((0, window), dtype=np.int16)
+        # Pencere toplamları (yazılan değer - üzerine yazılan değer ile güncel tutulur)
+        self.form_sum_home = np.zeros(0, dtype=np.int16)
+        self.form_sum_away = np.zeros(0, dtype=np.int16)
+        self.goal_sum_home = np.zeros(0, dtype=np.int32)
+        self.goal_sum_away = np.zeros(0, dtype=np.int32)
+        self._derived = None
+
+    # --- İNDEKSLER ---
+    def _grow(self):
+        """Yeni eklenen takımlar ve ligler için dizileri büyüt"""
+        extra = len(self.leagues) - len(self.league_matches)
+        if extra:
+            self.league_goals_home = np.concatenate([self.league_goals_home, np.zeros(extra)])
+            self.league_goals_away = np.concatenate([self.league_goals_away, np.zeros(extra)])
+            self.league_matches = np.concatenate([self.league_matches, np.zeros(extra, dtype=np.int64)])
+
+        extra = len(self.teams) - len(self.n_home)
+        if not extra: return
+        self.team_league = np.concatenate([self.team_league, np.full(extra, -1, dtype=np.int64)])
+        self.n_home = np.concatenate([self.n_home, np.zeros(extra, dtype=np.int64)])
+        self.n_away = np.concatenate([self.n_away, np.zeros(extra, dtype=np.int64)])
+        for name in ('form_home', 'form_away', 'goals_home', 'goals_away'):
+            buf = getattr(self, name)
+            setattr(self, name, np.concatenate([buf, np.zeros((extra, self.window), dtype=buf.dtype)]))
+        for name in ('form_sum_home', 'form_sum_away', 'goal_sum_home', 'goal_sum_away'):
+            buf = getattr(self, name)
+            setattr(self, name, np.concatenate([buf, np.zeros(extra, dtype=buf.dtype)]))
+
+    def _pairs(self, team, league):
+        """Satırların (takım, lig) çift indeksleri; yeni çiftler eklenir"""
+        key = team * (len(self.leagues) + 1) + (league + 1)
+        uniques, inverse = np.unique(key, return_inverse=True)
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        added = []
+        for i, k in enumerate(uniques.tolist()):
+            t, l = divmod(k, len(self.leagues) + 1)
+            p = self.pair_index.get((t, l - 1))
+            if p is None:
+                p = len(self.pair_index)
+                self.pair_index[(t, l - 1)] = p
+                added.append((t, l - 1))
+            lookup[i] = p
+
+        if added:
+            new = np.array(added, dtype=np.int64).reshape(-1, 2)
+            self.pair_team = np.concatenate([self.pair_team, new[:, 0]])
+            self.pair_league = np.concatenate([self.pair_league, new[:, 1]])
+            for name in ('s_att_h', 's_def_h', 's_att_a', 's_def_a'):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(len(added))]))
+            if self._team_pairs is not None:
+                for t, l in added:
+                    self._team_pairs.setdefault(t, []).append(self.pair_index[(t, l)])
+        return lookup[inverse.reshape(-1)]
+
+    def _pairs_of(self, team):
+        """Takımın oynadığı liglerin çift indeksleri (genelde 1-2 tane)"""
+        if self._team_pairs is None:
+            self._team_pairs = {}
+            for p, t in enumerate(self.pair_team.tolist()):
+                self._team_pairs.setdefault(t, []).append(p)
+        return self._team_pairs.get(team, ())
+
+    # --- TÜRETİLEN DEĞERLER ---
+    def _league_avgs(self, league):
+        """Satır bazlı lig ortalamaları (bilinmeyen lig -> varsayılan)"""
+        known = league >= 0
+        safe = np.where(known, league, 0)
+        avg_h = np.full(len(league), DEFAULT_AVG_HOME)
+        avg_a = np.full(len(league), DEFAULT_AVG_AWAY)
+        if len(self.league_avg_home):
+            avg_h = np.where(known, self.league_avg_home[safe], avg_h)
+            avg_a = np.where(known, self.league_avg_away[safe], avg_a)
+        return avg_h, avg_a
+
+    def _materialize(self):
+        """Lig ortalamaları ve att/def rating'leri (güncellemeden sonra ilk okumada)"""
+        if self._derived is not None: return self._derived
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_h = self.league_goals_home / self.league_matches
+            avg_a = self.league_goals_away / self.league_matches
+        self._derived = {
+            'league_avg_home': np.where((avg_h == 0) | np.isnan(avg_h), DEFAULT_AVG_HOME, avg_h),
+            'league_avg_away': np.where((avg_a == 0) | np.isnan(avg_a), DEFAULT_AVG_AWAY, avg_a),
+        }
+
+        # rating = 1.0 * (1-a)^n + sum_lig (ağırlıklı gol toplamı / lig ortalaması)
+        n = len(self.teams)
+        pair_h, pair_a = self._league_avgs(self.pair_league)
+        prior_h = (1 - self.alpha) ** self.n_home.astype(np.float64)
+        prior_a = (1 - self.alpha) ** self.n_away.astype(np.float64)
+        self._derived.update({
+            'att_h': prior_h + np.bincount(self.pair_team, weights=self.s_att_h / pair_h, minlength=n),
+            'def_h': prior_h + np.bincount(self.pair_team, weights=self.s_def_h / pair_a, minlength=n),
+            'att_a': prior_a + np.bincount(self.pair_team, weights=self.s_att_a / pair_a, minlength=n),
+            'def_a': prior_a + np.bincount(self.pair_team, weights=self.s_def_a / pair_h, minlength=n),
+        })
+        return self._derived
+
+    league_avg_home = property(lambda self: self._materialize()['league_avg_home'])
+    league_avg_away = property(lambda self: self._materialize()['league_avg_away'])
+    att_h = property(lambda self: self._materialize()['att_h'])
+    def_h = property(lambda self: self._materialize()['def_h'])
+    att_a = property(lambda self: self._materialize()['att_a'])
+    def_a = property(lambda self: self._materialize()['def_a'])
+
+    # --- GÜNCELLEME ---
+    def index_frame(self, df):
+        """Maç tablosunu update() girdisine çevir (yeni isimler indekslenir, diziler büyür)"""
+        league = _intern(df['league'], self.leagues, self.league_index)
+        home = _intern(df['home_team'], self.teams, self.team_index)
+        away = _intern(df['away_team'], self.teams, self.team_index)
+        self._grow()
+        return (home, away, league,
+                df['home_score'].to_numpy(dtype=np.int64), df['away_score'].to_numpy(dtype=np.int64))
+
+    def fit_frame(self, df):
+        """Tarihe göre sıralı maç tablosundan rating'leri hesapla"""
+        if df.empty: return
+        self.update(*self.index_frame(df))
+
+    def update(self, home, away, league, home_score, away_score):
+        """Kronolojik maç bloğunu mevcut duruma uygula.
+
+        EMA kapalı formda hesaplanır: n maç sonra toplam = s0*(1-a)^n +
+        sum(a*(1-a)^(n-1-k) * gol_k). Sonuç satır satır döngüyle aynıdır.
+        """
+        self._grow()
+        self._derived = None
+
+        # Lig ortalamaları takımı bilinmeyen satırları da içerir
+        known = league >= 0
+        n_leagues = len(self.leagues)
+        self.league_goals_home = self.league_goals_home + np.bincount(league[known], weights=home_score[known], minlength=n_leagues)
+        self.league_goals_away = self.league_goals_away + np.bincount(league[known], weights=away_score[known], minlength=n_leagues)
+        self.league_matches = self.league_matches + np.bincount(league[known], minlength=n_leagues)
+
+        valid = (home >= 0) & (away >= 0)
+        if not valid.all():
+            home, away, league = home[valid], away[valid], league[valid]
+            home_score, away_score = home_score[valid], away_score[valid]
+        if len(home) == 0: return
+
+        n, alpha, window = len(self.teams), self.alpha, self.window
+        pair_h = self._pairs(home, league)
+        pair_a = self._pairs(away, league)
+        n_pairs = len(self.pair_team)
+
+        # Ev sahibi: att_h / def_h
+        ord_h, cnt_h = _ordinals(home, n)
+        w_h = alpha * (1 - alpha) ** (cnt_h[home] - 1 - ord_h)
+        decay_h = (1 - alpha) ** cnt_h[self.pair_team]
+        self.s_att_h = self.s_att_h * decay_h + np.bincount(pair_h, weights=w_h * home_score, minlength=n_pairs)
+        self.s_def_h = self.s_def_h * decay_h + np.bincount(pair_h, weights=w_h * away_score, minlength=n_pairs)
+
+        # Deplasman: att_a / def_a
+        ord_a, cnt_a = _ordinals(away, n)
+        w_a = alpha * (1 - alpha) ** (cnt_a[away] - 1 - ord_a)
+        decay_a = (1 - alpha) ** cnt_a[self.pair_team]
+        self.s_att_a = self.s_att_a * decay_a + np.bincount(pair_a, weights=w_a * away_score, minlength=n_pairs)
+        self.s_def_a = self.s_def_a * decay_a + np.bincount(pair_a, weights=w_a * home_score, minlength=n_pairs)
+
+        # ✨ FORM TAKİBİ (halka tampon, yalnızca son `window` maç yazılır)
+        keep = ord_h >= cnt_h[home] - window
+        pos = (self.n_home[home] + ord_h) % window
+        self.form_home[home[keep], pos[keep]] = _form_points(home_score, away_score)[keep]
+        self.goals_home[home[keep], pos[keep]] = home_score[keep]
+        self.n_home = self.n_home + cnt_h
+        touched = np.flatnonzero(cnt_h)
+        self.form_sum_home[touched] = self.form_home[touched].sum(axis=1)
+        self.goal_sum_home[touched] = self.goals_home[touched].sum(axis=1)
+
+        keep = ord_a >= cnt_a[away] - window
+        pos = (self.n_away[away] + ord_a) % window
+        self.form_away[away[keep], pos[keep]] = _form_points(away_score, home_score)[keep]
+        self.goals_away[away[keep], pos[keep]] = away_score[keep]
+        self.n_away = self.n_away + cnt_a
+        touched = np.flatnonzero(cnt_a)
+        self.form_sum_away[touched] = self.form_away[touched].sum(axis=1)
+        self.goal_sum_away[touched] = self.goals_away[touched].sum(axis=1)
+
+        # Takımın ligi: oynadığı son maçın ligi
+        rows = np.arange(len(home))
+        last = np.full(n, -1, dtype=np.int64)
+        np.maximum.at(last, home, rows)
+        np.maximum.at(last, away, rows)
+        touched = last >= 0
+        self.team_league[touched] = league[last[touched]]
+
+    def apply_result(self, home, away, league, home_score, away_score):
+        """Tek maçı O(1) uygula (isimlerle). update() ile aynı sonucu verir;
+        takım başına yalnızca oynadığı liglerin toplamları sönümlenir."""
+        h = _intern_name(home, self.teams, self.team_index)
+        a = _intern_name(away, self.teams, self.team_index)
+        l = _intern_name(league, self.leagues, self.league_index)
+        self._grow()
+        self._derived = None
+
+        if l >= 0:
+            self.league_goals_home[l] += home_score
+            self.league_goals_away[l] += away_score
+            self.league_matches[l] += 1
+        if h < 0 or a < 0: return
+
+        alpha, decay, window = self.alpha, 1 - self.alpha, self.window
+        ph = self.pair_index.get((h, l))
+        if ph is None: ph = int(self._pairs(np.array([h]), np.array([l]))[0])
+        pa = self.pair_index.get((a, l))
+        if pa is None: pa = int(self._pairs(np.array([a]), np.array([l]))[0])
+        for p in self._pairs_of(h):
+            self.s_att_h[p] *= decay
+            self.s_def_h[p] *= decay
+        self.s_att_h[ph] += alpha * home_score
+        self.s_def_h[ph] += alpha * away_score
+        for p in self._pairs_of(a):
+            self.s_att_a[p] *= decay
+            self.s_def_a[p] *= decay
+        self.s_att_a[pa] += alpha * away_score
+        self.s_def_a[pa] += alpha * home_score
+
+        # Dolmamış pencerede üzerine yazılan hücre 0'dır
+        pos = self.n_home[h] % window
+        points = _form_points(home_score, away_score)
+        self.form_sum_home[h] += points - self.form_home[h, pos]
+        self.goal_sum_home[h] += home_score - self.goals_home[h, pos]
+        self.form_home[h, pos] = points
+        self.goals_home[h, pos] = home_score
+        self.n_home[h] += 1
+        pos = self.n_away[a] % window
+        points = _form_points(away_score, home_score)
+        self.form_sum_away[a] += points - self.form_away[a, pos]
+        self.goal_sum_away[a] += away_score - self.goals_away[a, pos]
+        self.form_away[a, pos] = points
+        self.goals_away[a, pos] = away_score
+        self.n_away[a] += 1
+        self.team_league[h] = self.team_league[a] = l
+
+    # --- TAHMİN ---
+    def _form_adjust(self, xg, counts, form_sum, goal_sum, idx, known):
+        """✨ FORM FAKTÖRÜ (Son 10 Maç Etkisi), vektörel; pencere toplamlarından O(1)"""
+        c = self.config
+        played = np.minimum(_gather(counts, idx, known, 0), self.window)
+        active = played >= c.form_min_matches
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = _gather(form_sum, idx, known, 0) / (played * 3)
+            recent = _gather(goal_sum, idx, known, 0) / played
+
+        good = active & (ratio > c.form_good)
+        bad = active & (ratio < c.form_bad)
+        mid = active & ~good & ~bad
+        xg = np.where(good, ((xg * (1 - c.form_good_weight)) + (recent * c.form_good_weight)) * c.form_good_mult, xg)
+        xg = np.where(bad, xg * c.form_bad_mult, xg)
+        return np.where(mid, (xg * (1 - c.form_mid_weight)) + (recent * c.form_mid_weight), xg)
+
+    def expected_goals(self, home, away):
+        """Takım indeksleri için (ev xG, deplasman xG) dizileri; -1 = bilinmeyen takım"""
+        home = np.asarray(home, dtype=np.int64)
+        away = np.asarray(away, dtype=np.int64)
+        kh, ka = home >= 0, away >= 0
+
+        # Ev sahibi bilinmiyorsa lig 'Unknown' kabul edilir
+        league = _gather(self.team_league, home, kh, self.league_index.get('Unknown', -1))
+        avg_h, avg_a = self._league_avgs(league)
+
+        # Temel xG (EMA bazlı)
+        h_xg = _gather(self.att_h, home, kh, 1.0) * _gather(self.def_a, away, ka, 1.0) * avg_h
+        a_xg = _gather(self.att_a, away, ka, 1.0) * _gather(self.def_h, home, kh, 1.0) * avg_a
+
+        h_xg = self._form_adjust(h_xg, self.n_home, self.form_sum_home, self.goal_sum_home, home, kh)
+        a_xg = self._form_adjust(a_xg, self.n_away, self.form_sum_away, self.goal_sum_away, away, ka)
+        return h_xg, a_xg
+
+    # --- GÖRÜNÜMLER ---
+    def _window(self, buf, counts, t):
+        """Halka tampondan kronolojik pencere"""
+        c = int(counts[t])
+        if c <= self.window:
+            return buf[t, :c].tolist()
+        head = c % self.window
+        return np.concatenate([buf[t, head:], buf[t, :head]]).tolist()
+
+    def league_name(self, idx):
+        return self.leagues[idx] if idx >= 0 else None
+
+    def league_stats(self):
+        return {
+            name: {'avg_home_goals': float(self.league_avg_home[i]), 'avg_away_goals': float(self.league_avg_away[i])}
+            for i, name in enumerate(self.leagues)
+        }
+
+    def team_view(self, t):
+        """Tek takımın sözlük görünümü (MatchPredictor.predict formatı)"""
+        return {
+            'att_h': float(self.att_h[t]), 'def_h': float(self.def_h[t]),
+            'att_a': float(self.att_a[t]), 'def_a': float(self.def_a[t]),
+            'form_home': self._window(self.form_home, self.n_home, t),
+            'form_away': self._window(self.form_away, self.n_away, t),
+            'recent_goals_h': self._window(self.goals_home, self.n_home, t),
+            'recent_goals_a': self._window(self.goals_away, self.n_away, t),
+            'league': self.league_name(int(self.team_league[t]))
+        }
+
+    def team_stats(self):
+        """Tüm takımların sözlük görünümü"""
+        return {name: self.team_view(t) for t, name in enumerate(self.teams)}
+
+
+# --- SNAPSHOT ---
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def file_fingerprint(path, known=None):
+    """Boyut + mtime + sha256. Boyut ve mtime değişmemişse hash tekrar hesaplanmaz."""
+    st = os.stat(path)
+    if known and known.get('size') == st.st_size and known.get('mtime_ns') == st.st_mtime_ns:
+        return known
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def _snapshot_dir(root, fingerprint, engine):
+    """Kaynak hash'i + format sürümü + alpha/pencere + journal; alpha değişince yeni klasör"""
+    return os.path.join(root, f"{fingerprint['sha256'][:16]}-v{SNAPSHOT_VERSION}"
+                              f"-a{engine.alpha!r}-w{engine.window}-j{engine.journal_id}")
+
+
+def load_snapshot(root, source_path, config=DEFAULT_CONFIG):
+    """Kaynak dosyaya uyan son checkpoint'i mmap ile aç.
+
+    (engine, fingerprint) döner; snapshot yoksa, eskiyse veya farklı
+    alpha/pencere ile hesaplanmışsa engine None olur ve fingerprint
+    save_snapshot'a aynen verilebilir. Diğer parametreler yalnızca tahmini
+    etkilediğinden snapshot'ı geçersiz kılmaz.
+    """
+    index_path = os.path.join(root, 'current.json')
+    index = _read_json(index_path) or {}
+    fingerprint = file_fingerprint(source_path, index.get('source'))
+    if not index.get('snapshot') or (index.get('source') or {}).get('sha256') != fingerprint['sha256']:
+        return None, fingerprint
+
+    snap_dir = os.path.join(root, index['snapshot'])
+    meta = _read_json(os.path.join(snap_dir, 'meta.json'))
+    if not meta or meta.get('version') != SNAPSHOT_VERSION:
+        return None, fingerprint
+    if (meta.get('alpha'), meta.get('window')) != (config.alpha, config.window):
+        return None, fingerprint
+
+    engine = RatingEngine(config)
+    engine.teams = meta['teams']
+    engine.team_index = {name: i for i, name in enumerate(engine.teams)}
+    engine.leagues = meta['leagues']
+    engine.league_index = {name: i for i, name in enumerate(engine.leagues)}
+    engine.journal_id = meta.get('journal_id', 0)
+    # 'c' (copy-on-write): sayfalar worker'lar arasında paylaşılır, yazılan sayfa kopyalanır
+    for name in _SNAPSHOT_ARRAYS:
+        setattr(engine, name, np.load(os.path.join(snap_dir, f"{name}.npy"), mmap_mode='c'))
+    engine.pair_index = {(t, l): p for p, (t, l) in enumerate(zip(engine.pair_team.tolist(), engine.pair_league.tolist()))}
+
+    if index.get('source') != fingerprint:
+        os.makedirs(root, exist_ok=True)
+        _write_json_atomic(index_path, {'source': fingerprint, 'snapshot': os.path.basename(snap_dir)})
+    return engine, fingerprint
+
+
+def save_snapshot(engine, root, fingerprint):
+    """Motor durumunu (checkpoint) atomik olarak snapshot klasörüne yaz, eskileri sil"""
+    os.makedirs(root, exist_ok=True)
+    snap_dir = _snapshot_dir(root, fingerprint, engine)
+    tmp = tempfile.mkdtemp(dir=root, prefix='.tmp-')
+    try:
+        for name in _SNAPSHOT_ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(getattr(engine, name)))
+        _write_json_atomic(os.path.join(tmp, 'meta.json'), {
+            'version': SNAPSHOT_VERSION, 'source': fingerprint,
+            'alpha': engine.alpha, 'window': engine.window, 'journal_id': engine.journal_id,
+            'teams': engine.teams, 'leagues': engine.leagues
+        })
+        os.rename(tmp, snap_dir)
+    except OSError:
+        # Aynı snapshot'ı başka bir worker daha önce yazdı
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    _write_json_atomic(os.path.join(root, 'current.json'), {'source': fingerprint, 'snapshot': os.path.basename(snap_dir)})
+
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        if os.path.isdir(path) and not entry.startswith('.') and path != snap_dir:
+            shutil.rmtree(path, ignore_errors=True)
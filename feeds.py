@@ -0,0 +1,216 @@
+"""
+Predicta PRO - Asenkron besleme (feed) indirme katmanı
+
+Dış kaynakların (ön bülten, sonuç beslemesi) hepsi tek bir httpx.AsyncClient
+üzerinden iner; keep-alive bağlantı havuzu süreç boyunca yaşar. Zaman aşımı,
+bağlantı hatası, 429 ve 5xx yanıtlar tam jitter'lı üstel geri çekilmeyle
+yeniden denenir (Retry-After varsa ona uyulur). Her kaynağın kendi hız sınırı
+vardır: aynı kaynağa iki istek arasında en az `min_interval` saniye.
+
+Gövde akış halinde geçici dosyaya (küçükse bellekte) yazılır, ayrıştırma iş
+parçacığı havuzunda yapılır; böylece kaynaklar gerçekten eşzamanlı iner ve
+event loop ayrıştırma sırasında bloklanmaz.
+
+Scheduler işleri senkron olduğundan istekler süreç başına tek bir arka plan
+iş parçacığında dönen event loop'a gönderilir (FeedRunner). Loop, istemci ve
+httpx ilk kullanımda yüklenir; gunicorn fork'undan sonra her worker kendi
+havuzunu açar, web süreçlerinin açılışı httpx'i beklemez.
+"""
+import asyncio
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple, Optional
+
+from metrics import PARSE, UPSTREAM_FETCH, UPSTREAM_RETRIES
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+SPOOL_BYTES = 8 * 1024 * 1024  # Bundan büyük gövdeler diske taşar
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+@dataclass
+class FeedSource:
+    """Tek dış kaynak: adres, ayrıştırıcı (ikili dosya -> veri) ve istek politikası"""
+    name: str
+    url: str
+    parse: Callable
+    headers: dict = field(default_factory=dict)
+    timeout: float = 15.0
+    retries: int = 3
+    min_interval: float = 0.0
+
+
+class FeedResult(NamedTuple):
+    source: str
+    status: int
+    payload: object          # 304'te None
+    etag: Optional[str]
+    last_modified: Optional[str]
+    attempts: int
+    elapsed: float
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Tam jitter: [0, min(cap, base * 2^attempt)] aralığından rastgele bekleme"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(response):
+    """Retry-After (saniye) başlığı; yoksa veya tarih biçimindeyse 0"""
+    try:
+        return max(float(response.headers.get('Retry-After', 0)), 0.0)
+    except ValueError:
+        return 0.0
+
+
+class RateLimiter:
+    """Kaynak başına en az `min_interval` saniye arayla istek (yeniden denemeler dahil)"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_at = 0.0
+        self.lock = None
+
+    async def wait(self):
+        if self.lock is None: self.lock = asyncio.Lock()
+        async with self.lock:
+            delay = self.next_at - time.monotonic()
+            if delay > 0: await asyncio.sleep(delay)
+            self.next_at = time.monotonic() + self.min_interval
+
+
+class FeedClient:
+    """Havuzlu async HTTP istemcisi + kaynak başına hız sınırı ve yeniden deneme"""
+
+    def __init__(self, max_connections=10, max_keepalive=5, keepalive_expiry=60.0, transport=None):
+        self.limits = dict(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                           keepalive_expiry=keepalive_expiry)
+        self.transport = transport
+        self.limiters = {}
+        self._client = None
+
+    def _http(self):
+        # İstemci, kullanılacağı loop içinde kurulmalı
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(limits=httpx.Limits(**self.limits), transport=self.transport,
+                                             follow_redirects=True)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, source, etag=None, last_modified=None):
+        """Koşullu GET + ayrıştırma; tüm denemeler tükenirse son hata yükselir"""
+        import httpx
+        headers = dict(source.headers)
+        if etag: headers['If-None-Match'] = etag
+        if last_modified: headers['If-Modified-Since'] = last_modified
+        limiter = self.limiters.setdefault(source.name, RateLimiter(source.min_interval))
+        started = time.perf_counter()
+
+        for attempt in range(source.retries + 1):
+            await limiter.wait()
+            t0 = time.perf_counter()
+            try:
+                async with self._http().stream('GET', source.url, headers=headers, timeout=source.timeout) as r:
+                    UPSTREAM_FETCH.labels(source.name, str(r.status_code)).observe(time.perf_counter() - t0)
+                    if r.status_code == 304:
+                        return FeedResult(source.name, 304, None, etag, last_modified, attempt + 1, time.perf_counter() - started)
+                    if r.status_code in RETRY_STATUS and attempt < source.retries:
+                        reason, delay = str(r.status_code), max(backoff_delay(attempt), min(_retry_after(r), BACKOFF_CAP))
+                    else:
+                        r.raise_for_status()
+                        payload = await self._read(source, r)
+                        return FeedResult(source.name, r.status_code, payload, r.headers.get('ETag'),
+                                          r.headers.get('Last-Modified'), attempt + 1, time.perf_counter() - started)
+            except httpx.TransportError as e:  # zaman aşımı, bağlantı reddi/kopması
+                if attempt >= source.retries: raise
+                reason, delay = type(e).__name__, backoff_delay(attempt)
+            UPSTREAM_RETRIES.labels(source.name, reason).inc()
+            await asyncio.sleep(delay)
+
+    async def _read(self, source, response):
+        """Gövdeyi (gzip açılmış) biriktir, ayrıştırmayı iş parçacığı havuzunda yap"""
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as body:
+            async for chunk in response.aiter_bytes():
+                body.write(chunk)
+            body.seek(0)
+
+            def parse():
+                with PARSE.labels(source.name).time():
+                    return source.parse(body)
+            return await asyncio.get_running_loop().run_in_executor(None, parse)
+
+    async def fetch_all(self, jobs):
+        """[(kaynak, {etag, last_modified})] eşzamanlı; sonuç veya hata nesnesi listesi"""
+        return await asyncio.gather(*(self.fetch(source, **validators) for source, validators in jobs),
+                                    return_exceptions=True)
+
+
+class FeedRunner:
+    """Senkron koddan FeedClient kullanımı: arka plan iş parçacığında tek event loop"""
+
+    def __init__(self, client=None):
+        self.client = client or FeedClient()
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="feed-loop", daemon=True).start()
+            return self.loop
+
+    def run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    def fetch(self, source, **validators):
+        return self.run(self.client.fetch(source, **validators))
+
+    def fetch_all(self, jobs):
+        return self.run(self.client.fetch_all(jobs))
+
+    def close(self):
+        if self.loop is None: return
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop = None
+
+
+class ConditionalFeed:
+    """Kaynak + doğrulayıcılar (ETag / Last-Modified). Doğrulayıcılar ancak commit() ile
+    kalıcı olur; böylece veritabanı yazımı başarısız olan döngü bir sonrakinde tekrar işlenir."""
+
+    def __init__(self, source, runner=None):
+        self.source = source
+        self.runner = runner or FeedRunner()
+        self.etag = None
+        self.last_modified = None
+        self._pending = None
+
+    def validators(self):
+        return {'etag': self.etag, 'last_modified': self.last_modified}
+
+    def accept(self, result):
+        """fetch / fetch_all sonucunu al; yük (304'te None) döner"""
+        if result.status != 304:
+            self._pending = {**(self._pending or {}), 'etag': result.etag, 'last_modified': result.last_modified}
+        return result.payload
+
+    def fetch(self):
+        return self.accept(self.runner.fetch(self.source, **self.validators()))
+
+    def commit(self):
+        """Son fetch sonucunu bir sonraki döngünün referansı yap"""
+        pending, self._pending = self._pending or {}, None
+        if 'etag' in pending:
+            self.etag, self.last_modified = pending['etag'], pending['last_modified']
+        return pending
@@ -0,0 +1,68 @@
+"""
+Predicta PRO - Gunicorn ayarları
+
+Gunicorn bu dosyayı çalışma dizininden otomatik okur; start.sh ve Procfile'daki
+komut satırı parametreleri buradaki değerleri ezer.
+"""
+import gc
+import os
+import tempfile
+
+# /api/stream (SSE) bağlantıları saatlerce açık kalır. gevent worker'da her bağlantı
+# bir greenlet'tir (iş parçacığı değil); worker başına worker_connections kadar
+# eşzamanlı bağlantı, yüzlerce abone ve API istekleri birlikte. GUNICORN_WORKER_CLASS=gthread
+# ile bağlantı başına iş parçacığı (abone sınırı threads // 2).
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+threads = int(os.getenv("GUNICORN_THREADS", 100))
+
+if worker_class == "gevent":
+    # --preload'da app master'da import edilir: socket/threading/queue ondan önce yamalanmalı
+    from gevent import monkey
+    monkey.patch_all()
+    sse_capacity = worker_connections - 100  # kalan bağlantılar API istekleri için
+else:
+    sse_capacity = threads // 2
+os.environ.setdefault("PREDICTA_SSE_MAX_CLIENTS", str(sse_capacity))
+
+# /metrics tüm worker'ların toplamını göstersin: prometheus_client çoklu süreç
+# modu, worker'lar app'i import etmeden önce ayarlanmalı
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "predicta-metrics"))
+
+# Önceki çalıştırmalardan kalan metrik dosyaları config yüklenirken temizlenir;
+# on_starting preload'da app import edildikten sonra çalışır ve master'ın model
+# yükleme metriklerini silerdi. Canlı süreçlerin (worker.py) dosyaları korunur.
+import metrics
+metrics.clear_stale_files(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+# GUNICORN_PRELOAD=1: app ve model master'da bir kez yüklenir, worker'lar fork ile
+# paylaşır (rating dizileri copy-on-write / snapshot mmap). Worker'lar model hazır
+# olunca açılır. GUNICORN_PRELOAD=0: her worker açılır açılmaz istek alır, model arka
+# planda yüklenir (/health/ready o zamana kadar 503). gevent'te arka plan yükleyicisi
+# greenlet'tir ve snapshot'sız kurulum boyunca worker'ı (heartbeat dahil) bloklar;
+# bu yüzden gevent'te varsayılan preload'dur.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1" if worker_class == "gevent" else "0") == "1"
+if preload_app:
+    os.environ["PREDICTA_PRELOAD"] = "1"
+    os.environ.setdefault("PREDICTA_MODEL_LOAD", "eager")
+
+
+def when_ready(server):
+    # Yüklenmiş nesneleri GC'nin dışına al: worker'larda toplama sayfaları kopyalatmasın
+    if server.cfg.preload_app: gc.freeze()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import app, db, start_scheduler
+        # Master'ın havuzdaki SQLite bağlantıları fork'ta kopyalandı; aynı bağlantı iki süreçte
+        # kullanılamaz. Worker kendi bağlantılarını açar (close=False: master'ınkiler kapatılmaz)
+        with app.app_context():
+            db.engine.dispose(close=False)
+        # Scheduler iş parçacığı master'da başlatılmaz (fork'ta kaybolur)
+        start_scheduler()
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,193 @@
+"""
+Predicta PRO - Sonuç geçmişi: model seçimleri, lig bazında kümülatif toplamlar, imleç
+
+result_stat tablosunun (lig, gün) satırı, o ligin o güne kadarki (dahil)
+kümülatif sayılarını tutar. Herhangi bir [from, to] aralığının toplamı lig
+başına iki satırın farkıdır (to'dan önceki son satır - from'dan önceki son
+satır); maliyet maç veya gün sayısından bağımsız, O(lig) indeks aramasıdır.
+Sonuçlanan maç kendi gününün ve ligin sonraki günlerinin satırlarını artırır
+(maçlar bitişten saatler sonra kapandığından pratikte tek satır).
+
+Seçim ve sonuç kuralları iki kez tanımlıdır: Python'da (settle sırasında
+artımlı güncelleme) ve SQL'de (geri doldurma, /api/history market filtresi);
+`benchmark.py history` ikisinin aynı sonucu verdiğini kontrol eder.
+Flask/DB bağımlılığı yoktur.
+"""
+import base64
+from datetime import datetime
+
+OVER_LINE = 2.5
+PICK_THRESHOLD = 0.5
+# Seçim -> ResultStat kolon son eki
+SELECTIONS = {'1': 'home', 'X': 'draw', '2': 'away', 'over': 'over', 'under': 'under', 'btts': 'btts', 'nobtts': 'nobtts'}
+RESULT_COLUMNS = ('result_home', 'result_draw', 'result_away', 'result_over', 'result_btts')
+STAT_COLUMNS = ('total', *RESULT_COLUMNS) + tuple(f"{kind}_{s}" for s in SELECTIONS.values() for kind in ('pick', 'hit'))
+
+# Aynı kurallar SQL olarak (match tablosu kolonları)
+PICK_SQL = {
+    '1': "prob_home >= prob_draw AND prob_home >= prob_away",
+    'X': "prob_draw > prob_home AND prob_draw >= prob_away",
+    '2': "prob_away > prob_home AND prob_away > prob_draw",
+    'over': f"prob_over_25 > {PICK_THRESHOLD}", 'under': f"prob_over_25 <= {PICK_THRESHOLD}",
+    'btts': f"prob_btts > {PICK_THRESHOLD}", 'nobtts': f"prob_btts <= {PICK_THRESHOLD}",
+}
+OUTCOME_SQL = {
+    '1': "score_home > score_away", 'X': "score_home = score_away", '2': "score_home < score_away",
+    'over': f"score_home + score_away > {OVER_LINE}", 'under': f"score_home + score_away < {OVER_LINE}",
+    'btts': "score_home > 0 AND score_away > 0", 'nobtts': "(score_home = 0 OR score_away = 0)",
+}
+
+
+def match_picks(m):
+    """Modelin seçimleri (1X2, alt/üst 2.5, KG); 1X2 eşitliğinde 1 > X > 2"""
+    probs = {'1': m.prob_home, 'X': m.prob_draw, '2': m.prob_away}
+    return (max(probs, key=probs.get),
+            'over' if m.prob_over_25 > PICK_THRESHOLD else 'under',
+            'btts' if m.prob_btts > PICK_THRESHOLD else 'nobtts')
+
+
+def match_outcomes(score_home, score_away):
+    """Skorun (1X2, alt/üst 2.5, KG) sonuçları"""
+    result = '1' if score_home > score_away else 'X' if score_home == score_away else '2'
+    return (result,
+            'over' if score_home + score_away > OVER_LINE else 'under',
+            'btts' if score_home > 0 and score_away > 0 else 'nobtts')
+
+
+def stat_deltas(matches):
+    """Sonuçlanan maçlar -> {(lig, gün): {kolon: artış}}"""
+    deltas = {}
+    for m in matches:
+        row = deltas.setdefault((m.league or '', m.date.date()), dict.fromkeys(STAT_COLUMNS, 0))
+        outcomes = match_outcomes(m.score_home, m.score_away)
+        row['total'] += 1
+        row[f"result_{SELECTIONS[outcomes[0]]}"] += 1
+        row['result_over'] += outcomes[1] == 'over'
+        row['result_btts'] += outcomes[2] == 'btts'
+        for pick, outcome in zip(match_picks(m), outcomes):
+            row[f"pick_{SELECTIONS[pick]}"] += 1
+            row[f"hit_{SELECTIONS[pick]}"] += pick == outcome
+    return deltas
+
+
+def stat_aggregates():
+    """STAT_COLUMNS için match tablosu üzerinde günlük SQL toplam ifadeleri"""
+    exprs = {'total': "COUNT(*)",
+             'result_over': f"SUM({OUTCOME_SQL['over']})", 'result_btts': f"SUM({OUTCOME_SQL['btts']})"}
+    for selection, suffix in SELECTIONS.items():
+        if selection in ('1', 'X', '2'):
+            exprs[f"result_{suffix}"] = f"SUM({OUTCOME_SQL[selection]})"
+        exprs[f"pick_{suffix}"] = f"SUM({PICK_SQL[selection]})"
+        exprs[f"hit_{suffix}"] = f"SUM(({PICK_SQL[selection]}) AND ({OUTCOME_SQL[selection]}))"
+    return {column: exprs[column] for column in STAT_COLUMNS}
+
+
+_COLUMNS = ", ".join(STAT_COLUMNS)
+
+# Geri doldurma: günlük toplamlar -> lig içinde kümülatif (pencere fonksiyonu, SQLite >= 3.25)
+BACKFILL_SQL = (
+    f"INSERT INTO result_stat (league, day, {_COLUMNS}) "
+    f"SELECT league, day, {', '.join(f'SUM({c}) OVER (PARTITION BY league ORDER BY day)' for c in STAT_COLUMNS)} "
+    f"FROM (SELECT COALESCE(league, '') AS league, date(date) AS day, "
+    f"{', '.join(f'{expr} AS {c}' for c, expr in stat_aggregates().items())} FROM \"match\" "
+    f"WHERE status = 'Finished' AND score_home IS NOT NULL AND score_away IS NOT NULL "
+    f"GROUP BY COALESCE(league, ''), date(date))"
+)
+
+# Artımlı güncelleme (parametreler: league, day ve STAT_COLUMNS artışları), sırayla:
+# gün satırı yoksa önceki günün kümülatifiyle (ilk günse sıfırla) aç, sonra o gün
+# ve sonrasını artır.
+INCREMENT_SQL = (
+    f"INSERT OR IGNORE INTO result_stat (league, day, {_COLUMNS}) "
+    f"SELECT league, :day, {_COLUMNS} FROM result_stat WHERE league = :league "
+    f"AND day = (SELECT MAX(day) FROM result_stat WHERE league = :league AND day < :day)",
+    f"INSERT OR IGNORE INTO result_stat (league, day, {_COLUMNS}) "
+    f"VALUES (:league, :day, {', '.join('0' for _ in STAT_COLUMNS)})",
+    f"UPDATE result_stat SET {', '.join(f'{c} = {c} + :{c}' for c in STAT_COLUMNS)} "
+    f"WHERE league = :league AND day >= :day",
+)
+
+
+def range_sql(league=False):
+    """[:date_from, :date_to] aralığında lig başına toplamlar (league=True: yalnızca :league).
+
+    Ligler, birincil anahtar indeksi üzerinde özyinelemeli atlamayla bulunur
+    (SELECT DISTINCT tüm satırları tarardı)."""
+    leagues = "SELECT :league AS league" if league else (
+        "SELECT MIN(league) AS league FROM result_stat UNION ALL "
+        "SELECT (SELECT MIN(league) FROM result_stat WHERE league > leagues.league) FROM leagues "
+        "WHERE leagues.league IS NOT NULL")
+    return (
+        f"WITH RECURSIVE leagues(league) AS ({leagues}) "
+        f"SELECT l.league, {', '.join(f'hi.{c} - COALESCE(lo.{c}, 0)' for c in STAT_COLUMNS)} FROM leagues l "
+        f"JOIN result_stat hi ON hi.league = l.league AND hi.day = "
+        f"(SELECT MAX(day) FROM result_stat WHERE league = l.league AND day <= :date_to) "
+        f"LEFT JOIN result_stat lo ON lo.league = l.league AND lo.day = "
+        f"(SELECT MAX(day) FROM result_stat WHERE league = l.league AND day < :date_from) "
+        f"WHERE hi.total > COALESCE(lo.total, 0)"
+    )
+
+
+def range_params(league=None, date_from=None, date_to=None):
+    """range_sql parametreleri (tarihler datetime/date veya None: sınırsız)"""
+    return {"league": league,
+            "date_from": date_from.strftime("%Y-%m-%d") if date_from else "0000-01-01",
+            "date_to": date_to.strftime("%Y-%m-%d") if date_to else "9999-12-31"}
+
+
+def _rate(hits, n):
+    return round(hits / n * 100, 1) if n else 0
+
+
+def summarize(by_league, market=None):
+    """{lig: {kolon: toplam}} -> API istatistikleri. market verilirse total/rate o seçimin
+    (modelin seçtiği maçlar / tutanlar) değerleridir; yoksa 1X2 tahmini."""
+    def score(row):
+        if market is not None:
+            return row[f"pick_{SELECTIONS[market]}"], row[f"hit_{SELECTIONS[market]}"]
+        return row['total'], row['hit_home'] + row['hit_draw'] + row['hit_away']
+
+    totals = dict.fromkeys(STAT_COLUMNS, 0)
+    leagues = []
+    for league, row in by_league.items():
+        for column in STAT_COLUMNS:
+            totals[column] += row[column]
+        n, hits = score(row)
+        if n: leagues.append({"league": league, "total": n, "hits": hits, "rate": _rate(hits, n)})
+
+    n, hits = score(totals)
+    return {
+        "market": market or "1x2", "total": n, "hits": hits, "rate": _rate(hits, n),
+        "matches": totals['total'],
+        "results": {"1": totals['result_home'], "X": totals['result_draw'], "2": totals['result_away'],
+                    "over": totals['result_over'], "btts": totals['result_btts']},
+        "markets": {selection: {"picks": totals[f"pick_{s}"], "hits": totals[f"hit_{s}"],
+                                "rate": _rate(totals[f"hit_{s}"], totals[f"pick_{s}"])}
+                    for selection, s in SELECTIONS.items()},
+        "leagues": sorted(leagues, key=lambda x: -x['total']),
+    }
+
+
+# --- İMLEÇ ---
+def encode_cursor(date, match_id):
+    """(date, id) -> URL güvenli imleç"""
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{match_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """encode_cursor'ın tersi; bozuk imleçte ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        date, match_id = raw.split('|')
+        return datetime.fromisoformat(date), int(match_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Geçersiz imleç: {token}") from e
+
+
+def parse_day(value):
+    """YYYY-MM-DD -> datetime (gün başı); boşsa None, bozuksa ValueError"""
+    if not value: return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError as e:
+        raise ValueError(f"Geçersiz tarih (YYYY-MM-DD): {value}") from e
@@ -9,7 +9,9 @@ import time
 def initialize():
     """Veritabanı tablolarını oluştur"""
     try:
-        # Flask app'i import et
+        # Flask app'i import et (bu kısa ömürlü süreç scheduler'a aday olmasın, modeli yüklemesin)
+        os.environ.setdefault("PREDICTA_SCHEDULER", "off")
+        os.environ.setdefault("PREDICTA_MODEL_LOAD", "off")
         from app import app, db, logger
         
         with app.app_context():
@@ -18,6 +20,10 @@ def initialize():
             # Tabloları oluştur
             db.create_all()
             logger.info("✅ Veritabanı tabloları oluşturuldu!")
+
+            # Eski predictapro.db dosyalarını güncel şemaya taşı
+            from app import migrate_database
+            migrate_database()
             
             # Tablo sayısını kontrol et
             from sqlalchemy import inspect
@@ -28,16 +34,8 @@ def initialize():
             if 'match' not in tables:
                 logger.error("❌ 'match' tablosu oluşturulamadı!")
                 return False
-            
-            # İlk veri çekimini dene (opsiyonel)
-            try:
-                from app import fetch_live_data
-                logger.info("🔄 İlk veri çekiliyor...")
-                fetch_live_data()
-                logger.info("✅ İlk veri çekimi başarılı!")
-            except Exception as e:
-                logger.warning(f"⚠️ İlk veri çekimi başarısız (normal): {e}")
-            
+
+            # İlk veri çekimi scheduler liderinin ilk işi (model hazır olunca)
             return True
             
     except Exception as e:
@@ -0,0 +1,155 @@
+"""
+Predicta PRO - Skor matrisinden türetilen marketler ve değer (EV) hesabı
+
+Maç başına (K, K) skor matrisi (engine.score_matrices) bir kez hesaplanıp
+match.score_matrix kolonunda float32 olarak saklanır. Tüm marketler bu
+matristen maskeli toplamlarla türetilir; Poisson tekrar hesaplanmaz:
+
+    1X2, çifte şans, herhangi bir çizgide alt/üst, Asya handikapı,
+    karşılıklı gol, doğru skor
+
+Tam sayı çizgilerde (üst 3, handikap 0) eşitlik iade (push), çeyrek
+çizgilerde (2.25, -0.75) bahis iki yarım çizgiye bölünür. Fonksiyonlar hem
+tek matris (K, K) hem yığın (N, K, K) kabul eder. Flask/DB bağımlılığı yoktur.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from history import OVER_LINE
+
+MATRIX_DTYPE = np.float32
+LINE_STEP = 0.25
+
+# Bültende oranı olan seçimler (history.SELECTIONS adları) -> oran kolonu
+ODDS_SELECTIONS = {'1': 'ms1', 'X': 'msx', '2': 'ms2', 'over': 'ust', 'under': 'alt', 'btts': 'kgvar', 'nobtts': 'kgyok'}
+
+
+class Settlement(NamedTuple):
+    """Tek çizginin olasılıkları: kazanç, iade, kayıp (toplam 1)"""
+    win: np.ndarray
+    push: np.ndarray
+    lose: np.ndarray
+
+
+# --- SAKLAMA ---
+def matrix_to_blob(matrix):
+    return np.ascontiguousarray(matrix, dtype=MATRIX_DTYPE).tobytes()
+
+
+def blob_to_matrix(blob):
+    """matrix_to_blob'un tersi; ızgara boyutu (K) bayt sayısından çıkar"""
+    flat = np.frombuffer(blob, dtype=MATRIX_DTYPE).astype(np.float64)
+    grid = int(round(len(flat) ** 0.5))
+    return flat.reshape(grid, grid)
+
+
+# --- ÇEKİRDEK ---
+def _axes(matrix):
+    grid = matrix.shape[-1]
+    return np.arange(grid)[:, None], np.arange(grid)[None, :]
+
+
+def _total(matrix, mask):
+    """Maskeli olasılık toplamı; (K, K) -> skaler, (N, K, K) -> (N,)"""
+    return np.tensordot(matrix, mask.astype(np.float64), axes=([-2, -1], [0, 1]))
+
+
+def _settle(matrix, margin):
+    """margin > 0 kazanç, == 0 iade, < 0 kayıp"""
+    win, lose = _total(matrix, margin > 0), _total(matrix, margin < 0)
+    return Settlement(win, 1.0 - win - lose, lose)
+
+
+def check_line(line):
+    """Çizgi sonlu ve 0.25'in katı olmalı; değilse ValueError"""
+    line = float(line)
+    if not math.isfinite(line):
+        raise ValueError(f"Geçersiz çizgi (sonlu sayı olmalı): {line}")
+    if abs(line / LINE_STEP - round(line / LINE_STEP)) > 1e-9:
+        raise ValueError(f"Geçersiz çizgi (0.25'in katı olmalı): {line}")
+    return line
+
+
+def split_line(line):
+    """Çeyrek çizgi -> iki yarım çizgi (2.25 -> 2.0 ve 2.5); diğerleri tek çizgi"""
+    line = check_line(line)
+    if abs(line * 2 - round(line * 2)) > 1e-9:
+        return line - LINE_STEP, line + LINE_STEP
+    return (line,)
+
+
+# --- MARKETLER ---
+def total_goals(matrix, line, side='over'):
+    """Alt/üst: çizginin her yarısı için Settlement listesi"""
+    h, a = _axes(matrix)
+    sign = 1 if side == 'over' else -1
+    return [_settle(matrix, sign * (h + a - part)) for part in split_line(line)]
+
+
+def asian_handicap(matrix, line, side='home'):
+    """Asya handikapı: `line` seçilen tarafın golüne eklenir (ev -0.5: ev kazanmalı)"""
+    h, a = _axes(matrix)
+    diff = h - a if side == 'home' else a - h
+    return [_settle(matrix, diff + part) for part in split_line(line)]
+
+
+def match_result(matrix):
+    """(1, X, 2)"""
+    h, a = _axes(matrix)
+    return _total(matrix, h > a), _total(matrix, h == a), _total(matrix, h < a)
+
+
+def double_chance(matrix):
+    p1, px, p2 = match_result(matrix)
+    return {'1X': p1 + px, '12': p1 + p2, 'X2': px + p2}
+
+
+def btts(matrix):
+    h, a = _axes(matrix)
+    return _total(matrix, (h > 0) & (a > 0))
+
+
+def correct_scores(matrix, top=10):
+    """Tek matris için en olası `top` skor: [("h-a", p)]"""
+    flat = np.argsort(matrix, axis=None)[::-1][:top]
+    return [(f"{i}-{j}", float(matrix[i, j])) for i, j in zip(*np.unravel_index(flat, matrix.shape))]
+
+
+def selection_probs(matrix):
+    """Bülten seçimlerinin (ODDS_SELECTIONS) kazanma olasılıkları"""
+    p1, px, p2 = match_result(matrix)
+    goals = np.add(*_axes(matrix))
+    over, under = _total(matrix, goals > OVER_LINE), _total(matrix, goals < OVER_LINE)
+    p_btts = btts(matrix)
+    return {'1': p1, 'X': px, '2': p2, 'over': over, 'under': under, 'btts': p_btts, 'nobtts': 1.0 - p_btts}
+
+
+# --- DEĞER ---
+def expected_value(halves, odds):
+    """Birim bahsin beklenen kazancı; çeyrek çizgide iki yarının ortalaması (iade 0)"""
+    return sum(s.win * (odds - 1) - s.lose for s in halves) / len(halves)
+
+
+def line_summary(halves, odds=None):
+    """Çizgi için API özeti: kazanç/iade/kayıp (yarıların ortalaması), adil oran, varsa EV"""
+    win = float(sum(s.win for s in halves) / len(halves))
+    lose = float(sum(s.lose for s in halves) / len(halves))
+    push = max(1.0 - win - lose, 0.0)
+    out = {"win": round(win, 4), "push": round(push, 4), "lose": round(lose, 4),
+           "fair_odds": round((win + lose) / win, 2) if win > 0 else None}
+    if odds: out["ev"] = round(float(expected_value(halves, odds)), 4)
+    return out
+
+
+def value_rows(matrix, odds):
+    """Bülten oranlarına karşı seçim başına (seçim, olasılık, oran, EV); oranı olmayan seçim atlanır"""
+    probs = selection_probs(matrix)
+    rows = []
+    for selection, key in ODDS_SELECTIONS.items():
+        price = odds.get(key)
+        if not price or price <= 1.0: continue
+        p = float(probs[selection])
+        rows.append((selection, p, price, p * price - 1.0))
+    return rows
@@ -0,0 +1,138 @@
+"""
+Predicta PRO - Performans metrikleri (Prometheus)
+
+Model yükleme, bülten indirme/ayrıştırma, tahmin, DB commit ve her Flask
+route'u için süre histogramları; bülten maçları, takım eşleştirme ve
+bulanık eşleşme için sayaçlar. /metrics bunları Prometheus metin
+formatında sunar.
+
+Gunicorn altında her worker ayrı süreçtir: PROMETHEUS_MULTIPROC_DIR
+(gunicorn.conf.py ayarlar) tanımlıysa prometheus_client çoklu süreç
+modunda çalışır; her süreç değerlerini bu klasördeki mmap dosyalarına
+yazar ve /metrics isteği tüm worker'ların dosyalarını toplar. Çıkan
+worker'ın canlı gauge'ları child_exit kancasında düşülür.
+
+Arka plan işleri (worker.py) aynı klasöre yazar; aynı makinedeyse web
+/metrics onları da gösterir. Ayrı makinede çalışıyorsa
+PREDICTA_WORKER_METRICS_PORT ile kendi /metrics sunucusunu açar.
+
+prometheus_client kurulu değilse metrikler sessizce devre dışıdır.
+"""
+import os
+import re
+from contextlib import nullcontext
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # metrikler no-op olur
+    prometheus_client = CollectorRegistry = Counter = Gauge = Histogram = multiprocess = None
+
+# Saniye: hızlı işlemler (tahmin, eşleştirme) ile uzun işler (model yükleme) ayrı ölçeklerde
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class _NoopMetric:
+    """prometheus_client yokken aynı arayüz"""
+
+    def labels(self, *args, **kwargs): return self
+    def inc(self, amount=1): pass
+    def dec(self, amount=1): pass
+    def set(self, value): pass
+    def observe(self, value): pass
+    def time(self): return nullcontext()
+
+
+def _metric(kind, name, doc, labels=(), **kwargs):
+    if prometheus_client is None: return _NoopMetric()
+    return kind(name, doc, labels, **kwargs)
+
+
+# --- SÜRELER ---
+MODEL_LOAD = _metric(Histogram, 'predicta_model_load_seconds',
+                     "Rating motorunun yüklenmesi (snapshot veya veri dosyasından kurulum)", ['source'],
+                     buckets=SLOW_BUCKETS)
+UPSTREAM_FETCH = _metric(Histogram, 'predicta_upstream_fetch_seconds',
+                         "Dış kaynaktan yanıt başlıklarının gelmesine kadar geçen süre", ['source', 'status'],
+                         buckets=REQUEST_BUCKETS)
+PARSE = _metric(Histogram, 'predicta_parse_seconds',
+                "Bülten gövdesinin okunup ayrıştırılması", ['source'], buckets=REQUEST_BUCKETS)
+PREDICT = _metric(Histogram, 'predicta_predict_seconds',
+                  "predict_batch çağrısı (eşleştirme + xG + skor matrisi)", buckets=FAST_BUCKETS)
+DB_COMMIT = _metric(Histogram, 'predicta_db_commit_seconds',
+                    "SQLAlchemy commit süresi", ['operation'], buckets=FAST_BUCKETS)
+REQUEST = _metric(Histogram, 'predicta_http_request_seconds',
+                  "Flask route süresi (akışlı yanıtlarda ilk bayta kadar)", ['endpoint', 'method', 'status'],
+                  buckets=REQUEST_BUCKETS)
+JOB = _metric(Histogram, 'predicta_job_seconds',
+              "Zamanlanmış iş süresi", ['job', 'success'], buckets=SLOW_BUCKETS)
+
+# --- SAYAÇLAR ---
+EVENTS = _metric(Counter, 'predicta_bulletin_events_total',
+                 "Bülten maçları: new / updated / skipped (parmak izi değişmemiş)", ['result'])
+PREDICTIONS = _metric(Counter, 'predicta_predictions_total',
+                      "Tahminlenen maç sayısı")
+TEAM_LOOKUPS = _metric(Counter, 'predicta_team_lookups_total',
+                       "find_team_cached sonuçları (hit_memory, hit_exact, hit_stored, fuzzy_scoped, fuzzy_global, miss)",
+                       ['result'])
+FUZZY_MATCHES = _metric(Counter, 'predicta_team_fuzzy_matches_total',
+                        "Bulanık eşleştirme denemeleri (lig kapsamlı / tüm takımlar)", ['scope', 'matched'])
+UPSTREAM_RETRIES = _metric(Counter, 'predicta_upstream_retries_total',
+                           "Dış kaynak yeniden denemeleri (HTTP durumu veya bağlantı hatası türü)", ['source', 'reason'])
+
+# --- ANLIK DEĞERLER ---
+SSE_CLIENTS = _metric(Gauge, 'predicta_sse_clients',
+                      "Açık /api/stream bağlantıları", multiprocess_mode='livesum')
+
+
+def render():
+    """(gövde, content-type); çoklu süreç modunda tüm worker'ların toplamı"""
+    if prometheus_client is None:
+        return b"# prometheus_client kurulu degil\n", 'text/plain; charset=utf-8'
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def clear_stale_files(path):
+    """Çoklu süreç klasörünü hazırla: çalışmayan süreçlerin dosyalarını sil.
+    Canlı süreçlerinkiler (önce açılmış worker.py, preload'da master) korunur."""
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        match = re.search(r'_(\d+)\.db$', name)
+        if match and not _alive(int(match.group(1))):
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+def serve(port):
+    """Ayrı süreç (worker.py) için /metrics HTTP sunucusu (arka plan iş parçacığı)"""
+    if prometheus_client is None: return
+    registry = prometheus_client.REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    prometheus_client.start_http_server(port, registry=registry)
+
+
+def mark_process_dead(pid):
+    """gunicorn child_exit: çıkan worker'ın canlı gauge dosyalarını bırak"""
+    if prometheus_client is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
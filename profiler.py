@@ -0,0 +1,133 @@
+"""
+Predicta PRO - İstek bazlı örnekleyen profil aracı
+
+Ayrı bir iş parçacığı, hedef iş parçacığının yığınını (sys._current_frames)
+sabit aralıklarla örnekler; isteğin kendisine enstrümantasyon eklenmez,
+bu yüzden cProfile'ın aksine yavaş istekleri (kuyruk gecikmesi) çarpıtmaz.
+CPU-yoğun kodda örnek sıklığı GIL geçiş aralığıyla (~5 ms) sınırlıdır.
+
+gunicorn gevent worker'ında istek bir greenlet'tir: örnekleyici yamalanmamış
+(gerçek) iş parçacığında çalışır ve isteğin greenlet'ini izler; greenlet
+askıdaysa (I/O bekliyor) kendi çerçevesi, çalışıyorsa iş parçacığınınki
+örneklenir.
+
+PREDICTA_PROFILE:
+    off     (varsayılan) kapalı
+    header  yalnızca `X-Predicta-Profile: 1` başlıklı istekler
+    all     tüm istekler
+PREDICTA_PROFILE_SLOW_MS: bu süreden kısa isteklerin raporu yazılmaz.
+Raporlar instance/profiles altına düz metin olarak yazılır; dosya adı
+yanıtın X-Predicta-Profile başlığında döner.
+"""
+import _thread
+import os
+import sys
+import time
+from collections import Counter
+
+PROFILE_HEADER = 'X-Predicta-Profile'
+DEFAULT_INTERVAL = 0.005
+
+
+def _native(module, name):
+    """gevent yamaladıysa özgün nesne (gerçek iş parçacığı, bloklayan uyku); yoksa modüldeki"""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None: return monkey.get_original(module, name)
+    return getattr(sys.modules[module], name)
+
+
+class SamplingProfiler:
+    """Tek iş parçacığını (gevent'te tek greenlet'i) örnekler: yaprak (self) ve kapsayıcı (inclusive) fonksiyon sayıları"""
+
+    def __init__(self, thread_id=None, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id or _native('_thread', 'get_ident')()
+        greenlet = sys.modules.get('greenlet') if 'gevent.monkey' in sys.modules else None
+        self.greenlet = greenlet.getcurrent() if greenlet is not None and thread_id is None else None
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = False
+        self._done = None
+        self.started = self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._done = _native('_thread', 'allocate_lock')()
+        self._done.acquire()
+        _native('_thread', 'start_new_thread')(self._run, ())
+        return self
+
+    def stop(self):
+        self._stopped = True
+        if self._done is not None:
+            self._done.acquire()
+            self._done = None
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _frame(self):
+        # Askıdaki greenlet'in çerçevesi gr_frame'dedir; çalışan greenlet'inki iş parçacığının çerçevesidir
+        if self.greenlet is not None and self.greenlet.gr_frame is not None:
+            return self.greenlet.gr_frame
+        return sys._current_frames().get(self.thread_id)
+
+    def _run(self):
+        sleep = _native('time', 'sleep')
+        try:
+            while not self._stopped:
+                sleep(self.interval)
+                if self._stopped: break
+                self._sample()
+        finally:
+            self._done.release()
+
+    def _sample(self):
+        frame = self._frame()
+        if frame is not None:
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, os.path.basename(code.co_filename), frame.f_lineno))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self, limit=25):
+        """Düz metin rapor: en çok örneklenen satırlar ve fonksiyonlar"""
+        leaf, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack[-1]] += count
+            for func in {(name, filename) for name, filename, _ in stack}:
+                inclusive[func] += count
+
+        total = max(self.samples, 1)
+        lines = [f"{self.elapsed * 1000:.1f} ms, {self.samples} örnek ({self.interval * 1000:.0f} ms aralık)", "",
+                 "Kendi süresi (satır):"]
+        lines += [f"  {count / total:6.1%}  {name} ({filename}:{line})" for (name, filename, line), count in leaf.most_common(limit)]
+        lines += ["", "Kapsayıcı süre (fonksiyon):"]
+        lines += [f"  {count / total:6.1%}  {name} ({filename})" for (name, filename), count in inclusive.most_common(limit)]
+        if self.stacks:
+            stack, count = self.stacks.most_common(1)[0]
+            lines += ["", f"En sık yığın ({count / total:.1%}):"]
+            lines += [f"  {name} ({filename}:{line})" for name, filename, line in stack]
+        return "\n".join(lines) + "\n"
+
+
+def profile_mode():
+    return os.getenv("PREDICTA_PROFILE", "off").lower()
+
+
+def should_profile(headers):
+    mode = profile_mode()
+    return mode == "all" or (mode == "header" and headers.get(PROFILE_HEADER) == "1")
+
+
+def save_report(profiler, directory, label):
+    """Eşik süresini aşan isteğin raporunu yaz; dosya adını (veya None) döner"""
+    if profiler.elapsed * 1000 < float(os.getenv("PREDICTA_PROFILE_SLOW_MS", 0)): return None
+    os.makedirs(directory, exist_ok=True)
+    safe = "".join(c if c.isalnum() else "_" for c in label).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}-{profiler.elapsed * 1000:.0f}ms.txt"
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+        f.write(profiler.report())
+    return name
@@ -0,0 +1,99 @@
+"""
+Predicta PRO - SQLite bağlantı ayarları ve şema göçleri
+
+Her yeni bağlantıda WAL ve ilgili pragmalar uygulanır. Şema sürümü
+`PRAGMA user_version` içinde tutulur; mevcut predictapro.db dosyaları ilk
+açılışta sıradaki göçlerden geçirilir. Göçler tekrar çalıştırılabilir
+(idempotent) yazılmıştır; yeni kurulan bir veritabanında yalnızca sürüm
+numarası ilerler.
+"""
+import sqlite3
+
+from bulletin import ODDS_KEYS
+from history import BACKFILL_SQL, STAT_COLUMNS
+
+PRAGMAS = (
+    ("journal_mode", "WAL"),        # okuyucular (worker'lar, SSE) yazarı beklemez
+    ("synchronous", "NORMAL"),      # WAL'da güvenli; her commit'te fsync yok
+    ("busy_timeout", 5000),         # kilitli DB'de hemen hata yerine 5 sn bekle
+    ("cache_size", -32000),         # ~32 MB sayfa önbelleği
+    ("temp_store", "MEMORY"),
+    ("mmap_size", 268435456),
+)
+
+
+def apply_pragmas(dbapi_conn, _record=None):
+    """SQLAlchemy 'connect' olayı: bağlantı başına pragmalar"""
+    cur = dbapi_conn.cursor()
+    for name, value in PRAGMAS:
+        cur.execute(f"PRAGMA {name}={value}")
+    cur.close()
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def _migrate_v1(conn):
+    """Oran JSON'u -> sayısal kolonlar, (status, date) ve date indeksleri"""
+    columns = _columns(conn, "match")
+    for key in ODDS_KEYS:
+        if key not in columns:
+            conn.execute(f'ALTER TABLE "match" ADD COLUMN {key} FLOAT')
+
+    if "odds" in columns:
+        # "-" (oran yok) NULL olur
+        assignments = ", ".join(f"{k} = CAST(NULLIF(json_extract(odds, '$.{k}'), '-') AS REAL)" for k in ODDS_KEYS)
+        conn.execute(f'UPDATE "match" SET {assignments} WHERE odds IS NOT NULL AND json_valid(odds)')
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            conn.execute('ALTER TABLE "match" DROP COLUMN odds')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_match_status_date ON "match" (status, date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_match_date ON "match" (date)')
+
+
+def _migrate_v2(conn):
+    """Lig bazında kümülatif sonuç toplamları + mevcut sonuçlanmış maçlardan geri doldurma"""
+    columns = ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in STAT_COLUMNS)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS result_stat (league VARCHAR(50) NOT NULL, day DATE NOT NULL, '
+                 f'{columns}, PRIMARY KEY (league, day))')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_match_league_status_date ON "match" (league, status, date)')
+    conn.execute("DELETE FROM result_stat")
+    conn.execute(BACKFILL_SQL)
+
+
+def _migrate_v3(conn):
+    """Maç başına skor matrisi kolonu + bekleyen maçların değer (EV) tablosu.
+    Eski maçların matrisi ve EV satırları ilk oran değişiminde üretilir (app.refresh_value_bets)."""
+    if "score_matrix" not in _columns(conn, "match"):
+        conn.execute('ALTER TABLE "match" ADD COLUMN score_matrix BLOB')
+    conn.execute('CREATE TABLE IF NOT EXISTS value_bet (match_code VARCHAR(20) NOT NULL, selection VARCHAR(10) NOT NULL, '
+                 'date DATETIME, prob FLOAT NOT NULL, odds FLOAT NOT NULL, ev FLOAT NOT NULL, '
+                 'PRIMARY KEY (match_code, selection))')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_value_bet_ev ON value_bet (ev)')
+
+
+MIGRATIONS = {1: _migrate_v1, 2: _migrate_v2, 3: _migrate_v3}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def migrate(conn):
+    """Bekleyen göçleri uygula (sqlite3 bağlantısı); uygulanan sürümleri döner.
+
+    BEGIN IMMEDIATE yazma kilidini alır; aynı anda açılan worker'lardan
+    yalnızca biri göç eder, diğerleri güncel sürümü görüp çıkar."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        applied = []
+        if "match" in {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}:
+            for target in sorted(v for v in MIGRATIONS if v > version):
+                MIGRATIONS[target](conn)
+                applied.append(target)
+        if version < SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
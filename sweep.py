@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Predicta PRO - Model parametre taraması (grid / rastgele arama)
+
+ModelConfig alanlarının (alpha, form eşikleri ve çarpanları, Dixon-Coles
+düzeltmesi) adaylarını tarihsel veride backtest.py ile aynı ileriye dönük
+(walk-forward) düzende değerlendirir ve log-loss'a göre sıralar.
+
+Her aday için gün gün motor çalıştırmak yerine tüm maçların maç öncesi
+rating'leri kapalı formda, tek vektörel geçişte hesaplanır: takım başına
+sıralı maç dizilerinde ölçeklenmiş kümülatif toplamlar (EMA), kayan pencere
+toplamları (form) ve lig/gün bazında kümülatif gol ortalamaları. Adaydan
+bağımsız diziler (indeksler, sıralar, skorlar, günler, tarihler) CSV parmak
+izine göre önbellek klasörüne .npy olarak yazılır; havuz süreçleri bunları
+salt okunur mmap ile açar, sayfalar işletim sisteminin önbelleğinden paylaşılır.
+
+Kullanım:
+    python sweep.py --grid alpha=0.12,0.15,0.18,0.21 --grid form_good=0.6,0.65,0.7 [--jobs 8]
+    python sweep.py --random 200 [--since 2015-07-01] [--league E0] [--per-league] [--best-out best.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from backtest import EPS, prepare
+from dataset import load_match_frame
+from engine import (DEFAULT_AVG_AWAY, DEFAULT_AVG_HOME, SCORE_GRID, ModelConfig, file_fingerprint, load_config,
+                    outcome_probs, score_matrices)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, 'data', 'final_unified_dataset.csv')
+CACHE_DIR = os.path.join(BASE_DIR, 'instance', 'sweep_cache')
+CACHE_VERSION = 2
+CHUNK = 100000          # Skor tensörü bu kadar satırlık dilimlerle kurulur
+MAX_EXPONENT = 700      # (1-a)^-n ölçeği float64 sınırına yaklaşırsa aday atlanır
+
+# Rastgele arama aralıkları (alt, üst)
+SEARCH_SPACE = {
+    'alpha': (0.05, 0.35),
+    'form_good': (0.55, 0.80),
+    'form_bad': (0.20, 0.40),
+    'form_good_mult': (1.00, 1.25),
+    'form_bad_mult': (0.75, 1.00),
+    'form_good_weight': (0.0, 0.6),
+    'form_mid_weight': (0.0, 0.5),
+    'dc_00': (1.00, 1.40),
+    'dc_11': (1.00, 1.25),
+}
+
+_ARRAYS = None  # Havuz süreçlerinde açılan önbellek
+_ROWS = None    # Puanlanan satırlar (havuz süreçlerinde)
+_BASE = {}      # (alpha, window) -> adaydan bağımsız rating/form dizileri
+
+
+# --- ÖN İŞLEME (adaydan bağımsız) ---
+def _runs(*keys):
+    """Sıralı dizide her elemanın ait olduğu ardışık grubun başlangıç konumu"""
+    n = len(keys[0])
+    change = np.zeros(n, dtype=bool)
+    if n: change[0] = True
+    for k in keys:
+        change[1:] |= k[1:] != k[:-1]
+    return np.maximum.accumulate(np.where(change, np.arange(n), 0))
+
+
+def _role_arrays(prefix, team, league, day, goals_for, goals_against, n_teams, n_leagues):
+    """Ev veya deplasman rolü için takım-içi sıralı dizi (seq) ve satır -> seq eşlemesi"""
+    order = np.argsort(team, kind='stable')          # satırlar tarih sıralı -> takım içinde kronolojik
+    t, d, l = team[order], day[order], league[order]
+    team_start = _runs(t)
+    k = _runs(t, d) - team_start                      # o günden önceki maç sayısı
+
+    # (takım, lig) çiftleri: takım içinde ilk görülme sırasına göre slot
+    key = t * n_leagues + l
+    uniq, first = np.unique(key, return_index=True)
+    by_first = np.argsort(first, kind='stable')
+    pair_team = uniq[by_first] // n_leagues
+    pair_order = np.argsort(pair_team, kind='stable')
+    slot_of_pair = np.empty(len(uniq), dtype=np.int64)
+    slot_of_pair[by_first[pair_order]] = np.arange(len(uniq)) - _runs(pair_team[pair_order])
+    slot = slot_of_pair[np.searchsorted(uniq, key)]
+    n_slots = int(slot.max()) + 1 if len(slot) else 1
+    slot_league = np.full((n_teams, n_slots), -1, dtype=np.int64)
+    slot_league[t, slot] = l
+
+    seq_pos = np.empty(len(order), dtype=np.int64)
+    seq_pos[order] = np.arange(len(order))
+    return {
+        f'{prefix}_pos': seq_pos, f'{prefix}_team': t, f'{prefix}_team_start': team_start, f'{prefix}_k': k,
+        f'{prefix}_ordinal': np.arange(len(order)) - team_start, f'{prefix}_slot': slot,
+        f'{prefix}_slot_league': slot_league,
+        f'{prefix}_for': goals_for[order].astype(np.float64), f'{prefix}_against': goals_against[order].astype(np.float64),
+        f'{prefix}_points': np.where(goals_for[order] > goals_against[order], 3,
+                                     np.where(goals_for[order] == goals_against[order], 1, 0)).astype(np.float64),
+    }
+
+
+def build_arrays(df):
+    """backtest.prepare çıktısından adaydan bağımsız diziler"""
+    teams, team_names = pd.factorize(pd.concat([df['home_team'], df['away_team']]), sort=False)
+    home, away = teams[:len(df)], teams[len(df):]
+    league, league_names = pd.factorize(df['league'])
+    n_teams, n_leagues = len(team_names), len(league_names)
+
+    # Gün numarası; tarihsiz satırların her biri ayrı gün
+    day, _ = pd.factorize(df['date'])
+    missing = df['date'].isna().to_numpy()
+    day = np.where(missing, day.max(initial=0) + 1 + np.cumsum(missing), day).astype(np.int64)
+
+    hs, as_ = df['home_score'].to_numpy(np.int64), df['away_score'].to_numpy(np.int64)
+    arrays = {
+        'home': home, 'away': away, 'league': league, 'day': day, 'home_score': hs, 'away_score': as_,
+        'date': df['date'].to_numpy('datetime64[ns]'),
+        'league_names': np.array(league_names, dtype=object).astype(str),
+        'unknown_league': np.array(list(league_names).index('Unknown') if 'Unknown' in list(league_names) else -1),
+    }
+    arrays.update(_role_arrays('h', home, league, day, hs, as_, n_teams, n_leagues))
+    arrays.update(_role_arrays('a', away, league, day, as_, hs, n_teams, n_leagues))
+
+    # Ev sahibinin maç günü öncesindeki son maçının ligi (iki rol birlikte)
+    n = len(df)
+    app_team, app_row = np.concatenate([home, away]), np.concatenate([np.arange(n), np.arange(n)])
+    order = np.lexsort((app_row, app_team))
+    t, rows = app_team[order], app_row[order]
+    team_start, group_start = _runs(t), _runs(t, day[rows])
+    known = group_start > team_start
+    prev_league = np.where(known, league[rows[np.maximum(group_start - 1, 0)]], -1)
+    app_known = np.empty(2 * n, dtype=bool)
+    app_prev = np.empty(2 * n, dtype=np.int64)
+    app_known[order], app_prev[order] = known, prev_league
+    arrays.update({'home_known': app_known[:n], 'away_known': app_known[n:], 'home_prev_league': app_prev[:n]})
+
+    # Lig ortalamaları sorgusu: (lig, gün) sıralı kümülatif toplamlar
+    lorder = np.lexsort((day, league))
+    stride = int(day.max(initial=0)) + 2
+    arrays.update({
+        'league_keys': league[lorder] * stride + day[lorder], 'league_stride': np.array(stride),
+        'league_cum_home': np.concatenate([[0.0], np.cumsum(hs[lorder])]),
+        'league_cum_away': np.concatenate([[0.0], np.cumsum(as_[lorder])]),
+    })
+    return arrays
+
+
+def load_arrays(csv_path, cache_dir=CACHE_DIR):
+    """Önbellek klasörünün yolu; yoksa CSV'den kurulup dizi başına .npy olarak yazılır"""
+    fingerprint = file_fingerprint(csv_path)
+    path = os.path.join(cache_dir, f"{fingerprint['sha256'][:16]}-v{CACHE_VERSION}")
+    if not os.path.isdir(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        arrays = build_arrays(prepare(load_match_frame(csv_path)))
+        tmp = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+        try:
+            for name, values in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+            os.rename(tmp, path)
+        except OSError:
+            # Aynı önbelleği başka bir süreç daha önce yazdı
+            shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def open_arrays(path):
+    """Önbellekteki .npy dosyalarını salt okunur mmap ile aç (havuz süreçleri aynı sayfaları paylaşır)"""
+    return {entry[:-4]: np.load(os.path.join(path, entry), mmap_mode='r', allow_pickle=False)
+            for entry in os.listdir(path) if entry.endswith('.npy')}
+
+
+# --- ADAY DEĞERLENDİRME ---
+def _league_avgs(arrays, league, day):
+    """(lig, gün) için o günden önceki ev/deplasman gol ortalaması (yoksa varsayılan)"""
+    keys, stride = arrays['league_keys'], arrays['league_stride'].item()
+    safe = np.maximum(league, 0)
+    start = np.searchsorted(keys, safe * stride)
+    end = np.searchsorted(keys, safe * stride + day)
+    count = end - start
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_h = (arrays['league_cum_home'][end] - arrays['league_cum_home'][start]) / count
+        avg_a = (arrays['league_cum_away'][end] - arrays['league_cum_away'][start]) / count
+    valid = (league >= 0) & (count > 0)
+    avg_h = np.where(valid & (avg_h != 0), avg_h, DEFAULT_AVG_HOME)
+    avg_a = np.where(valid & (avg_a != 0), avg_a, DEFAULT_AVG_AWAY)
+    return avg_h, avg_a
+
+
+def _role_ratings(arrays, prefix, alpha, window, avg_for):
+    """Rol için maç öncesi (hücum, savunma) rating'leri ve form toplamları (satır sırasında)"""
+    pos = arrays[f'{prefix}_pos']
+    team_start, k = arrays[f'{prefix}_team_start'], arrays[f'{prefix}_k']
+    ordinal, slot, slot_league = arrays[f'{prefix}_ordinal'], arrays[f'{prefix}_slot'], arrays[f'{prefix}_slot_league']
+    team = arrays['home' if prefix == 'h' else 'away']
+    day = arrays['day']
+
+    # S(k) = sum_{j<k} a(1-a)^(k-1-j) gol_j = (1-a)^k * sum_{j<k} a(1-a)^-(j+1) gol_j
+    # Kümülatif toplam takım başına ayrı satırda (takımlar arası birikim hassasiyeti bozmasın)
+    seq_team = arrays[f'{prefix}_team']
+    scale = alpha * (1 - alpha) ** -(ordinal + 1.0)
+    shape = (len(slot_league), int(ordinal.max(initial=0)) + 2)
+    k_row = k[pos]
+    decay = (1 - alpha) ** k_row.astype(np.float64)
+
+    def prefix_at(values):
+        table = np.zeros(shape)
+        table[seq_team, ordinal + 1] = values
+        return np.cumsum(table, axis=1)[team, k_row]
+
+    # (1 + sum/ort) * (1-a)^k = öncül + S/ort
+    attack, defence = np.ones(len(pos)), np.ones(len(pos))
+    for s in range(slot_league.shape[1]):
+        mask = slot == s
+        avg_h, avg_a = _league_avgs(arrays, slot_league[team, s], day)
+        a_for, a_against = (avg_h, avg_a) if avg_for == 'home' else (avg_a, avg_h)
+        attack += prefix_at(np.where(mask, scale * arrays[f'{prefix}_for'], 0.0)) / a_for
+        defence += prefix_at(np.where(mask, scale * arrays[f'{prefix}_against'], 0.0)) / a_against
+    attack, defence = attack * decay, defence * decay
+
+    start, end = team_start[pos], team_start[pos] + k_row
+    lo = start + np.maximum(k_row - window, 0)
+    cs_points = np.concatenate([[0.0], np.cumsum(arrays[f'{prefix}_points'])])
+    cs_goals = np.concatenate([[0.0], np.cumsum(arrays[f'{prefix}_for'])])
+    played = np.minimum(k_row, window)
+    return attack, defence, played, cs_points[end] - cs_points[lo], cs_goals[end] - cs_goals[lo]
+
+
+def _base(arrays, alpha, window):
+    """alpha/pencereye bağlı kısım; aynı alpha'lı adaylar (grid) yeniden kullanır"""
+    key = (alpha, window)
+    if key not in _BASE:
+        if len(_BASE) >= 8: _BASE.clear()
+        att_h, def_h, played_h, pts_h, goals_h = _role_ratings(arrays, 'h', alpha, window, 'home')
+        att_a, def_a, played_a, pts_a, goals_a = _role_ratings(arrays, 'a', alpha, window, 'away')
+
+        # Maçtan önce hiç oynamamış takım bilinmeyen sayılır (canlı sistemdeki gibi)
+        kh, ka = arrays['home_known'], arrays['away_known']
+        att_h, def_h = np.where(kh, att_h, 1.0), np.where(kh, def_h, 1.0)
+        att_a, def_a = np.where(ka, att_a, 1.0), np.where(ka, def_a, 1.0)
+        played_h, played_a = np.where(kh, played_h, 0), np.where(ka, played_a, 0)
+
+        league = np.where(kh, arrays['home_prev_league'], arrays['unknown_league'])
+        avg_h, avg_a = _league_avgs(arrays, league, arrays['day'])
+        _BASE[key] = (att_h * def_a * avg_h, att_a * def_h * avg_a,
+                      (played_h, pts_h, goals_h), (played_a, pts_a, goals_a))
+    return _BASE[key]
+
+
+def _form_adjust(xg, played, points, goals, c):
+    """engine.RatingEngine._form_adjust ile aynı kurallar"""
+    active = played >= c.form_min_matches
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = points / (played * 3)
+        recent = goals / played
+    good = active & (ratio > c.form_good)
+    bad = active & (ratio < c.form_bad)
+    mid = active & ~good & ~bad
+    xg = np.where(good, ((xg * (1 - c.form_good_weight)) + (recent * c.form_good_weight)) * c.form_good_mult, xg)
+    xg = np.where(bad, xg * c.form_bad_mult, xg)
+    return np.where(mid, (xg * (1 - c.form_mid_weight)) + (recent * c.form_mid_weight), xg)
+
+
+def predict_all(arrays, config, grid=SCORE_GRID, rows=None):
+    """Tüm (veya seçili) maçlar için maç öncesi (1, X, 2, üst, KG) olasılıkları"""
+    if arrays['h_ordinal'].max(initial=0) * -np.log(1 - config.alpha) > MAX_EXPONENT:
+        raise ValueError("alpha bu veri uzunluğu için fazla büyük (ölçek taşması)")
+    h_xg, a_xg, form_h, form_a = _base(arrays, config.alpha, config.window)
+    rows = np.arange(len(h_xg)) if rows is None else rows
+    h_xg = _form_adjust(h_xg[rows], *(f[rows] for f in form_h), config)
+    a_xg = _form_adjust(a_xg[rows], *(f[rows] for f in form_a), config)
+
+    out = np.empty((len(rows), 5))
+    for i in range(0, len(rows), CHUNK):
+        part = slice(i, i + CHUNK)
+        out[part] = np.column_stack(outcome_probs(score_matrices(h_xg[part], a_xg[part], grid, config)))
+    return out
+
+
+def score_rows(arrays, probs, rows):
+    """Satır bazlı (log-loss, Brier) — backtest.evaluate ile aynı tanımlar"""
+    hs, as_ = arrays['home_score'][rows], arrays['away_score'][rows]
+    outcome = np.where(hs > as_, 0, np.where(hs == as_, 1, 2))
+    p = probs[:, :3] / probs[:, :3].sum(axis=1, keepdims=True)
+    log_loss = -np.log(np.clip(p[np.arange(len(rows)), outcome], EPS, 1))
+    brier = ((p - np.eye(3)[outcome]) ** 2).sum(axis=1)
+    return log_loss, brier
+
+
+# --- HAVUZ ---
+def _init_worker(path, rows):
+    global _ARRAYS, _ROWS
+    _ARRAYS, _ROWS = open_arrays(path), rows
+
+
+def evaluate_candidate(args):
+    """(log-loss, Brier, lig bazında log-loss); aday atlanırsa nedeni (str)"""
+    config, grid = args
+    try:
+        probs = predict_all(_ARRAYS, config, grid, _ROWS)
+    except ValueError as e:
+        return str(e)
+    log_loss, brier = score_rows(_ARRAYS, probs, _ROWS)
+    if not (np.isfinite(log_loss).all() and np.isfinite(brier).all()):
+        return "sonlu olmayan olasılık (NaN/inf)"
+    league = _ARRAYS['league'][_ROWS]
+    n = len(_ARRAYS['league_names'])
+    counts = np.bincount(league, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_league = np.bincount(league, weights=log_loss, minlength=n) / counts
+    return float(log_loss.mean()), float(brier.mean()), per_league
+
+
+# --- ADAYLAR ---
+FIELD_TYPES = {f.name: f.type for f in fields(ModelConfig)}
+
+
+def parse_grid(specs):
+    """['alpha=0.1,0.2', 'window=5,10'] -> {'alpha': [0.1, 0.2], 'window': [5, 10]} (alan tipinde)"""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in FIELD_TYPES:
+            raise SystemExit(f"❌ Bilinmeyen parametre: {name}")
+        try:
+            grid[name] = [FIELD_TYPES[name](v) for v in values.split(',') if v]
+        except ValueError:
+            raise SystemExit(f"❌ {name} için geçersiz değer ({FIELD_TYPES[name].__name__} bekleniyor): {values}")
+    return grid
+
+
+def _sample(rng, name, lo, hi):
+    """Aralıktan alan tipinde rastgele değer (tamsayı alanlar uçlar dahil)"""
+    if FIELD_TYPES[name] is int:
+        return int(rng.integers(int(lo), int(hi), endpoint=True))
+    return round(float(rng.uniform(lo, hi)), 4)
+
+
+def candidates(base, grid=None, random_n=0, space=None, seed=0):
+    """Baz yapılandırma + grid kartezyen çarpımı + rastgele örnekler"""
+    out = [base]
+    if grid:
+        names = list(grid)
+        out += [base.replace(**dict(zip(names, values))) for values in itertools.product(*grid.values())]
+    rng = np.random.default_rng(seed)
+    space = {**SEARCH_SPACE, **(space or {})}
+    for _ in range(random_n):
+        out.append(base.replace(**{name: _sample(rng, name, lo, hi) for name, (lo, hi) in space.items()}))
+    seen, unique = set(), []
+    for c in out:
+        if c not in seen:
+            seen.add(c)
+            unique.append(c)
+    return unique
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicta PRO model parametre taraması")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--config', default=os.getenv("PREDICTA_MODEL_CONFIG"), help="Baz ModelConfig JSON")
+    parser.add_argument('--grid', action='append', default=[], help="param=v1,v2,... (tekrar edilebilir)")
+    parser.add_argument('--random', type=int, default=0, help="Rastgele aday sayısı")
+    parser.add_argument('--space', action='append', default=[], help="Rastgele aralık: param=alt:üst")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--since', help="Yalnızca bu tarihten sonraki maçlar puanlanır (rating'ler tüm geçmişle)")
+    parser.add_argument('--league', action='append', default=[], help="Yalnızca bu lig(ler) puanlanır")
+    parser.add_argument('--per-league', action='store_true', help="Her lig için en iyi yapılandırmayı da göster")
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--grid-size', type=int, default=int(os.getenv("PREDICTA_SCORE_GRID", SCORE_GRID)))
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--out', help="Tüm sonuçları CSV olarak yaz")
+    parser.add_argument('--best-out', help="En iyi yapılandırmayı JSON olarak yaz (PREDICTA_MODEL_CONFIG)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"❌ CSV bulunamadı: {args.csv}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    path = load_arrays(args.csv, args.cache_dir)
+    arrays = open_arrays(path)
+    print(f"📦 Ön işlenmiş diziler: {len(arrays['home'])} maç ({time.perf_counter() - t0:.1f} sn, {path})")
+
+    mask = np.ones(len(arrays['home']), dtype=bool)
+    if args.league:
+        mask &= np.isin(arrays['league_names'][arrays['league']], args.league)
+    if args.since:
+        mask &= arrays['date'] >= np.datetime64(pd.Timestamp(args.since))
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        print("❌ Puanlanacak maç yok")
+        sys.exit(1)
+
+    space = {}
+    for spec in args.space:
+        name, _, bounds = spec.partition('=')
+        lo, _, hi = bounds.partition(':')
+        space[name] = (float(lo), float(hi))
+    base = load_config(args.config)
+    configs = candidates(base, parse_grid(args.grid), args.random, space, args.seed)
+    print(f"🔎 {len(configs)} aday, {len(rows)} maç puanlanıyor...")
+
+    t0 = time.perf_counter()
+    tasks = [(c, args.grid_size) for c in configs]
+    if args.jobs == 1:
+        _init_worker(path, rows)
+        results = list(map(evaluate_candidate, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(path, rows)) as pool:
+            results = list(pool.map(evaluate_candidate, tasks))
+    elapsed = time.perf_counter() - t0
+    print(f"⚡ {elapsed:.1f} sn ({elapsed / len(configs) * 1000:.0f} ms/aday)")
+
+    swept = sorted({name for c in configs for name, v in c.to_dict().items() if v != getattr(base, name)})
+    skipped = {i: result for i, result in enumerate(results) if isinstance(result, str)}
+    results = [None if i in skipped else result for i, result in enumerate(results)]
+    records = []
+    for i, (config, result) in enumerate(zip(configs, results)):
+        log_loss, brier, _ = result or (np.nan, np.nan, None)
+        records.append({'candidate': i, **{name: getattr(config, name) for name in swept},
+                        'log_loss': log_loss, 'brier': brier, 'skipped': skipped.get(i, '')})
+    # Atlanan adaylar tablonun (ve --out CSV'sinin) sonunda, nedenleriyle
+    table = pd.DataFrame(records).sort_values('log_loss', na_position='last').reset_index(drop=True)
+    baseline = results[0][0] if results[0] else np.nan
+    table['delta'] = table['log_loss'] - baseline
+    table.index += 1
+
+    print(f"\n🏆 Log-loss sıralaması (baz: {baseline:.5f})")
+    print(table[table['skipped'] == ''].drop(columns='skipped').head(args.top)
+          .to_string(float_format=lambda v: f"{v:.5f}"))
+    if skipped:
+        print(f"\n⚠️ {len(skipped)} aday atlandı")
+        print(table[table['skipped'] != ''][['candidate', *swept, 'skipped']].to_string(index=False))
+
+    if args.per_league:
+        names = arrays['league_names']
+        losses = np.array([r[2] if r else np.full(len(names), np.nan) for r in results])
+        scored = np.unique(arrays['league'][rows])
+        print("\n🏟️ Lig bazında en iyi aday")
+        rows_out = []
+        for l in scored:
+            best = int(np.nanargmin(losses[:, l]))
+            rows_out.append({'league': names[l], 'candidate': best, 'log_loss': losses[best, l],
+                             'delta': losses[best, l] - losses[0, l],
+                             **{name: getattr(configs[best], name) for name in swept}})
+        print(pd.DataFrame(rows_out).to_string(index=False, float_format=lambda v: f"{v:.5f}"))
+
+    if args.out:
+        table.to_csv(args.out, index_label='rank')
+        print(f"\n💾 Sonuçlar yazıldı: {args.out}")
+    if args.best_out:
+        if len(skipped) == len(configs):
+            print("❌ Tüm adaylar atlandı; en iyi yapılandırma yazılmadı")
+            sys.exit(1)
+        best = configs[int(table.iloc[0]['candidate'])]
+        with open(args.best_out, 'w', encoding='utf-8') as f:
+            json.dump(best.to_dict(), f, indent=2)
+        print(f"💾 En iyi yapılandırma: {args.best_out} (PREDICTA_MODEL_CONFIG ile kullanılabilir)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Predicta PRO - Takım ismi eşleştirme indeksi
+
+Bülten isimleri (HN/AN) CSV'deki takım isimlerine şu sırayla çözülür:
+bellek -> normalize edilmiş tam eşleşme -> kalıcı alias tablosu -> bültenin
+ligi (LN) ile sınırlandırılmış bulanık arama -> tüm takımlarda bulanık arama.
+"""
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from metrics import FUZZY_MATCHES, TEAM_LOOKUPS
+
+# Yalnızca tam kelime olarak atılır ("Fenerbahçe S.K." -> "fenerbahce", "Osasuna" bozulmaz)
+STRIP_TOKENS = {'sk', 'fk', 'fc', 'jk', 'sc', 'afc', 'cf', 'as', 'ac'}
+_TR_MAP = str.maketrans({'ı': 'i', 'İ': 'i', 'ş': 's', 'Ş': 's', 'ğ': 'g', 'Ğ': 'g',
+                         'ü': 'u', 'Ü': 'u', 'ö': 'o', 'Ö': 'o', 'ç': 'c', 'Ç': 'c'})
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name):
+    """Küçük harf, aksansız, noktalama ve kulüp eklerinden arındırılmış isim"""
+    if not isinstance(name, str): return ''
+    text = unicodedata.normalize('NFKD', name.translate(_TR_MAP).lower().replace('.', ''))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    tokens = [t for t in _NON_ALNUM.sub(' ', text).split() if t not in STRIP_TOKENS]
+    return ' '.join(tokens)
+
+
+class TeamAliasIndex:
+    """Model yüklenirken kurulan isim -> takım indeksi (sayaçlı)"""
+
+    def __init__(self, teams, team_leagues, store=None, score_cutoff=60, league_cutoff=80):
+        self.store = store
+        self.score_cutoff = score_cutoff
+        self.league_cutoff = league_cutoff
+        self.team_league = dict(zip(teams, team_leagues))
+
+        self.exact = {}
+        self.by_league = defaultdict(dict)
+        for team, league in zip(teams, team_leagues):
+            key = normalize_name(team)
+            if not key: continue
+            self.exact.setdefault(key, team)
+            self.by_league[league][key] = team
+        self.league_keys = {normalize_name(l): l for l in self.by_league if isinstance(l, str)}
+
+        self.resolved = {}
+        self.league_links = defaultdict(Counter)   # bülten ligi -> CSV ligleri
+        self.pending = []
+        self._warm = False
+        self.counters = Counter()
+        self.latency_total = 0.0
+
+    # --- ÇÖZÜMLEME ---
+    def _count(self, result):
+        self.counters[result] += 1
+        TEAM_LOOKUPS.labels(result).inc()
+
+    def resolve(self, name, league=None):
+        t0 = time.perf_counter()
+        try:
+            return self._resolve(name, league)
+        finally:
+            self.latency_total += time.perf_counter() - t0
+
+    def _resolve(self, name, league):
+        key = normalize_name(name)
+        if not key or not self.exact:
+            self._count('miss')
+            return None
+
+        if key in self.resolved:
+            self._count('hit_memory')
+            return self.resolved[key]
+
+        self._warm_up()
+        team = self.exact.get(key)
+        if team is not None:
+            self._count('hit_exact')
+        else:
+            team = self.store.get(key) if self.store is not None else None
+            if team is not None and team in self.team_league:
+                self._count('hit_stored')
+            else:
+                team, score = self._fuzzy(key, league)
+                if team is None:
+                    self._count('miss')
+                else:
+                    self.pending.append({'alias': key, 'team': team, 'league': league, 'score': score})
+
+        if team is not None and league:
+            self.league_links[league][self.team_league[team]] += 1
+        self.resolved[key] = team
+        return team
+
+    def _fuzzy(self, key, league):
+        """Önce bültenin ligine ait takımlar, bulunamazsa tüm takımlar"""
+        from rapidfuzz import fuzz, process  # açılışı yavaşlatmasın: ilk bulanık aramada yüklenir
+        scoped = {}
+        for csv_league in self._candidate_leagues(league):
+            scoped.update(self.by_league.get(csv_league, {}))
+
+        # Seçenekler normalize anahtarlardır (dict verilirse rapidfuzz ham isimleri, yani değerleri puanlar)
+        if scoped:
+            match = process.extractOne(key, list(scoped), scorer=fuzz.token_set_ratio, score_cutoff=self.score_cutoff)
+            FUZZY_MATCHES.labels('league', str(match is not None).lower()).inc()
+            if match:
+                self._count('fuzzy_scoped')
+                return scoped[match[0]], match[1]
+
+        match = process.extractOne(key, list(self.exact), scorer=fuzz.token_set_ratio, score_cutoff=self.score_cutoff)
+        FUZZY_MATCHES.labels('global', str(match is not None).lower()).inc()
+        if match:
+            self._count('fuzzy_global')
+            return self.exact[match[0]], match[1]
+        return None, 0
+
+    def _candidate_leagues(self, league):
+        if not league: return []
+        linked = [l for l, _ in self.league_links.get(league, Counter()).most_common(3)]
+        if linked: return linked
+        from rapidfuzz import fuzz, process
+        match = process.extractOne(normalize_name(league), list(self.league_keys), scorer=fuzz.token_set_ratio,
+                                   score_cutoff=self.league_cutoff)
+        return [self.league_keys[match[0]]] if match else []
+
+    # --- KALICILIK ---
+    def _warm_up(self):
+        """Kalıcı alias'lardan lig bağlantılarını bir kez yükle"""
+        if self._warm or self.store is None: return
+        self._warm = True
+        for alias, team, league in self.store.load_all():
+            if team in self.team_league and league:
+                self.league_links[league][self.team_league[team]] += 1
+
+    def flush(self):
+        """Yeni bulanık eşleşmeleri tek seferde kalıcı tabloya yaz"""
+        if not self.pending or self.store is None: return
+        rows, self.pending = self.pending, []
+        self.store.save_many(rows)
+
+    def stats(self):
+        lookups = sum(self.counters.values())
+        return {
+            **self.counters,
+            'lookups': lookups,
+            'avg_ms': round(self.latency_total / lookups * 1000, 3) if lookups else 0.0
+        }
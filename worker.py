@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Predicta PRO - Arka plan işleri için ayrı süreç
+
+İsteğe bağlıdır: web süreçleri scheduler liderini kendi aralarında seçer
+(instance/scheduler.lock üzerinde flock), Procfile yalnızca web'i çalıştırır.
+Bu süreç, işleri web worker'larının dışına almak için web ile aynı instance/
+klasörünü (SQLite, kilit, snapshot) gören bir yerde çalıştırılır: aynı makine
+veya konteyner ya da paylaşılan volume. Aynı kilidi kullandığından web'deki
+scheduler'la çakışmaz; işleri yalnızca web'den almak için web
+PREDICTA_SCHEDULER=off ile başlatılır. Heroku benzeri platformlarda her process
+tipi kendi geçici diskli konteynerinde çalışır; orada ayrı `worker` girdisi
+kendi boş veritabanına yazar, web'e hiçbir şey ulaşmaz.
+
+İndirme, ayrıştırma, tahmin, commit ve iş metrikleri web süreçleriyle aynı
+PROMETHEUS_MULTIPROC_DIR klasörüne yazılır (bkz. metrics.py).
+"""
+import atexit
+import os
+import tempfile
+
+# app import edilirken web scheduler'ı başlamasın
+os.environ["PREDICTA_SCHEDULER"] = "off"
+# prometheus_client import edilmeden önce; varsayılan gunicorn.conf.py ile aynı klasör
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "predicta-metrics"))
+
+import metrics
+
+metrics.clear_stale_files(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+atexit.register(metrics.mark_process_dead, os.getpid())
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app import JOB_DEFAULTS, acquire_scheduler_lock, configure_jobs, logger
+
+
+def main():
+    # Aynı anda ikinci bir worker (veya lider web süreci) varsa kilit bırakılana kadar bekle
+    lock = acquire_scheduler_lock(blocking=True)
+    logger.info(f"👑 Scheduler lideri (worker): PID {os.getpid()}")
+    if os.getenv("PREDICTA_WORKER_METRICS_PORT"):
+        metrics.serve(int(os.environ["PREDICTA_WORKER_METRICS_PORT"]))
+
+    scheduler = BlockingScheduler(job_defaults=JOB_DEFAULTS)
+    configure_jobs(scheduler)
+    try:
+        scheduler.start()
+    finally:
+        lock.close()
+
+
+if __name__ == "__main__":
+    main()